@@ -0,0 +1,78 @@
+"""Benchmark do filtro da sidebar: `df.copy()` + 3× `isin` (antigo) vs `IndiceFiltro`.
+
+Só tempo; a equivalência dos dois está em `02_code/tests/test_filtros.py`.
+
+    python 02_code/bench/bench_filtros.py            # 1M linhas
+    python 02_code/bench/bench_filtros.py 200000
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from atos.filtros import IndiceFiltro  # noqa: E402
+
+
+def base_sintetica(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    clientes = [f"Cliente {i:03d}" for i in range(300)]
+    tipos = ["Pintura", "Hidráulica", "Portas & Acessos", "Emergencial", "Civil", "Coberta/Telhado",
+             "Acessibilidade", "Fachada & Revestimento", "Sinalização", "Laudos", "NAO_MAPEADO"]
+    meses = [str(p) for p in pd.period_range("2024-01", periods=24, freq="M")]
+    return pd.DataFrame({
+        "CLIENTE": pd.array(rng.choice(clientes, n), dtype="string"),
+        "tipo_servico": rng.choice(tipos, n),
+        "mes_autorizacao": rng.choice(meses, n),
+        "receita": rng.random(n) * 1e5,
+        "sla_dias": rng.integers(0, 90, n).astype(float),
+    })
+
+
+def filtro_antigo(df, sel):
+    f = df.copy()
+    for dim, valores in sel.items():
+        if valores:
+            f = f[f[dim].isin(valores)]
+    return f
+
+
+def cronometrar(fn, repeticoes=20) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - t0)
+    return float(np.median(tempos)) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = base_sintetica(n)
+
+    t0 = time.perf_counter()
+    idx = IndiceFiltro(df)
+    print(f"linhas: {n:,} | montagem do índice: {(time.perf_counter() - t0) * 1000:.1f} ms\n")
+
+    meses = idx.opcoes("mes_autorizacao")
+    cenarios = {
+        "padrão (todos clientes/tipos, 3 meses)": {
+            "CLIENTE": idx.opcoes("CLIENTE"), "tipo_servico": idx.opcoes("tipo_servico"), "mes_autorizacao": meses[-3:]},
+        "1 cliente": {"CLIENTE": idx.opcoes("CLIENTE")[:1], "tipo_servico": [], "mes_autorizacao": []},
+        "metade dos clientes × 2 tipos": {
+            "CLIENTE": idx.opcoes("CLIENTE")[::2], "tipo_servico": idx.opcoes("tipo_servico")[:2], "mes_autorizacao": []},
+    }
+
+    print(f"{'cenário':45s} {'antigo':>10s} {'posições':>10s} {'+ take':>10s}")
+    for nome, sel in cenarios.items():
+        antigo = cronometrar(lambda: filtro_antigo(df, sel), 5)
+        pos = cronometrar(lambda: idx.posicoes(sel))
+        take = cronometrar(lambda: idx.filtrar(sel))
+        print(f"{nome:45s} {antigo:8.1f}ms {pos:8.1f}ms {take:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
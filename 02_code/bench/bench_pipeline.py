@@ -0,0 +1,276 @@
+"""Benchmark do pipeline ATOS por etapa (tempo + pico de memória) sobre planilhas sintéticas,
+com baseline em JSON e comparação para pegar regressões.
+
+Etapas: leitura da planilha, clean, enrich, apply_sla, compactação, índice e filtro da sidebar, cubo de KPIs,
+agregações das abas (recorte padrão do dashboard), relatório Word e exportação CSV da base filtrada.
+Cada tamanho roda num processo novo; o pico de memória de uma etapa é o maior RSS amostrado durante
+ela menos o RSS no início (memória a mais que a etapa precisou). O tempo é o menor das repetições.
+Também registra o tamanho do cubo de KPIs pronto (`CuboKPI.memoria`: células e tabelas de contagem).
+
+    python 02_code/bench/bench_pipeline.py                          # 1k e 100k, só mostra
+    python 02_code/bench/bench_pipeline.py --tamanhos 1k 100k 1m --salvar
+    python 02_code/bench/bench_pipeline.py --comparar               # sai com código 1 se regrediu
+    python 02_code/bench/bench_pipeline.py --tamanhos 1m --sem-planilha   # base gerada em memória (sem xlsx)
+
+As planilhas ficam em cache em `02_code/bench/dados/` (ver `gerar_atos.py`).
+"""
+import argparse
+import ctypes
+import gc
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from gerar_atos import arquivo_sintetico, gerar_base, rotulo, tamanho  # noqa: E402
+
+from atos.compactacao import compactar  # noqa: E402
+from atos.cubo import PENDENCIAS, CuboKPI  # noqa: E402
+from atos.exportacao import exportar_bytes  # noqa: E402
+from atos.filtros import IndiceFiltro  # noqa: E402
+from atos.leitura import COLUNAS_PIPELINE, ler_planilha  # noqa: E402
+from atos.mapeamentos import load_mappings  # noqa: E402
+from atos.pipeline import apply_sla, clean, enrich  # noqa: E402
+from atos.relatorio import gerar_relatorio_docx  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# regressão = passou da baseline em mais de `tolerancia` E de um mínimo absoluto (ruído em etapas curtas)
+TOLERANCIA = 0.25
+MIN_SEGUNDOS = 0.05
+MIN_MB = 16.0
+
+
+# ---------------- memória ----------------
+def _rss_mb():
+    """RSS atual do processo em MB (None fora do Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _liberar():
+    """Coleta o lixo e devolve ao SO o heap livre (glibc), para o RSS inicial ser só memória viva."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class PicoRSS:
+    """Amostra o RSS numa thread enquanto o bloco roda; `pico` = máximo acima do RSS inicial (MB)."""
+
+    def __init__(self, intervalo: float = 0.002):
+        self.intervalo = intervalo
+        self.pico = float("nan")
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            self._max = max(self._max, _rss_mb())
+
+    def __enter__(self):
+        self._inicio = _rss_mb()
+        if self._inicio is not None:
+            self._max = self._inicio
+            self._parar = threading.Event()
+            self._thread = threading.Thread(target=self._amostrar, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._inicio is not None:
+            self._parar.set()
+            self._thread.join()
+            self._max = max(self._max, _rss_mb())
+            self.pico = self._max - self._inicio
+
+
+# ---------------- etapas ----------------
+def selecao_padrao(idx: IndiceFiltro) -> dict:
+    """Seleção inicial do dashboard: todos os clientes e tipos, últimos 3 meses."""
+    meses = idx.opcoes("mes_autorizacao")
+    return {"CLIENTE": idx.opcoes("CLIENTE"), "tipo_servico": idx.opcoes("tipo_servico"), "mes_autorizacao": meses[-3:]}
+
+
+def agregar_abas(cubo: CuboKPI, selecao: dict):
+    """Mesmas consultas que os cards e as abas Visão geral, Financeiro e SLA fazem ao cubo."""
+    rec = cubo.recorte(selecao)
+    kpis = (rec.n_linhas(), rec.chamados_unicos(), rec.total("receita"),
+            rec.total("receita", billing_status=PENDENCIAS), rec.total("linhas", sla_resultado=["FORA"]))
+    tabelas = [
+        rec.chamados_por("CLIENTE"),
+        rec.por("mes_autorizacao", "n_os"),
+        rec.por("tipo_servico", ["n_os", "receita"]),
+        rec.por("billing_status", "receita"),
+        rec.por(["tipo_servico", "sla_resultado"], "linhas").unstack(fill_value=0),
+    ]
+    return rec, kpis, tabelas
+
+
+def _etapas(c: dict) -> list:
+    """(nome, função) na ordem do dashboard; cada função lê/grava no contexto `c`."""
+    ms, mserv, sla = c["mapas"]
+
+    def filtro(c):
+        c["sel"] = selecao_padrao(c["idx"])
+        c["f"] = c["idx"].filtrar(c["sel"])
+
+    def relatorio(c):
+        sel = c["sel"]
+        filtros = {"clientes": sel["CLIENTE"], "tipos": sel["tipo_servico"], "meses": sel["mes_autorizacao"]}
+        c["docx"] = gerar_relatorio_docx(c["rec"], filtros)
+
+    return [
+        ("leitura", lambda c: c.__setitem__("raw", ler_planilha(c["fonte"], COLUNAS_PIPELINE))),
+        ("clean", lambda c: c.__setitem__("df", clean(c["raw"].copy()))),
+        ("enrich", lambda c: c.__setitem__("df_enr", enrich(c["df"], ms, mserv))),
+        ("apply_sla", lambda c: c.__setitem__("df_sla", apply_sla(c["df_enr"], sla))),
+        ("compactar", lambda c: c.__setitem__("base", compactar(c["df_sla"])[0])),
+        ("indice_filtro", lambda c: c.__setitem__("idx", IndiceFiltro(c["base"]))),
+        ("filtro", filtro),
+        ("cubo", lambda c: c.__setitem__("cubo", CuboKPI.de_base(c["base"]))),
+        ("abas", lambda c: c.__setitem__("rec", agregar_abas(c["cubo"], c["sel"])[0])),
+        ("relatorio_docx", relatorio),
+        ("export_csv", lambda c: c.__setitem__("csv", len(exportar_bytes(c["f"])))),
+    ]
+
+
+def medir_tamanho(n: int, seed: int, repeticoes: int, fonte) -> dict:
+    """Roda num processo novo: {etapa: {"segundos", "pico_mb"}} para uma base de `n` linhas."""
+    c = {"mapas": load_mappings(), "fonte": fonte}
+    if fonte is None:  # sem planilha: a base sai direto do gerador e a leitura fica de fora
+        c["raw"] = gerar_base(n, seed)[COLUNAS_PIPELINE]
+    resultado = {}
+    for nome, fn in _etapas(c):
+        if nome == "leitura" and fonte is None:
+            continue
+        tempos, picos = [], []
+        for _ in range(repeticoes):
+            _liberar()
+            with PicoRSS() as mem:
+                t0 = time.perf_counter()
+                fn(c)
+                tempos.append(time.perf_counter() - t0)
+            picos.append(mem.pico)
+        resultado[nome] = {"segundos": round(min(tempos), 4), "pico_mb": round(max(picos), 1)}
+        print(f"  {nome:<16} {min(tempos):8.3f}s  {max(picos):8.1f} MB", flush=True)
+    cubo_mb = c["cubo"].memoria().round(2)
+    print(f"  {'cubo (tamanho)':<16} {cubo_mb.sum():18.1f} MB  " + ", ".join(f"{k} {v:.1f}" for k, v in cubo_mb.items()),
+          flush=True)
+    return {"linhas": n, "linhas_base": len(c["base"]), "etapas": resultado,
+            "cubo_mb": {**cubo_mb.to_dict(), "total": round(float(cubo_mb.sum()), 2)}}
+
+
+def ambiente() -> dict:
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+# ---------------- baseline ----------------
+def comparar(atual: dict, base: dict, tolerancia: float = TOLERANCIA) -> list[str]:
+    """Linhas "tamanho/etapa: ..." de cada métrica que passou da baseline."""
+    regressoes = []
+    for rot, medido in atual.items():
+        ref = base.get(rot, {}).get("etapas", {})
+        for etapa, m in medido["etapas"].items():
+            if etapa not in ref:
+                continue
+            for chave, minimo, unidade in (("segundos", MIN_SEGUNDOS, "s"), ("pico_mb", MIN_MB, " MB")):
+                v, r = m[chave], ref[etapa][chave]
+                if v > r * (1 + tolerancia) and v - r > minimo:
+                    regressoes.append(f"{rot}/{etapa}: {chave} {r:.3f}{unidade} -> {v:.3f}{unidade} "
+                                      f"({(v / r - 1) * 100 if r else float('inf'):+.0f}%)")
+        v, r = medido.get("cubo_mb", {}).get("total"), base.get(rot, {}).get("cubo_mb", {}).get("total")
+        if v is not None and r is not None and v > r * (1 + tolerancia) and v - r > MIN_MB:
+            regressoes.append(f"{rot}/cubo: tamanho {r:.1f} MB -> {v:.1f} MB ({(v / r - 1) * 100:+.0f}%)")
+    return regressoes
+
+
+def _tabela(rot: str, medido: dict, ref: dict | None, ref_cubo: dict | None = None) -> None:
+    print(f"\n{rot} ({medido['linhas']:,} linhas)")
+    print(f"  {'etapa':<16} {'tempo':>9} {'pico':>11}" + (f" | {'baseline':>9} {'var':>6} {'pico':>11} {'var':>6}" if ref else ""))
+    for etapa, m in medido["etapas"].items():
+        linha = f"  {etapa:<16} {m['segundos']:8.3f}s {m['pico_mb']:8.1f} MB"
+        r = (ref or {}).get(etapa)
+        if r:
+            vt = (m["segundos"] / r["segundos"] - 1) * 100 if r["segundos"] else 0
+            vm = (m["pico_mb"] / r["pico_mb"] - 1) * 100 if r["pico_mb"] > 0 else 0
+            linha += f" | {r['segundos']:8.3f}s {vt:+5.0f}% {r['pico_mb']:8.1f} MB {vm:+5.0f}%"
+        print(linha)
+    if "cubo_mb" in medido:
+        ref_cubo = (ref_cubo or {}).get("total")
+        print(f"  {'cubo (tamanho)':<16} {medido['cubo_mb']['total']:18.1f} MB"
+              + (f" | {'':>26}{ref_cubo:8.1f} MB" if ref_cubo else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline ATOS por etapa.")
+    parser.add_argument("--tamanhos", nargs="+", default=["1k", "100k"], help="1k, 100k, 1m ou um número de linhas")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sem-planilha", action="store_true", help="gera a base em memória (pula a leitura do xlsx)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--salvar", action="store_true", help="grava o resultado como baseline")
+    parser.add_argument("--comparar", action="store_true", help="compara com a baseline; código 1 se regrediu")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="folga relativa (0.25 = +25%%)")
+    args = parser.parse_args(argv)
+
+    base = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+    if args.comparar and not base:
+        parser.error(f"sem baseline em {args.baseline} (rode antes com --salvar)")
+
+    atual = {}
+    for texto in args.tamanhos:
+        n = tamanho(texto)
+        rot = rotulo(n)
+        fonte = None
+        if not args.sem_planilha:
+            print(f"{rot}: planilha sintética...", flush=True)
+            fonte = arquivo_sintetico(n, args.seed)
+        print(f"{rot}: medindo", flush=True)
+        with ProcessPoolExecutor(max_workers=1) as ex:
+            atual[rot] = ex.submit(medir_tamanho, n, args.seed, args.repeticoes, fonte).result()
+
+    for rot, medido in atual.items():
+        ref = base.get("tamanhos", {}).get(rot, {}) if args.comparar else {}
+        _tabela(rot, medido, ref.get("etapas"), ref.get("cubo_mb"))
+
+    regressoes = []
+    if args.comparar:
+        regressoes = comparar(atual, base.get("tamanhos", {}), args.tolerancia)
+        print(f"\nbaseline de {base.get('ambiente', {}).get('data', '?')} — tolerância {args.tolerancia:.0%}")
+        for r in regressoes:
+            print(f"REGRESSÃO {r}")
+        if not regressoes:
+            print("sem regressões")
+
+    if args.salvar:
+        base.setdefault("tamanhos", {}).update(atual)
+        base["ambiente"] = ambiente()
+        args.baseline.write_text(json.dumps(base, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nbaseline gravada em {args.baseline}")
+
+    sys.exit(1 if regressoes else 0)
+
+
+if __name__ == "__main__":
+    main()
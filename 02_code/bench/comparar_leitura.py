@@ -0,0 +1,74 @@
+"""Confere os leitores de planilha contra `pd.read_excel(header=1)` e mede tempo/pico de memória
+(cada leitura roda num processo novo, para o pico de RSS ser só dela).
+
+Para cada motor disponível, `clean()` com projeção de colunas precisa sair idêntico ao
+`clean()` da leitura de referência (planilha inteira, mesmas colunas). Sai com código 1 se divergir.
+A mesma conferência roda nos testes (`02_code/tests/test_leitura.py`) numa planilha pequena gerada; este
+script é para planilhas reais e para medir.
+
+    python 02_code/bench/comparar_leitura.py                      # planilha padrão (config.RAW)
+    python 02_code/bench/comparar_leitura.py caminho/ATOS.xlsx
+"""
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from atos import config  # noqa: E402
+from atos.leitura import COLUNAS_PIPELINE, MOTORES, ler_planilha, motor_padrao  # noqa: E402
+from atos.pipeline import clean  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _ler(caminho, motor):
+    """Roda num processo novo: (frame, segundos, pico de RSS em MB do processo)."""
+    t = time.perf_counter()
+    df = pd.read_excel(caminho, header=1) if motor is None else ler_planilha(caminho, motor=motor)
+    seg = time.perf_counter() - t
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else float("nan")
+    return df, seg, pico
+
+
+def medir(caminho, motor=None):
+    with ProcessPoolExecutor(max_workers=1) as ex:
+        return ex.submit(_ler, caminho, motor).result()
+
+
+def disponiveis() -> list:
+    return [m for m in MOTORES if m != "calamine" or motor_padrao() == "calamine"]
+
+
+def main():
+    caminho = Path(sys.argv[1]) if len(sys.argv) > 1 else config.RAW
+    print(f"Planilha: {caminho}")
+
+    ref, seg, pico = medir(caminho)
+    print(f"{'read_excel (referência)':<26} {seg:7.2f}s  pico {pico:7.1f} MB")
+    ref = ref.loc[:, ~ref.columns.astype(str).str.startswith("Unnamed")]
+    ref.columns = [str(c).strip() for c in ref.columns]
+    ref = clean(ref[[c for c in ref.columns if c in COLUNAS_PIPELINE]])
+
+    ok = True
+    for motor in disponiveis():
+        df, seg, pico = medir(caminho, motor)
+        try:
+            pd.testing.assert_frame_equal(clean(df), ref)
+            status = "igual"
+        except AssertionError as e:
+            ok = False
+            status = "DIVERGE: " + str(e).splitlines()[0]
+        print(f"{motor:<26} {seg:7.2f}s  pico {pico:7.1f} MB  {status}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
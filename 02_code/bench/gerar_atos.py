@@ -0,0 +1,210 @@
+"""Gerador de planilhas ATOS sintéticas (nenhum dado real) para os benchmarks.
+
+As distribuições saem de `04_docs/escopo`: serviços de `lista_servicos.txt` (com as variações de
+espaço/caixa da planilha real e ~2% de serviços fora do mapeamento), status de `lista_status.txt`,
+TÉRMINO sorteado em torno da meta do `cadastro_sla.csv` para o tipo do serviço (~45% ainda sem término).
+O layout é o da planilha real: título na 1ª linha, cabeçalho na 2ª, colunas Unnamed (sem cabeçalho)
+com anotações soltas, CHAMADO ora número ora texto e algumas linhas vazias no meio.
+
+    python 02_code/bench/gerar_atos.py 100k                  # -> 02_code/bench/dados/ATOS_sintetico_100k.xlsx
+    python 02_code/bench/gerar_atos.py 1m saida.xlsx --seed 7
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from atos import config  # noqa: E402
+from atos.mapeamentos import carregar_servicos, carregar_sla  # noqa: E402
+from atos.normalizacao import norm_key_series  # noqa: E402
+
+DADOS_DIR = Path(__file__).resolve().parent / "dados"
+
+# sobe quando o gerador muda (entra no nome do arquivo em cache)
+VERSAO = 2
+
+TAMANHOS = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+UFS = ["SP", "RJ", "MG", "BA", "PE", "CE", "PB", "RN", "PR", "SC", "RS", "GO", "DF", "ES", "AL", "SE", "PI", "MA", "PA", "AM"]
+PESO_UF = np.array([30, 10, 9, 7, 6, 5, 4, 3, 5, 3, 4, 3, 3, 2, 1, 1, 1, 1, 1, 1], dtype=float)
+
+# ordem das colunas na planilha real (Unnamed = colunas sem cabeçalho no meio/fim)
+LAYOUT = ["OS", "CHAMADO", "CLIENTE", "PONTO", "UF", "GESTOR", "SERVIÇO", "AUTORIZAÇÃO", "TÉRMINO",
+          "STATUS", None, "RECEITA", None]
+
+FRACAO_SEM_TERMINO = 0.45
+FRACAO_NAO_MAPEADO = 0.02
+FRACAO_LINHA_VAZIA = 0.001
+FRACAO_ANOTACAO = 0.03
+
+
+def rotulo(n: int) -> str:
+    for k, v in TAMANHOS.items():
+        if v == n:
+            return k
+    return str(n)
+
+
+def tamanho(texto: str) -> int:
+    """"1k" / "100k" / "1m" / "2500" -> número de linhas."""
+    t = texto.strip().lower()
+    if t in TAMANHOS:
+        return TAMANHOS[t]
+    mult = {"k": 1_000, "m": 1_000_000}.get(t[-1:], 1)
+    return int(float(t[:-1] if mult > 1 else t) * mult)
+
+
+def _lista(path: Path) -> list[str]:
+    return [ln.strip() for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()]
+
+
+def _zipf(rng, k: int, a: float = 1.1) -> np.ndarray:
+    p = 1 / np.arange(1, k + 1) ** a
+    return rng.permutation(p / p.sum())
+
+
+def _decrescente(k: int) -> np.ndarray:
+    """Pesos 1/(i+1): os primeiros da lista (ex.: "A faturar") são os mais comuns."""
+    p = 1 / np.arange(1, k + 1)
+    return p / p.sum()
+
+
+def _variar(rng, valores: np.ndarray, fracao: float) -> np.ndarray:
+    """Sujeira da digitação: espaço antes/depois e caixa alta numa fração das células."""
+    out = valores.astype(object)
+    n = len(out)
+    for fn in (lambda s: " " + s, lambda s: s + " ", str.upper):
+        sel = np.flatnonzero(rng.random(n) < fracao / 3)
+        out[sel] = [fn(s) for s in out[sel]]
+    return out
+
+
+def _metas_por_servico(servicos: list[str]) -> np.ndarray:
+    """Meta de SLA (dias) de cada serviço, via mapeamento serviço -> tipo e cadastro SLA padrão."""
+    mserv, sla = carregar_servicos(), carregar_sla()
+    tipo = dict(zip(mserv["servico_key"], mserv["tipo_servico"]))
+    padrao = sla[sla["cliente"] == "*"].set_index("k_tipo")["sla_dias"]
+    chaves = norm_key_series(pd.Series(servicos, dtype="string"))
+    tipos = norm_key_series(pd.Series([tipo.get(k) for k in chaves], dtype="string"))
+    return np.array([padrao.get(t, 30.0) if pd.notna(t) else 30.0 for t in tipos], dtype=float)
+
+
+def gerar_base(n: int, seed: int = 0) -> pd.DataFrame:
+    """Frame com as colunas da planilha ATOS (como o `read_excel` devolveria, sem as Unnamed)."""
+    rng = np.random.default_rng(seed)
+
+    servicos = _lista(config.ESCOPO_DIR / "lista_servicos.txt")
+    metas = _metas_por_servico(servicos)
+    servicos += [f"Serviço avulso {i:02d}" for i in range(10)]  # fora do mapeamento -> NAO_MAPEADO
+    metas = np.concatenate([metas, np.full(10, 30.0)])
+    p_serv = _zipf(rng, len(servicos) - 10) * (1 - FRACAO_NAO_MAPEADO)
+    p_serv = np.concatenate([p_serv, np.full(10, FRACAO_NAO_MAPEADO / 10)])
+    i_serv = rng.choice(len(servicos), n, p=p_serv)
+
+    status = _lista(config.ESCOPO_DIR / "lista_status.txt")
+    n_cli = int(np.clip(n // 400, 20, 600))
+    clientes = np.array([f"Cliente {i:03d}" for i in range(n_cli)])
+    i_cli = rng.choice(n_cli, n, p=_zipf(rng, n_cli))
+    gestores = np.array([f"Gestor {i:02d}" for i in range(25)])
+    ufs = rng.choice(UFS, n, p=PESO_UF / PESO_UF.sum())
+
+    # autorizações nos últimos 2 anos; término ~ meta do tipo × lognormal (parte estoura o SLA)
+    inicio = np.datetime64("2024-01-01")
+    aut = inicio + rng.integers(0, 730, n).astype("timedelta64[D]")
+    dias = np.rint(metas[i_serv] * rng.lognormal(-0.15, 0.45, n)).astype("int64")
+    ter = (aut + dias.astype("timedelta64[D]")).astype("datetime64[ns]")
+    ter[rng.random(n) < FRACAO_SEM_TERMINO] = np.datetime64("NaT")
+
+    os_num = rng.permutation(np.arange(1000, 1000 + n))
+    chamado = rng.integers(4_500_000_000, 4_600_000_000, n).astype(object)
+    texto = rng.random(n) < 0.3
+    chamado[texto] = [f"{2024 + int(a)}/{b:04d}-{c:04d}" for a, b, c in
+                      zip(rng.integers(0, 2, texto.sum()), rng.integers(0, 10_000, texto.sum()),
+                          rng.integers(0, 10_000, texto.sum()))]
+
+    df = pd.DataFrame({
+        "OS": os_num,
+        "CHAMADO": chamado,
+        "CLIENTE": _variar(rng, clientes[i_cli], 0.02),
+        "PONTO": [f"AG. {u} {p:04d}" for u, p in zip(ufs, rng.integers(0, 5000, n))],
+        "UF": ufs,
+        "GESTOR": rng.choice(gestores, n),
+        "SERVIÇO": _variar(rng, np.array(servicos, dtype=object)[i_serv], 0.15),
+        "AUTORIZAÇÃO": aut.astype("datetime64[ns]"),
+        "TÉRMINO": ter,
+        "STATUS": _variar(rng, rng.choice(status, n, p=_decrescente(len(status))), 0.05),
+        "RECEITA": np.round(rng.lognormal(9.5, 1.1, n), 2),
+    })
+
+    vazias = np.flatnonzero(rng.random(n) < FRACAO_LINHA_VAZIA)
+    vazias = vazias[(vazias > 0) & (vazias < n - 1)]  # linhas vazias só no meio (as do fim o read_excel descarta)
+    df.loc[vazias, :] = None
+    return df
+
+
+def escrever_xlsx(df: pd.DataFrame, caminho: Path, seed: int = 0) -> Path:
+    """Grava no layout da planilha real (streaming, write-only)."""
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng(seed + 1)
+    anotacoes = ["ver e-mail", "aguardando NF", "obs.", 1, 0]
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("ATOS")
+    ws.append(["CONTROLE DE ATOS — base sintética"])
+    ws.append([c or None for c in LAYOUT])
+
+    cols = [df[c].to_numpy(dtype=object) if c else None for c in LAYOUT]
+    for c in ("AUTORIZAÇÃO", "TÉRMINO"):
+        k = LAYOUT.index(c)
+        cols[k] = np.array([None if pd.isna(v) else v.to_pydatetime() for v in df[c]], dtype=object)
+    nota = rng.random((len(df), LAYOUT.count(None))) < FRACAO_ANOTACAO
+    i_nota = rng.integers(0, len(anotacoes), nota.shape)
+
+    for i in range(len(df)):
+        j = 0
+        linha = []
+        for c, col in zip(LAYOUT, cols):
+            if c is None:
+                linha.append(anotacoes[i_nota[i, j]] if nota[i, j] else None)
+                j += 1
+            else:
+                v = col[i]
+                linha.append(None if v is None or v is pd.NA or (isinstance(v, float) and np.isnan(v)) else v)
+        if all(v is None for v in linha):
+            linha = []
+        ws.append(linha)
+    wb.save(caminho)
+    return caminho
+
+
+def arquivo_sintetico(n: int, seed: int = 0, pasta: Path = DADOS_DIR) -> Path:
+    """Caminho da planilha sintética de `n` linhas (gerada só na primeira vez)."""
+    caminho = pasta / f"ATOS_sintetico_{rotulo(n)}_s{seed}_v{VERSAO}.xlsx"
+    if not caminho.exists():
+        tmp = caminho.with_suffix(".tmp.xlsx")
+        escrever_xlsx(gerar_base(n, seed), tmp, seed)
+        tmp.replace(caminho)
+    return caminho
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera uma planilha ATOS sintética.")
+    parser.add_argument("tamanho", help="linhas: 1k, 100k, 1m ou um número")
+    parser.add_argument("saida", type=Path, nargs="?", help=f"arquivo .xlsx (padrão: {DADOS_DIR}/...)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    n = tamanho(args.tamanho)
+    caminho = escrever_xlsx(gerar_base(n, args.seed), args.saida, args.seed) if args.saida \
+        else arquivo_sintetico(n, args.seed)
+    print(f"{n:,} linhas -> {caminho}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,5 @@
-import pandas as pd
-from pathlib import Path
+from atos import config
+from atos.armazenamento import ler
+from atos.pipeline import COLS_03, etapa_03_mapeamento
 
-DATA = Path("01_data/02_interim/ATOS_clean.csv")
-OUT = Path("04_docs/escopo/mapeamento_servicos.csv")
-
-df = pd.read_csv(DATA)
-servicos = (
-    df["SERVIÇO"]
-    .dropna()
-    .astype(str)
-    .str.strip()
-    .drop_duplicates()
-    .sort_values()
-)
-
-map_df = pd.DataFrame({
-    "SERVIÇO": servicos,
-    "tipo_servico": "",   # você vai preencher
-    "categoria": ""       # opcional
-})
-
-map_df.to_csv(OUT, index=False)
-print("OK! Arquivo criado em:", OUT.resolve())
-print("Total de serviços:", len(map_df))
-print("\nAmostra:")
-print(map_df.head(10))
+etapa_03_mapeamento(ler(config.CLEAN_PARQUET, COLS_03))
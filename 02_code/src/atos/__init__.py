@@ -0,0 +1 @@
+"""Núcleo compartilhado do pipeline ATOS (scripts 01–07 e dashboard)."""
@@ -0,0 +1,36 @@
+"""CLI: roda as etapas 01→07 num só processo.
+
+    PYTHONPATH=02_code/src python -m atos                 # tudo
+    PYTHONPATH=02_code/src python -m atos --etapas 05 07  # só enriquecimento + SLA
+    PYTHONPATH=02_code/src python -m atos --csv           # exporta também os CSVs
+    PYTHONPATH=02_code/src python -m atos --entrada a.xlsx b.xlsx  # várias planilhas (lidas em paralelo)
+    PYTHONPATH=02_code/src python -m atos --perfil        # mede cada etapa (05_reports/logs/perfil_*.jsonl)
+"""
+import argparse
+from pathlib import Path
+
+from . import config, instrumentacao
+from .pipeline import ETAPAS, run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="atos", description="Pipeline ATOS (etapas 01→07).")
+    parser.add_argument("--entrada", type=Path, nargs="+", default=[config.RAW],
+                        help="planilha(s) .xlsx de entrada (todas as abas ATOS de cada uma)")
+    parser.add_argument("--etapas", nargs="+", choices=ETAPAS, default=ETAPAS, help="etapas a executar")
+    parser.add_argument("--csv", action="store_true", help="exporta também os intermediários em CSV")
+    parser.add_argument("--perfil", action="store_true",
+                        help="mede tempo/memória/linhas de cada etapa e mostra o resumo no fim (o mesmo que ATOS_PERFIL=1)")
+    args = parser.parse_args(argv)
+
+    if args.perfil:
+        instrumentacao.ativar()
+
+    run(args.entrada, args.etapas, csv=args.csv)
+    if instrumentacao.ativo():
+        print("\nPerfil por etapa:")
+        print(instrumentacao.resumo().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
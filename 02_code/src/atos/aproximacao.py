@@ -0,0 +1,130 @@
+"""Correspondência aproximada (trigramas) para chaves de STATUS, SERVIÇO e CLIENTE fora dos mapeamentos.
+
+`norm_key` só resolve caixa, acento e espaços; erro de digitação ("tehado"), plural e abreviação ainda
+caem em NAO_MAPEADO. Cada chave dos mapeamentos vira um conjunto de trigramas (com bordas, como no
+pg_trgm) num índice invertido trigrama -> chaves; a similaridade de uma chave nova é a de Jaccard entre
+os trigramas, calculada só para as chaves do mapeamento que têm algum trigrama em comum com ela (não
+percorre o mapeamento inteiro). Acima do limiar do campo a correspondência é aplicada; um pouco abaixo
+(`MARGEM_SUGESTAO`), fica só como sugestão em `revisao`. Cada chave distinta é comparada uma vez por
+índice e memorizada.
+"""
+import numpy as np
+import pandas as pd
+
+from .normalizacao import norm_key, norm_key_series
+
+# similaridade mínima para aplicar; cliente é mais estrito ("cliente 35" x "cliente 357" é outro cliente)
+LIMIARES = {"STATUS": 0.6, "SERVIÇO": 0.6, "CLIENTE": 0.85}
+MARGEM_SUGESTAO = 0.2  # até isso abaixo do limiar a chave vira sugestão na revisão; mais longe é ruído
+REVISAO_COLS = ["campo", "valor", "linhas", "sugestao", "similaridade", "aplicado"]
+
+
+def trigramas(chave: str) -> set:
+    """Trigramas de cada palavra com bordas ("  p", " pi", ..., "ra "), como no pg_trgm."""
+    out = set()
+    for palavra in chave.split():
+        p = f"  {palavra} "
+        out.update(p[i:i + 3] for i in range(len(p) - 2))
+    return out
+
+
+class IndiceTrigramas:
+    """Índice invertido trigrama -> posições das `chaves`; `melhor` devolve a chave mais parecida.
+
+    Só as chaves com algum trigrama em comum com a consulta são tocadas (as listas desses trigramas);
+    a similaridade de cada uma sai da contagem de ocorrências nessas listas.
+    """
+
+    def __init__(self, chaves, minimo: float = 0.0):
+        self.chaves = list(dict.fromkeys(c for c in chaves if c))
+        self.minimo = minimo
+        listas = {}
+        self.tamanhos = np.empty(len(self.chaves), dtype=np.int32)
+        for i, c in enumerate(self.chaves):
+            tg = trigramas(c)
+            self.tamanhos[i] = len(tg)
+            for t in tg:
+                listas.setdefault(t, []).append(i)
+        self.postings = {t: np.array(v, dtype=np.int32) for t, v in listas.items()}
+        self._memo = {}
+
+    def melhor(self, chave: str) -> tuple[str | None, float]:
+        """(chave do índice mais parecida, similaridade de Jaccard dos trigramas); (None, 0.0) se nenhuma
+        chega a `minimo` (ou nada tem trigrama em comum). Empate: a que vem primeiro no mapeamento."""
+        if chave in self._memo:
+            return self._memo[chave]
+        tg = trigramas(chave)
+        listas = [self.postings[t] for t in tg if t in self.postings]
+        out = (None, 0.0)
+        if listas:
+            cand, comuns = np.unique(np.concatenate(listas), return_counts=True)
+            sim = comuns / (len(tg) + self.tamanhos[cand] - comuns)
+            i = int(np.argmax(sim))
+            if sim[i] >= self.minimo:
+                out = (self.chaves[cand[i]], float(sim[i]))
+        self._memo[chave] = out
+        return out
+
+
+class Aproximacao:
+    """Índices de trigramas das chaves de status, serviço e cliente (regras específicas) dos mapeamentos."""
+
+    def __init__(self, ms: pd.DataFrame, mserv: pd.DataFrame, sla: pd.DataFrame, limiares=None):
+        self.limiares = {**LIMIARES, **(limiares or {})}
+        clientes = sla.loc[sla["cliente"].astype(str).str.strip() != "*", "cliente"]
+        chaves = {
+            "STATUS": ms.loc[ms["billing_status"].notna(), "status_key"],
+            "SERVIÇO": mserv.loc[mserv["tipo_servico"].notna(), "servico_key"],
+            "CLIENTE": norm_key_series(clientes),
+        }
+        self.indices = {campo: IndiceTrigramas(c, max(self.limiares[campo] - MARGEM_SUGESTAO, 0.0))
+                        for campo, c in chaves.items()}
+
+    def casar(self, campo: str, chaves) -> dict:
+        """{chave: chave do mapeamento} das `chaves` (normalizadas) com similaridade acima do limiar do campo."""
+        indice, limiar = self.indices[campo], self.limiares[campo]
+        out = {}
+        for c in chaves:
+            if not c:
+                continue
+            alvo, sim = indice.melhor(c)
+            if alvo is not None and sim >= limiar:
+                out[c] = alvo
+        return out
+
+    def completar(self, campo: str, mapa: pd.DataFrame, col_chave: str, chaves: pd.Series) -> pd.DataFrame:
+        """`mapa` + uma cópia da linha casada para cada chave de `chaves` que só existe por aproximação."""
+        conhecidas = mapa[col_chave]
+        novas = pd.Index(chaves.dropna().unique()).difference(conhecidas)
+        pares = self.casar(campo, novas)
+        if not pares:
+            return mapa
+        de_para = pd.DataFrame({col_chave: list(pares), "_alvo": list(pares.values())})
+        copias = de_para.merge(mapa.rename(columns={col_chave: "_alvo"}), on="_alvo").drop(columns="_alvo")
+        return pd.concat([mapa, copias], ignore_index=True)
+
+    def canonicas(self, campo: str, chaves: list) -> list:
+        """`chaves` com as que casam por aproximação trocadas pela do mapeamento (as exatas ficam como estão)."""
+        exatas = set(self.indices[campo].chaves)
+        pares = self.casar(campo, [c for c in dict.fromkeys(chaves) if c and c not in exatas])
+        return [pares.get(c, c) for c in chaves]
+
+    def revisao(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Valores da base sem chave exata no mapeamento e com alguma sugestão (até `MARGEM_SUGESTAO` abaixo do
+        limiar), indicando se ela foi aplicada; os aplicados primeiro, do mais frequente ao menos."""
+        partes = []
+        for campo, indice in self.indices.items():
+            if campo not in df.columns:
+                continue
+            contagem = df[campo].value_counts()
+            contagem = contagem[contagem > 0]  # categóricas listam também as categorias sem linha
+            chaves = pd.Series([norm_key(v) for v in contagem.index], index=contagem.index)
+            fora = ~chaves.isin(set(indice.chaves)) & (chaves != "")
+            for valor, chave in chaves[fora].items():
+                alvo, sim = indice.melhor(chave)
+                if alvo is None:
+                    continue
+                partes.append((campo, valor, int(contagem[valor]), alvo, round(sim, 3),
+                               alvo is not None and sim >= self.limiares[campo]))
+        out = pd.DataFrame(partes, columns=REVISAO_COLS)
+        return out.sort_values(["aplicado", "linhas"], ascending=False, kind="stable").reset_index(drop=True)
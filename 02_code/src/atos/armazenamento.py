@@ -0,0 +1,87 @@
+"""Intermediários do pipeline em parquet com schema tipado (CSV só como exportação opcional)."""
+import gzip
+from pathlib import Path
+
+import pandas as pd
+
+from .config import DATE_COLS
+from .exportacao import exportar
+
+# baixa cardinalidade -> category (dicionário no parquet, volta como category na leitura)
+CATEGORY_COLS = ["CLIENTE", "STATUS", "SERVIÇO", "billing_status", "tipo_servico", "arquivo", "aba"]
+FLOAT_COLS = ["RECEITA", "receita", "sla_dias", "sla_meta_dias"]
+
+
+def tipar(df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica o schema de armazenamento (category, datetime, float) sem copiar os dados das demais colunas."""
+    df = df.copy(deep=False)
+    for c in CATEGORY_COLS:
+        if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+    for c in DATE_COLS:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+    for c in FLOAT_COLS:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("float64")
+    return df
+
+
+def salvar(df: pd.DataFrame, path: Path, csv_path: Path | None = None) -> None:
+    """Grava `df` em parquet tipado; se `csv_path` for informado, exporta também em CSV (em blocos; `.csv.gz` sai compactado)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tipar(df).to_parquet(path, index=False)
+    if csv_path is not None:
+        exportar(df, csv_path, gzip=csv_path.suffix == ".gz")
+
+
+def salvar_blocos(blocos, path: Path, csv_path: Path | None = None):
+    """Como `salvar`, para frames em blocos (mesmas colunas e dtypes): grava cada bloco e o repassa adiante.
+
+    É um gerador: quem o consome (ex.: `qualidade.perfilar`) recebe os blocos já gravados, e a base nunca
+    fica inteira em memória. Os arquivos são escritos em `.tmp` e só trocam de nome quando o último bloco
+    passa; sem nenhum bloco, nada é gravado.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmps = [path.with_name(path.name + ".tmp")]
+    if csv_path is not None:
+        tmps.append(csv_path.with_name(csv_path.name + ".tmp"))
+    w = texto = None
+    pronto = False
+    try:
+        for b in blocos:
+            t = pa.Table.from_pandas(tipar(b), schema=None if w is None else w.schema, preserve_index=False)
+            if w is None:
+                # category: dicionário com índice int32 em todos os blocos (o 1º pode ter vindo int8)
+                schema = pa.schema([pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type))
+                                    if pa.types.is_dictionary(f.type) else f for f in t.schema],
+                                   metadata=t.schema.metadata)
+                w = pq.ParquetWriter(tmps[0], schema)
+                t = t.cast(schema)
+            w.write_table(t)
+            if csv_path is not None:
+                cabecalho = texto is None
+                if cabecalho:
+                    abrir = gzip.open if csv_path.suffix == ".gz" else open
+                    texto = abrir(tmps[1], "wt", encoding="utf-8", newline="")
+                b.to_csv(texto, index=False, header=cabecalho)
+            yield b
+        pronto = w is not None
+    finally:
+        if w is not None:
+            w.close()
+        if texto is not None:
+            texto.close()
+        for tmp, destino in zip(tmps, [path, csv_path]):
+            if pronto:
+                tmp.replace(destino)
+            else:
+                tmp.unlink(missing_ok=True)
+
+
+def ler(path: Path, colunas: list[str] | None = None) -> pd.DataFrame:
+    """Lê um intermediário parquet; `colunas` limita a leitura ao que a etapa usa."""
+    return pd.read_parquet(path, columns=colunas)
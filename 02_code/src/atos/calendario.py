@@ -0,0 +1,107 @@
+"""Calendário de dias úteis por UF para o SLA, a partir das tabelas locais de feriados.
+
+`feriados_nacionais.csv` (data, nome, desde) e `feriados_estaduais.csv` (uf, data, nome, desde):
+data "MM-DD" repete todo ano (a partir de `desde`, se preenchido) e "AAAA-MM-DD" vale só naquele dia.
+Para cada UF é pré-calculado o acumulado de dias úteis (seg–sex, fora feriados nacionais e da UF),
+dia a dia; a duração em dias úteis de (início, fim] é `acum[fim] - acum[início]`, um lookup vetorizado
+sem laço por linha. UF desconhecida ou nula usa só os feriados nacionais.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+CORRIDOS, UTEIS = "corridos", "uteis"
+MODOS = (CORRIDOS, UTEIS)
+
+NACIONAL = ""  # linha do calendário só com feriados nacionais
+
+
+def ler_feriados(path, uf: str | None = None) -> pd.DataFrame:
+    """Tabela de feriados (uf, data, desde); `uf` preenche a coluna quando o arquivo é nacional."""
+    fer = pd.read_csv(path, dtype=str, keep_default_na=False)
+    out = pd.DataFrame({
+        "uf": fer["uf"].str.strip().str.upper() if uf is None else uf,
+        "data": fer["data"].str.strip(),
+        "desde": pd.to_numeric(fer.get("desde", ""), errors="coerce"),
+    })
+    ruins = out[~out["data"].str.fullmatch(r"(\d{4}-)?\d{2}-\d{2}")]
+    if len(ruins):
+        raise ValueError(f"{path}: data de feriado inválida (use MM-DD ou AAAA-MM-DD): {ruins['data'].tolist()}")
+    return out
+
+
+class Calendario:
+    """Acumulado de dias úteis por UF; o intervalo de anos cresce sob demanda."""
+
+    def __init__(self, feriados: pd.DataFrame):
+        self.feriados = feriados
+        self.ufs = [NACIONAL] + sorted(u for u in feriados["uf"].unique() if u != NACIONAL)
+        self._linha = {u: i for i, u in enumerate(self.ufs)}
+        self._lock = threading.Lock()
+        self.anos = None  # (primeiro, último) cobertos
+        self.origem = None
+        self.acum = None  # (n_ufs, n_dias) int32
+
+    def _datas(self, anos: range) -> pd.DataFrame:
+        """(linha da UF, dia) de todos os feriados nos `anos`."""
+        fer = self.feriados
+        fixos = fer[fer["data"].str.len() == 5]
+        partes = [fer[fer["data"].str.len() == 10].assign(dia=lambda d: pd.to_datetime(d["data"]))]
+        for ano in anos:
+            f = fixos[~(fixos["desde"] > ano)]
+            partes.append(f.assign(dia=pd.to_datetime(str(ano) + "-" + f["data"], errors="coerce")))
+        datas = pd.concat(partes, ignore_index=True).dropna(subset=["dia"])
+        return pd.DataFrame({"linha": datas["uf"].map(self._linha), "dia": datas["dia"].to_numpy("datetime64[D]")})
+
+    def _montar(self, primeiro: int, ultimo: int) -> None:
+        origem = np.datetime64(f"{primeiro}-01-01", "D")
+        dias = np.arange(origem, np.datetime64(f"{ultimo + 1}-01-01", "D"))
+        util = np.broadcast_to(np.is_busday(dias), (len(self.ufs), len(dias))).copy()
+
+        fer = self._datas(range(primeiro, ultimo + 1))
+        fer = fer[(fer["dia"] >= dias[0]) & (fer["dia"] <= dias[-1])]
+        pos = (fer["dia"].to_numpy("datetime64[D]") - origem).astype(np.int64)
+        nacionais = fer["linha"].to_numpy() == 0
+        util[:, pos[nacionais]] = False
+        util[fer["linha"].to_numpy()[~nacionais], pos[~nacionais]] = False
+
+        self.anos, self.origem, self.acum = (primeiro, ultimo), origem, np.cumsum(util, axis=1, dtype=np.int32)
+
+    def _cobrir(self, datas: np.ndarray) -> tuple:
+        """(origem, acum) cobrindo os anos de `datas` (remonta, ampliando, se preciso)."""
+        validas = datas[~np.isnat(datas)]
+        with self._lock:
+            if len(validas):
+                primeiro = int(str(validas.min())[:4])
+                ultimo = int(str(validas.max())[:4])
+                if self.anos is None or primeiro < self.anos[0] or ultimo > self.anos[1]:
+                    if self.anos is not None:
+                        primeiro, ultimo = min(primeiro, self.anos[0]), max(ultimo, self.anos[1])
+                    self._montar(primeiro, ultimo)
+            return self.origem, self.acum
+
+    def dias_uteis(self, inicio, fim, uf) -> np.ndarray:
+        """Dias úteis em (inicio, fim] por linha (float; NaN se faltar uma das datas), no calendário da `uf` da linha.
+
+        `fim` pode ser um único instante, comum a todas as linhas.
+        """
+        ini = pd.to_datetime(pd.Series(inicio), errors="coerce").to_numpy("datetime64[D]")
+        fin = pd.to_datetime(pd.Series(fim), errors="coerce").to_numpy("datetime64[D]")
+        fin = np.broadcast_to(fin, ini.shape) if len(fin) == 1 else fin
+        origem, acum = self._cobrir(np.concatenate([ini, fin]))
+
+        codes, ufs = pd.factorize(pd.Series(uf, dtype="string").str.strip().str.upper())
+        linhas = np.array([self._linha.get(u, 0) for u in ufs] + [0], dtype=np.intp)[codes]
+
+        out = np.full(len(ini), np.nan)
+        ok = ~(np.isnat(ini) | np.isnat(fin))
+        if ok.any():
+            i = (ini[ok] - origem).astype(np.intp)
+            f = (fin[ok] - origem).astype(np.intp)
+            out[ok] = acum[linhas[ok], f] - acum[linhas[ok], i]
+        return out
+
+
+def carregar_calendario(nacionais, estaduais) -> Calendario:
+    return Calendario(pd.concat([ler_feriados(nacionais, uf=NACIONAL), ler_feriados(estaduais)], ignore_index=True))
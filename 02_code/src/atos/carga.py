@@ -0,0 +1,126 @@
+"""Carga de uploads em segundo plano: leitura + enriquecimento num pool de threads, com progresso e cancelamento.
+
+`FilaCargas.pedir(chave, sessao, construir)` devolve a `Carga` da chave (a mesma para todas as sessões que
+pedem o mesmo conteúdo); `construir(progresso)` roda no pool e vai marcando etapa e fração em `progresso`,
+que o app lê para a barra. Quando a sessão pede outra chave (novo upload) ou solta a que tinha, a carga sem
+nenhuma sessão interessada é cancelada: o próximo `progresso.marcar` levanta `Cancelada`. O resultado só é
+publicado (no registro de bases, pelo app) depois de pronto, então a sessão segue com a base anterior até lá.
+
+A mesma fila serve a outros trabalhos longos da sessão (ex.: relatórios em lote); com `liberar`, o resultado
+de uma carga pronta que sai da fila (nenhuma sessão a espera mais, ou expirou) é liberado (ex.: fecha o
+arquivo temporário).
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+EXPIRA = 10 * 60  # carga terminada e não adotada por nenhuma sessão sai da fila depois disso (s)
+
+
+class Cancelada(BaseException):
+    """Carga cancelada. BaseException (como KeyboardInterrupt) para atravessar os `except Exception`
+    que isolam o erro de um arquivo/aba sem interromper os demais."""
+
+
+class Progresso:
+    """Etapa, fração (0–1) e detalhe da carga; `marcar` também é o ponto de cancelamento."""
+
+    def __init__(self):
+        self._cancelada = threading.Event()
+        self.estado = ("Na fila", 0.0, "")
+
+    def marcar(self, etapa: str, fracao: float, detalhe: str = "") -> None:
+        self.checar()
+        self.estado = (etapa, min(max(float(fracao), 0.0), 1.0), detalhe)
+
+    def checar(self) -> None:
+        if self._cancelada.is_set():
+            raise Cancelada
+
+    def cancelar(self) -> None:
+        self._cancelada.set()
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelada.is_set()
+
+
+@dataclass
+class Carga:
+    chave: tuple
+    futuro: Future
+    progresso: Progresso
+    sessoes: set = field(default_factory=set)
+    fim: float | None = None  # monotonic do término
+
+
+class FilaCargas:
+    """Cargas por chave (hash do upload + versão dos mapeamentos), no máximo uma por sessão."""
+
+    def __init__(self, max_workers: int = 1, expira: float = EXPIRA, liberar=None, nome: str = "carga"):
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix=nome)
+        self._cargas: dict[tuple, Carga] = {}
+        self._sessao: dict[str, tuple] = {}  # sessão -> chave que ela espera
+        self._lock = threading.Lock()
+        self.expira = expira
+        self.liberar = liberar
+
+    def pedir(self, chave: tuple, sessao: str, construir) -> Carga:
+        """Carga da `chave` (começa uma se não houver, ou se a anterior foi cancelada); a carga que a
+        `sessao` esperava antes é solta e, se ninguém mais a espera, cancelada."""
+        with self._lock:
+            self._expirar()
+            if self._sessao.get(sessao) != chave:
+                self._soltar(sessao)
+            c = self._cargas.get(chave)
+            if c is None or c.progresso.cancelada:
+                progresso = Progresso()
+                c = self._cargas[chave] = Carga(chave, self._pool.submit(self._rodar, construir, progresso), progresso)
+                c.futuro.add_done_callback(lambda _, c=c: setattr(c, "fim", time.monotonic()))
+            c.sessoes.add(sessao)
+            self._sessao[sessao] = chave
+            return c
+
+    def da_sessao(self, sessao: str) -> Carga | None:
+        """Carga que a `sessao` espera (ou já pronta e ainda não solta), se houver."""
+        with self._lock:
+            self._expirar()
+            return self._cargas.get(self._sessao.get(sessao))
+
+    @staticmethod
+    def _rodar(construir, progresso: Progresso):
+        progresso.checar()  # cancelada ainda na fila
+        return construir(progresso)
+
+    def soltar(self, sessao: str) -> None:
+        """A sessão não espera mais carga nenhuma (adotou o resultado ou desistiu)."""
+        with self._lock:
+            self._soltar(sessao)
+
+    def _soltar(self, sessao: str) -> None:
+        chave = self._sessao.pop(sessao, None)
+        c = self._cargas.get(chave)
+        if c is None:
+            return
+        c.sessoes.discard(sessao)
+        if not c.sessoes:
+            if not c.futuro.done():
+                c.progresso.cancelar()
+                c.futuro.cancel()
+            del self._cargas[chave]
+            self._liberar(c)
+
+    def _expirar(self) -> None:
+        agora = time.monotonic()
+        for chave in [k for k, c in self._cargas.items() if c.fim is not None and agora - c.fim > self.expira]:
+            c = self._cargas.pop(chave)
+            for s in c.sessoes:
+                self._sessao.pop(s, None)
+            self._liberar(c)
+
+    def _liberar(self, c: Carga) -> None:
+        """Resultado de uma carga que saiu da fila; se ela ainda roda, quando terminar."""
+        if self.liberar is not None:
+            c.futuro.add_done_callback(
+                lambda f: self.liberar(f.result()) if not f.cancelled() and f.exception() is None else None)
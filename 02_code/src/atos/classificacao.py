@@ -0,0 +1,89 @@
+"""Classificação automática de SERVIÇO em tipo_servico/categoria por palavras-chave.
+
+As regras vêm de `regras_classificacao.csv` (tipo_servico, categoria, termo), em ordem de prioridade:
+vale o primeiro tipo com algum termo contido no serviço (minúsculo, sem espaços nas pontas). Todas as
+regras viram uma única regex — uma alternância de lookaheads, tentada na ordem do arquivo, então a
+precedência é a mesma da cadeia de `if`s — e cada serviço distinto é classificado uma vez e memorizado.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from .config import REGRAS_CLASSIFICACAO
+
+
+def _chave(service) -> str:
+    return str(service).strip().lower()
+
+
+class Classificador:
+    """Regras compiladas num só padrão; `classificar` trabalha sobre os valores distintos da série."""
+
+    def __init__(self, regras: pd.DataFrame):
+        termos = regras["termo"].fillna("").astype(str)
+        if (termos == "").any():
+            raise ValueError("regras de classificação: termo vazio")
+        # só linhas seguidas do mesmo (tipo, categoria) dividem um grupo: um tipo que reaparece mais abaixo
+        # no arquivo ganha outro grupo, na posição dele, e a prioridade continua a ordem das linhas
+        self.saidas, grupos = [], []
+        for tipo, cat, termo in zip(regras["tipo_servico"], regras["categoria"].fillna(""), termos):
+            saida = (str(tipo).strip(), str(cat).strip())
+            if not self.saidas or self.saidas[-1] != saida:
+                self.saidas.append(saida)
+                grupos.append([])
+            grupos[-1].append(termo.lower())
+        # cada grupo é um lookahead seguido de um grupo vazio; o grupo que casou (lastindex) diz o tipo
+        self.padrao = re.compile("|".join(
+            "(?=.*?(?:" + "|".join(map(re.escape, ts)) + "))()" for ts in grupos), re.DOTALL)
+        self._memo = {}
+
+    def classificar_um(self, service) -> tuple[str, str]:
+        """(tipo_servico, categoria) de um serviço; ("", "") se nenhuma regra casa."""
+        chave = _chave(service)
+        out = self._memo.get(chave)
+        if out is None:
+            m = self.padrao.match(chave)
+            out = self.saidas[m.lastindex - 1] if m else ("", "")
+            self._memo[chave] = out
+        return out
+
+    def classificar(self, servicos: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+        """(tipos, categorias) de cada linha; a regex roda uma vez por valor distinto ainda não visto."""
+        codes, uniques = pd.factorize(servicos)
+        res = [self.classificar_um(u) for u in uniques] + [("", "")]  # último código: nulo
+        tipos = np.array([t for t, _ in res], dtype=object)
+        cats = np.array([c for _, c in res], dtype=object)
+        return tipos[codes], cats[codes]
+
+
+def carregar_classificador(path=REGRAS_CLASSIFICACAO) -> Classificador:
+    return Classificador(pd.read_csv(path, dtype=str, keep_default_na=False))
+
+
+_padrao: Classificador | None = None
+
+
+def classify(service: str) -> tuple[str, str]:
+    global _padrao
+    if _padrao is None:
+        _padrao = carregar_classificador()
+    return _padrao.classificar_um(service)
+
+
+def autoclassificar(df: pd.DataFrame, classificador: Classificador | None = None) -> pd.DataFrame:
+    """Preenche tipo_servico/categoria apenas onde estão vazios."""
+    df = df.copy()
+
+    # Trata NaN como vazio
+    df["tipo_servico"] = df.get("tipo_servico", "").fillna("").astype(str)
+    df["categoria"] = df.get("categoria", "").fillna("").astype(str)
+
+    vazio = (df["tipo_servico"].str.strip() == "").to_numpy()
+    if vazio.any():
+        tipos, cats = (classificador or carregar_classificador()).classificar(df.loc[vazio, "SERVIÇO"])
+        df.loc[vazio, "tipo_servico"] = tipos
+        df.loc[vazio, "categoria"] = cats
+    df.loc[~vazio, "tipo_servico"] = df.loc[~vazio, "tipo_servico"].str.strip()
+    df.loc[~vazio, "categoria"] = df.loc[~vazio, "categoria"].str.strip()
+    return df
@@ -0,0 +1,100 @@
+"""Representação compacta da base enriquecida mantida em memória pelo dashboard.
+
+- texto de baixa cardinalidade (CLIENTE, STATUS, SERVIÇO, tipo_servico, billing_status, UF,
+  mes_autorizacao, ...) vira category: códigos inteiros + um dicionário por coluna, compartilhado
+  por todo recorte/filtro da base; `sla_resultado` usa um dicionário fixo, o mesmo em todas as bases;
+- números são rebaixados (float32, ints menores) só quando a conversão é exata.
+
+Os valores não mudam: KPIs, tabelas, filtros e exportação saem iguais aos da base original.
+"""
+import numpy as np
+import pandas as pd
+
+from .instrumentacao import medido
+
+# acima desta fração de valores distintos o dicionário não compensa (ex.: OS, CHAMADO, PONTO)
+MAX_DISTINTOS = 0.5
+
+DICIONARIOS = {
+    "sla_resultado": pd.CategoricalDtype(["DENTRO", "FORA", "SEM_DADO"]),
+}
+
+RELATORIO_COLS = ["coluna", "tipo_antes", "tipo_depois", "bytes_antes", "bytes_depois", "economia"]
+
+
+def _texto(s: pd.Series) -> bool:
+    return pd.api.types.is_string_dtype(s.dtype) or s.dtype == object
+
+
+def _categoria(s: pd.Series) -> pd.Series:
+    dtype = DICIONARIOS.get(s.name)
+    if dtype is not None and s.dropna().isin(dtype.categories).all():
+        return s.astype(dtype)
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+    if _texto(s) and len(s) and s.nunique(dropna=True) <= MAX_DISTINTOS * len(s):
+        return s.astype("category")
+    return s
+
+
+def _rebaixar(s: pd.Series) -> pd.Series:
+    """float64 -> float32 / int64 -> menor int, só se todos os valores sobrevivem à ida e volta."""
+    if s.dtype == np.float64:
+        x = s.to_numpy()
+        x32 = x.astype(np.float32)
+        if np.array_equal(x32.astype(np.float64), x, equal_nan=True):
+            return pd.Series(x32, index=s.index, name=s.name)
+    elif s.dtype.kind in "iu" and s.dtype.itemsize > 1:
+        return pd.to_numeric(s, downcast="integer" if s.dtype.kind == "i" else "unsigned")
+    return s
+
+
+@medido()
+def compactar(df: pd.DataFrame, excluir=()) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(base compacta, bytes por coluna antes/depois). Colunas em `excluir` ficam como estão."""
+    antes = df.memory_usage(deep=True, index=False)
+    tipos = df.dtypes
+
+    novas = {}
+    for c in df.columns:
+        if c in excluir:
+            continue
+        orig = df[c]
+        s = _categoria(orig)
+        s = _rebaixar(s) if s is orig else s
+        if s is not orig:
+            novas[c] = s
+    if novas:
+        df = df.assign(**novas)
+
+    depois = df.memory_usage(deep=True, index=False)
+    relatorio = pd.DataFrame({
+        "coluna": antes.index,
+        "tipo_antes": [str(tipos[c]) for c in antes.index],
+        "tipo_depois": [str(df[c].dtype) for c in antes.index],
+        "bytes_antes": antes.to_numpy(),
+        "bytes_depois": depois.to_numpy(),
+    }, columns=RELATORIO_COLS[:-1])
+    relatorio["economia"] = relatorio["bytes_antes"] - relatorio["bytes_depois"]
+    return df, relatorio
+
+
+def _valores(s: pd.Series) -> list:
+    return list(s.cat.categories) if isinstance(s.dtype, pd.CategoricalDtype) else list(s.dropna().unique())
+
+
+def concatenar(partes: list[pd.DataFrame]) -> pd.DataFrame:
+    """`pd.concat` que mantém as colunas category: dicionários diferentes viram a união (ordenada),
+    em vez de a coluna voltar a object."""
+    partes = [p for p in partes if len(p)] or partes[:1]
+    if len(partes) > 1:
+        for c in partes[0].columns:
+            dtypes = [p[c].dtype for p in partes]
+            if not any(isinstance(d, pd.CategoricalDtype) for d in dtypes) or all(d == dtypes[0] for d in dtypes):
+                continue
+            try:
+                dtype = pd.CategoricalDtype(sorted({v for p in partes for v in _valores(p[c])}))
+            except TypeError:  # valores de tipos misturados: sem ordem -> sem dicionário
+                dtype = object
+            partes = [p.assign(**{c: p[c].astype(dtype)}) for p in partes]
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,31 @@
+"""Caminhos do projeto (relativos à raiz do repositório, de onde scripts e app são executados) e colunas da planilha."""
+from pathlib import Path
+
+RAW = Path("01_data/01_raw/ATOS.xlsx")
+
+INTERIM_DIR = Path("01_data/02_interim")
+PROCESSED_DIR = Path("01_data/03_processed")
+EXPORTS_DIR = Path("01_data/04_exports")
+LOGS_DIR = Path("05_reports/logs")
+
+ESCOPO_DIR = Path("04_docs/escopo")
+MAP_STATUS = ESCOPO_DIR / "mapeamento_status_financeiro.csv"
+MAP_SERV_BASE = ESCOPO_DIR / "mapeamento_servicos.csv"
+MAP_SERV = ESCOPO_DIR / "mapeamento_servicos_autofill.csv"
+SLA_CAD = ESCOPO_DIR / "cadastro_sla.csv"
+REGRAS_CLASSIFICACAO = ESCOPO_DIR / "regras_classificacao.csv"
+FERIADOS_NACIONAIS = ESCOPO_DIR / "feriados_nacionais.csv"
+FERIADOS_ESTADUAIS = ESCOPO_DIR / "feriados_estaduais.csv"
+
+LOGO_PATH = Path("04_docs/logos/logo3.jpeg")
+
+# intermediários (parquet tipado) + exportações CSV opcionais
+CLEAN_PARQUET = INTERIM_DIR / "ATOS_clean.parquet"
+CLEAN_CSV = INTERIM_DIR / "ATOS_clean.csv"
+ENRIQUECIDO_PARQUET = PROCESSED_DIR / "atos_enriquecido.parquet"
+ENRIQUECIDO_CSV = PROCESSED_DIR / "atos_enriquecido.csv"
+COM_SLA_PARQUET = PROCESSED_DIR / "atos_com_sla.parquet"
+COM_SLA_CSV = EXPORTS_DIR / "atos_com_sla.csv"
+
+TEXT_COLS = ["CLIENTE", "PONTO", "UF", "GESTOR", "CHAMADO", "OS", "SERVIÇO", "STATUS"]
+DATE_COLS = ["AUTORIZAÇÃO", "TÉRMINO"]
@@ -0,0 +1,354 @@
+"""Cubo de KPIs pré-agregado para as abas do dashboard e o relatório Word.
+
+Grão: CLIENTE × tipo_servico × mes_autorizacao × billing_status × sla_resultado.
+Medidas aditivas por célula (linhas, OS não nulas, receita, soma/contagem de sla_dias)
++ tabelas esparsas de contagens, mergeáveis e subtraíveis, para o que não é aditivo:
+
+- (célula, CHAMADO) -> n     : chamados únicos exatos em qualquer recorte;
+- (célula, sla_dias) -> n    : mediana exata;
+- (célula, AUTORIZAÇÃO) -> n : faixa de datas;
+- linhas FORA (célula, id, atraso) : casos críticos sem varrer a base.
+
+Um recorte da sidebar vira uma máscara sobre as células; cada card, gráfico e seção do
+relatório é um rollup dessas células. Como tudo é contagem, `atualizar` aplica um delta
+(linhas removidas/inseridas) sem reconstruir o cubo.
+
+As tabelas são contagens exatas, não sketches (HLL, t-digest): só contagem dá para subtrair no
+`atualizar`, e com este grão (~0,3 célula por linha numa base de 1M) registros de HLL por célula
+ocupariam mais que os pares. Tamanho máximo de cada tabela (inteiros em int32):
+
+- pares    <= linhas com CHAMADO;
+- hist_sla <= min(linhas com sla_dias, células × valores distintos de sla_dias);
+- hist_aut <= min(linhas com AUTORIZAÇÃO, células × dias distintos);
+- fora     =  linhas FORA.
+
+`memoria()` dá o tamanho de cada parte; o benchmark registra isso por tamanho de base.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DIMENSOES = ["CLIENTE", "tipo_servico", "mes_autorizacao", "billing_status", "sla_resultado"]
+MEDIDAS = ["linhas", "n_os", "receita", "sla_soma", "sla_n"]
+PENDENCIAS = ["PENDENTE_FATURAMENTO", "FATURADO_PENDENTE"]
+# colunas da base que `criticos` devolve (o relatório lista cliente, ponto, tipo, OS e chamado)
+CRITICOS_COLS = ["CLIENTE", "PONTO", "tipo_servico", "OS", "CHAMADO"]
+
+# tabelas de contagem: nome -> coluna do valor (além de "cel" e "n")
+_CONTAGENS = {"pares": "chamado", "hist_sla": "valor", "hist_aut": "data"}
+# códigos e contagens das tabelas guardados em int32 (nº de células, chamados e linhas < 2^31)
+_INT32 = ["cel", "chamado", "n"]
+
+
+def _mediana_ponderada(grupos: np.ndarray, valores: np.ndarray, pesos: np.ndarray, n_grupos: int) -> np.ndarray:
+    """Mediana por grupo a partir de (grupo, valor, contagem); NaN p/ grupos sem dados."""
+    ordem = np.lexsort((valores, grupos))
+    grupos, valores, pesos = grupos[ordem], valores[ordem], pesos[ordem]
+
+    total = np.bincount(grupos, weights=pesos, minlength=n_grupos)
+    inicio = np.concatenate([[0], np.cumsum(total)[:-1]])
+    acum = np.cumsum(pesos)
+
+    out = np.full(n_grupos, np.nan)
+    com_dado = np.flatnonzero(total > 0)
+    if len(com_dado) == 0:
+        return out
+    n = total[com_dado]
+    k1 = inicio[com_dado] + (n - 1) // 2
+    k2 = inicio[com_dado] + n // 2
+    v1 = valores[np.searchsorted(acum, k1, side="right")]
+    v2 = valores[np.searchsorted(acum, k2, side="right")]
+    out[com_dado] = (v1 + v2) / 2
+    return out
+
+
+def _contar(cel: np.ndarray, valores: np.ndarray, nome: str, sinal: int = 1) -> pd.DataFrame:
+    """(cel, valor) -> contagem, sem ordenar (factorize + bincount)."""
+    if len(cel) == 0:
+        return pd.DataFrame({"cel": np.empty(0, np.int64), nome: valores[:0], "n": np.empty(0, np.int64)})
+    val, val_u = pd.factorize(valores)
+    largura = max(1, len(val_u))
+    k, k_u = pd.factorize(cel.astype(np.int64) * largura + val)
+    return pd.DataFrame({
+        "cel": k_u // largura,
+        nome: np.asarray(val_u)[k_u % largura],
+        "n": sinal * np.bincount(k, minlength=len(k_u)),
+    })
+
+
+def _somar(partes: list[pd.DataFrame], chaves: list[str]) -> pd.DataFrame:
+    """Soma contagens de várias partes e descarta as que zeraram."""
+    df = pd.concat(partes, ignore_index=True)
+    df = df.groupby(chaves, sort=False, as_index=False)["n"].sum()
+    return df[df["n"] != 0].reset_index(drop=True)
+
+
+class CuboKPI:
+    """Use `CuboKPI.de_base(df)`; o índice de `df` precisa ser único (é o id das linhas)."""
+
+    def __init__(self, df: pd.DataFrame, celulas: pd.DataFrame, tabelas: dict, chamados: pd.Index):
+        self.df = df
+        self.celulas = celulas
+        self.tabelas = {nome: t.astype({c: np.int32 for c in _INT32 if c in t.columns}) for nome, t in tabelas.items()}
+        self.chamados = chamados
+        self._compilar()
+
+    # ---------------- construção ----------------
+    @classmethod
+    def de_base(cls, df: pd.DataFrame) -> "CuboKPI":
+        celulas, cel = cls._celulas_de(df)
+        chamados = pd.Index(df["CHAMADO"].dropna().unique())
+        tabelas, medidas = cls._agregar(df, cel, len(celulas), chamados)
+        for m, v in medidas.items():
+            celulas[m] = v
+        return cls(df, celulas, tabelas, chamados)
+
+    @staticmethod
+    def _celulas_de(df: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray]:
+        """Dimensões distintas (uma linha por célula) + id da célula de cada linha."""
+        codes, uniques = [], []
+        for dim in DIMENSOES:
+            c, u = pd.factorize(df[dim])
+            codes.append(np.where(c < 0, len(u), c))
+            uniques.append(np.array(list(u) + [np.nan], dtype=object))
+        formas = tuple(len(u) for u in uniques)
+        cel, chaves = pd.factorize(np.ravel_multi_index(codes, formas))
+        partes = np.unravel_index(chaves, formas)
+        celulas = pd.DataFrame({dim: u[p] for dim, u, p in zip(DIMENSOES, uniques, partes)})
+        return celulas, cel.astype(np.int64)
+
+    @staticmethod
+    def _agregar(df: pd.DataFrame, cel: np.ndarray, n_cel: int, chamados: pd.Index, sinal: int = 1):
+        receita = df["receita"].to_numpy(dtype=float)
+        sla_dias = pd.to_numeric(df["sla_dias"], errors="coerce").to_numpy(dtype=float)
+        tem_sla = ~np.isnan(sla_dias)
+        aut = df["AUTORIZAÇÃO"].to_numpy(dtype="datetime64[ns]")
+        tem_aut = ~np.isnat(aut)
+
+        medidas = {
+            "linhas": sinal * np.bincount(cel, minlength=n_cel),
+            "n_os": sinal * np.bincount(cel, weights=df["OS"].notna().to_numpy(), minlength=n_cel).astype(np.int64),
+            "receita": sinal * np.bincount(cel, weights=receita, minlength=n_cel),
+            "sla_soma": sinal * np.bincount(cel[tem_sla], weights=sla_dias[tem_sla], minlength=n_cel),
+            "sla_n": sinal * np.bincount(cel[tem_sla], minlength=n_cel),
+        }
+
+        ch = pd.Index(chamados).get_indexer(df["CHAMADO"])  # índice temporário: a hash table não fica no cubo
+        tem_ch = ch >= 0
+
+        fora = np.flatnonzero(df["sla_resultado"].to_numpy() == "FORA")
+        meta = pd.to_numeric(df["sla_meta_dias"], errors="coerce").to_numpy(dtype=float)
+        atraso = np.nan_to_num(sla_dias[fora] - meta[fora], nan=0.0)
+
+        tabelas = {
+            "pares": _contar(cel[tem_ch], ch[tem_ch], "chamado", sinal),
+            "hist_sla": _contar(cel[tem_sla], sla_dias[tem_sla], "valor", sinal),
+            "hist_aut": _contar(cel[tem_aut], aut[tem_aut], "data", sinal),
+            "fora": pd.DataFrame({"cel": cel[fora], "id": df.index.to_numpy()[fora], "atraso": atraso}),
+        }
+        return tabelas, medidas
+
+    # ---------------- atualização incremental ----------------
+    def atualizar(self, df: pd.DataFrame, removidas: pd.DataFrame, inseridas: pd.DataFrame) -> "CuboKPI":
+        """Cubo da base `df` = base anterior - `removidas` + `inseridas` (índices = ids das linhas)."""
+        celulas = self.celulas[DIMENSOES + MEDIDAS].copy()
+        novos_ch = pd.Index(inseridas["CHAMADO"].dropna().unique()).difference(pd.Index(self.chamados))
+        chamados = self.chamados.append(novos_ch)
+        partes = {nome: [self.tabelas[nome]] for nome in _CONTAGENS}
+        fora = [self.tabelas["fora"][~self.tabelas["fora"]["id"].isin(removidas.index)]]
+
+        for sinal, linhas in ((-1, removidas), (1, inseridas)):
+            if len(linhas) == 0:
+                continue
+            loc, cel_loc = self._celulas_de(linhas)
+
+            # células do delta -> ids globais (células novas entram no fim)
+            mapa = loc.merge(celulas[DIMENSOES].reset_index(), on=DIMENSOES, how="left")["index"]
+            novas = mapa.isna().to_numpy()
+            glob = mapa.to_numpy(dtype=float, copy=True)
+            glob[novas] = np.arange(len(celulas), len(celulas) + novas.sum())
+            if novas.any():
+                celulas = pd.concat([celulas, loc[novas].assign(**{m: 0 for m in MEDIDAS})], ignore_index=True)
+            cel = glob.astype(np.int64)[cel_loc]
+
+            tabelas, medidas = self._agregar(linhas, cel, len(celulas), chamados, sinal)
+            for m, v in medidas.items():
+                celulas[m] = celulas[m].to_numpy() + v
+            for nome in _CONTAGENS:
+                partes[nome].append(tabelas[nome])
+            if sinal > 0:
+                fora.append(tabelas["fora"])
+
+        tabelas = {nome: _somar(partes[nome], ["cel", col]) for nome, col in _CONTAGENS.items()}
+        tabelas["fora"] = pd.concat(fora, ignore_index=True)
+
+        # compacta: descarta células que ficaram vazias e renumera
+        vivas = celulas["linhas"].to_numpy() > 0
+        novo_id = np.cumsum(vivas) - 1
+        celulas = celulas[vivas].reset_index(drop=True)
+        for nome, t in tabelas.items():
+            cel = t["cel"].to_numpy()
+            tabelas[nome] = t[vivas[cel]].assign(cel=novo_id[cel[vivas[cel]]]).reset_index(drop=True)
+        return CuboKPI(df, celulas, tabelas, chamados)
+
+    def enxuto(self) -> "CuboKPI":
+        """Cópia só para consultas (ex.: relatórios em outro processo): células e tabelas; da base, só as
+        linhas FORA com `CRITICOS_COLS`, e dos chamados só a quantidade (as consultas usam os códigos)."""
+        df = None
+        if self.df is not None:
+            ids = pd.unique(self.tabelas["fora"]["id"])
+            df = self.df.loc[ids, [c for c in CRITICOS_COLS if c in self.df.columns]]
+        return CuboKPI(df, self.celulas, self.tabelas, pd.RangeIndex(len(self.chamados)))
+
+    def __getstate__(self):
+        # os arrays de `_compilar` são refeitos ao desserializar (não vão para os workers)
+        return {k: getattr(self, k) for k in ("df", "celulas", "tabelas", "chamados")}
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._compilar()
+
+    def memoria(self) -> pd.Series:
+        """MB de cada parte do cubo (células, tabelas e chamados; sem a base `df`)."""
+        partes = {"celulas": self.celulas.memory_usage(deep=True).sum()}
+        partes.update({nome: t.memory_usage(deep=True).sum() for nome, t in self.tabelas.items()})
+        partes["chamados"] = self.chamados.memory_usage(deep=True)
+        return pd.Series(partes, name="mb") / 2**20
+
+    # ---------------- persistência ----------------
+    def salvar(self, pasta: Path) -> None:
+        pasta.mkdir(parents=True, exist_ok=True)
+        self.celulas[DIMENSOES + MEDIDAS].to_parquet(pasta / "celulas.parquet", index=False)
+        for nome, t in self.tabelas.items():
+            t.to_parquet(pasta / f"{nome}.parquet", index=False)
+        pd.DataFrame({"chamado": self.chamados}).to_parquet(pasta / "chamados.parquet", index=False)
+
+    @classmethod
+    def carregar(cls, pasta: Path, df: pd.DataFrame) -> "CuboKPI":
+        celulas = pd.read_parquet(pasta / "celulas.parquet")
+        tabelas = {nome: pd.read_parquet(pasta / f"{nome}.parquet") for nome in [*_CONTAGENS, "fora"]}
+        chamados = pd.Index(pd.read_parquet(pasta / "chamados.parquet")["chamado"])
+        return cls(df, celulas, tabelas, chamados)
+
+    # ---------------- consulta ----------------
+    def _compilar(self) -> None:
+        """Códigos ordenados por dimensão (sobre as células, não as linhas) + arrays das tabelas."""
+        self.valores = {}
+        self._codes = {}
+        for dim in DIMENSOES:
+            c, u = pd.factorize(self.celulas[dim], sort=True)
+            self.valores[dim] = u.tolist()
+            self._codes[dim] = np.where(c < 0, len(u), c)
+
+        t = self.tabelas
+        self._par_celula = t["pares"]["cel"].to_numpy()
+        self._par_chamado = t["pares"]["chamado"].to_numpy(dtype=np.int64)
+        self._hist_celula = t["hist_sla"]["cel"].to_numpy()
+        self._hist_valor = t["hist_sla"]["valor"].to_numpy(dtype=float)
+        self._hist_cont = t["hist_sla"]["n"].to_numpy()
+        self._aut_celula = t["hist_aut"]["cel"].to_numpy()
+        self._aut_data = t["hist_aut"]["data"].to_numpy(dtype="datetime64[ns]")
+        self._fora_celula = t["fora"]["cel"].to_numpy()
+        self._fora_id = t["fora"]["id"].to_numpy()
+        self._fora_atraso = t["fora"]["atraso"].to_numpy(dtype=float)
+
+    def recorte(self, selecao: dict) -> "Recorte":
+        """Células que atendem a seleção da sidebar (seleção vazia numa dimensão = sem filtro)."""
+        mask = np.ones(len(self.celulas), dtype=bool)
+        for dim, sel in selecao.items():
+            if not sel:
+                continue
+            pos = {v: i for i, v in enumerate(self.valores[dim])}
+            lut = np.zeros(len(self.valores[dim]) + 1, dtype=bool)
+            lut[[pos[v] for v in sel if v in pos]] = True
+            mask &= lut[self._codes[dim]]
+        return Recorte(self, mask)
+
+
+class Recorte:
+    """Rollups de um conjunto de células do cubo (equivalentes aos groupby sobre a base filtrada)."""
+
+    def __init__(self, cubo: CuboKPI, mask: np.ndarray):
+        self.cubo = cubo
+        self.mask = mask
+        self.cel = cubo.celulas[mask]
+
+    def _filtra(self, **filtros) -> pd.DataFrame:
+        cel = self.cel
+        for dim, valores in filtros.items():
+            cel = cel[cel[dim].isin(valores)]
+        return cel
+
+    # ---- totais ----
+    def total(self, medida: str, **filtros) -> float:
+        return self._filtra(**filtros)[medida].sum()
+
+    def n_linhas(self) -> int:
+        return int(self.cel["linhas"].sum())
+
+    def n_distintos(self, dim: str) -> int:
+        return int(self.cel[dim].dropna().nunique())
+
+    def faixa_autorizacao(self):
+        datas = self.cubo._aut_data[self.mask[self.cubo._aut_celula]]
+        if len(datas) == 0:
+            return pd.NaT, pd.NaT
+        return pd.Timestamp(datas.min()), pd.Timestamp(datas.max())
+
+    # ---- por dimensão ----
+    def por(self, dims, medida, **filtros):
+        """Soma de `medida` por `dims` (como `groupby(dims)[...]` sobre a base filtrada)."""
+        return self._filtra(**filtros).groupby(dims)[medida].sum()
+
+    def media_sla_por(self, dim: str) -> pd.Series:
+        g = self.cel.groupby(dim)[["sla_soma", "sla_n"]].sum()
+        return (g["sla_soma"] / g["sla_n"].where(g["sla_n"] > 0)).rename("sla_dias")
+
+    def mediana_sla_por(self, dim: str) -> pd.Series:
+        cubo = self.cubo
+        dim_cel = cubo._codes[dim]
+        n_grupos = len(cubo.valores[dim]) + 1
+        sel = self.mask[cubo._hist_celula]
+        med = _mediana_ponderada(
+            dim_cel[cubo._hist_celula[sel]], cubo._hist_valor[sel], cubo._hist_cont[sel], n_grupos
+        )
+        presentes = np.unique(dim_cel[self.mask])
+        presentes = presentes[presentes < len(cubo.valores[dim])]
+        idx = pd.Index(np.array(cubo.valores[dim], dtype=object)[presentes], name=dim)
+        return pd.Series(med[presentes], index=idx, name="sla_dias")
+
+    # ---- chamados distintos ----
+    def chamados_unicos(self) -> int:
+        cubo = self.cubo
+        presentes = np.bincount(cubo._par_chamado[self.mask[cubo._par_celula]], minlength=len(cubo.chamados))
+        return int(np.count_nonzero(presentes))
+
+    def chamados_por(self, dim: str) -> pd.Series:
+        """CHAMADO distintos por `dim` (nulos em `dim` ficam de fora, como no `dropna` + `groupby`)."""
+        cubo = self.cubo
+        largura = max(1, len(cubo.chamados))
+        sel = self.mask[cubo._par_celula]
+        grupo = cubo._codes[dim][cubo._par_celula[sel]]
+        n_valores = len(cubo.valores[dim])
+        ok = grupo < n_valores
+        pares = pd.unique(grupo[ok].astype(np.int64) * largura + cubo._par_chamado[sel][ok])
+        cont = np.bincount(pares // largura, minlength=n_valores)
+        presentes = np.flatnonzero(cont)
+        idx = pd.Index(np.array(cubo.valores[dim], dtype=object)[presentes], name=dim)
+        return pd.Series(cont[presentes], index=idx, name="CHAMADO")
+
+    # ---- casos críticos ----
+    def criticos(self, k: int = 10) -> pd.DataFrame:
+        """Linhas FORA do SLA com maior atraso (sla_dias - sla_meta_dias); empate pela ordem do id."""
+        cubo = self.cubo
+        sel = self.mask[cubo._fora_celula]
+        ids, atraso = cubo._fora_id[sel], cubo._fora_atraso[sel]
+        if len(ids) > k:
+            corte = np.partition(atraso, len(atraso) - k)[len(atraso) - k]
+            cand = atraso >= corte
+            ids, atraso = ids[cand], atraso[cand]
+        ordem = np.lexsort((ids, -atraso))[:k]
+        out = cubo.df.loc[ids[ordem]].copy()
+        out["atraso_dias"] = atraso[ordem]
+        return out
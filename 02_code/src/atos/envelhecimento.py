@@ -0,0 +1,101 @@
+"""Envelhecimento dos chamados em aberto (sem TÉRMINO): idade do SLA contada até um instante de referência.
+
+A linha aberta não tem `sla_dias` e, na base, cai em SEM_DADO; aqui a idade é contada da `base` da regra
+até `agora` (corridos ou úteis, como no cadastro) e comparada à meta:
+
+    NO_PRAZO   idade < risco × meta
+    EM_RISCO   risco × meta <= idade <= meta
+    ESTOURADO  idade > meta (o mesmo critério do FORA da base)
+    SEM_DADO   sem meta ou sem data de início
+
+O que não depende do relógio (linhas abertas, regra, meta, datas de início) é preparado uma vez por base
+em `Envelhecimento`; cada novo `agora` é só uma subtração vetorizada, e o último resultado fica guardado.
+"""
+import numpy as np
+import pandas as pd
+
+from .regras_sla import FIM, RegrasSLA, contar_dias, resolver
+
+NO_PRAZO, EM_RISCO, ESTOURADO, SEM_DADO = "NO_PRAZO", "EM_RISCO", "ESTOURADO", "SEM_DADO"
+SITUACOES = [ESTOURADO, EM_RISCO, NO_PRAZO, SEM_DADO]
+RISCO_PADRAO = 0.8  # fração da meta a partir da qual o chamado aberto está em risco
+
+FILA_COLS = ["OS", "CHAMADO", "CLIENTE", "UF", "tipo_servico", "AUTORIZAÇÃO"]
+
+
+def referencia(agora=None) -> pd.Timestamp:
+    """Instante de referência truncado no minuto: reruns no mesmo minuto reaproveitam o cálculo."""
+    return pd.Timestamp.now().floor("min") if agora is None else pd.Timestamp(agora).floor("min")
+
+
+def situacao(idade, meta, risco: float = RISCO_PADRAO) -> np.ndarray:
+    """NO_PRAZO / EM_RISCO / ESTOURADO / SEM_DADO vetorizado (idade e meta em dias)."""
+    idade = np.asarray(idade, dtype=float)
+    meta = np.asarray(meta, dtype=float)
+    return np.select(
+        [np.isnan(idade) | np.isnan(meta), idade > meta, idade >= risco * meta],
+        [SEM_DADO, ESTOURADO, EM_RISCO],
+        default=NO_PRAZO,
+    )
+
+
+class Envelhecimento:
+    """Linhas abertas de uma base com a regra de SLA já resolvida; `calcular(agora)` devolve a situação."""
+
+    def __init__(self, df: pd.DataFrame, regras: RegrasSLA, calendario=None, aproximacao=None):
+        self.posicoes = np.flatnonzero(df[FIM].isna().to_numpy())  # posições das abertas na base
+        # só as colunas da fila e as que a regra consulta (cliente, tipo, datas de início, UF): o objeto
+        # fica na sessão, e a base inteira já está no registro compartilhado
+        usadas = dict.fromkeys([*FILA_COLS, "CLIENTE", "tipo_servico", "UF", *regras.bases])
+        self.abertas = df[[c for c in usadas if c in df.columns]].take(self.posicoes)
+        self.regras, self.calendario = regras, calendario
+        self.regra = resolver(self.abertas, regras, aproximacao)
+        tem = self.regra >= 0
+        self.meta = np.full(len(self.abertas), np.nan)
+        self.meta[tem] = regras.metas[self.regra[tem]]
+        self._ultimo = (None, None)
+
+    def idade(self, agora: pd.Timestamp) -> np.ndarray:
+        """Dias de cada linha aberta, da base da regra até `agora` (NaN sem regra ou sem início)."""
+        if self._ultimo[0] != agora:
+            self._ultimo = (agora, contar_dias(self.abertas, self.regras, self.regra, agora, self.calendario))
+        return self._ultimo[1]
+
+    def calcular(self, agora: pd.Timestamp, risco: float = RISCO_PADRAO, linhas=None) -> pd.DataFrame:
+        """Linhas abertas (ou só as `linhas`, posições entre as abertas) com idade, meta, dias restantes
+        (negativo = atraso) e situação em `agora`; o índice é a posição da linha na base."""
+        linhas = np.arange(len(self.posicoes)) if linhas is None else np.asarray(linhas)
+        idade, meta = self.idade(agora)[linhas], self.meta[linhas]
+        cols = [c for c in FILA_COLS if c in self.abertas.columns]
+        out = self.abertas[cols].take(linhas).set_axis(self.posicoes[linhas])
+        out["idade_dias"] = idade
+        out["sla_meta_dias"] = meta
+        out["restante_dias"] = meta - idade
+        out["situacao"] = situacao(idade, meta, risco)
+        return out
+
+    def resumo(self, agora: pd.Timestamp, risco: float = RISCO_PADRAO, posicoes=None) -> pd.Series:
+        """Nº de abertas por situação (todas as situações, mesmo as zeradas), só nas `posicoes` da base se dadas."""
+        sel = self._selecao(posicoes)
+        s = situacao(self.idade(agora)[sel], self.meta[sel], risco)
+        return pd.Series(s).value_counts().reindex(SITUACOES, fill_value=0)
+
+    def fila(self, agora: pd.Timestamp, risco: float = RISCO_PADRAO, posicoes=None,
+             limite: int | None = None, situacoes=(ESTOURADO, EM_RISCO)) -> pd.DataFrame:
+        """Chamados que vencem primeiro (menor `restante_dias`; os já estourados no topo), nas `situacoes`.
+
+        Só as `limite` primeiras linhas são ordenadas (seleção parcial), não toda a base aberta.
+        """
+        idade = self.idade(agora)
+        restante = self.meta - idade
+        sit = situacao(idade, self.meta, risco)
+        cand = np.flatnonzero(self._selecao(posicoes) & np.isin(sit, list(situacoes)) & ~np.isnan(restante))
+        if limite is not None and limite < len(cand):
+            cand = cand[np.argpartition(restante[cand], limite - 1)[:limite]]
+        cand = cand[np.argsort(restante[cand], kind="stable")]
+        return self.calcular(agora, risco, cand)
+
+    def _selecao(self, posicoes) -> np.ndarray:
+        if posicoes is None:
+            return np.ones(len(self.posicoes), dtype=bool)
+        return np.isin(self.posicoes, posicoes, assume_unique=True)
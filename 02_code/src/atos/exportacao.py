@@ -0,0 +1,123 @@
+"""Exportação da base em blocos (CSV, Parquet, xlsx), com pico de memória constante.
+
+Cada bloco de `BLOCO` linhas é copiado (`take`), escrito no destino e descartado: durante a escrita o
+arquivo nunca existe inteiro como string/bytes em memória, seja qual for o nº de linhas. O download do
+app (`exportar_bytes`) ainda lê o arquivo pronto para a memória uma vez, para servi-lo. `gzip` compacta o CSV
+(.csv.gz) e vira o codec do Parquet; o xlsx já é um zip e não aceita `gzip`.
+"""
+import gzip as _gzip
+import io
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from .instrumentacao import etapa
+
+BLOCO = 50_000
+
+FORMATOS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+}
+LIMITE_XLSX = 1_048_575  # linhas de dados por planilha (a 1ª é o cabeçalho)
+
+
+def _blocos(df: pd.DataFrame, posicoes, bloco: int):
+    n = len(df) if posicoes is None else len(posicoes)
+    for i in range(0, n, bloco):
+        yield df.iloc[i:i + bloco] if posicoes is None else df.take(posicoes[i:i + bloco])
+
+
+def _csv(df, blocos, saida, gzip: bool) -> None:
+    alvo = _gzip.GzipFile(fileobj=saida, mode="wb", mtime=0) if gzip else saida
+    texto = io.TextIOWrapper(alvo, encoding="utf-8", newline="", write_through=True)
+    df.iloc[:0].to_csv(texto, index=False)
+    for b in blocos:
+        b.to_csv(texto, index=False, header=False)
+    texto.flush()
+    texto.detach()  # não fecha o destino (arquivo do chamador)
+    if gzip:
+        alvo.close()
+
+
+def _parquet(df, blocos, saida, gzip: bool) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # schema do 1º bloco (colunas object não têm tipo num frame vazio); os demais são convertidos a ele
+    compressao = "gzip" if gzip else "snappy"
+    w = None
+    try:
+        for b in blocos:
+            t = pa.Table.from_pandas(b, schema=None if w is None else w.schema, preserve_index=False)
+            if w is None:
+                w = pq.ParquetWriter(saida, t.schema, compression=compressao)
+            w.write_table(t)
+        if w is None:
+            pq.write_table(pa.Table.from_pandas(df.iloc[:0], preserve_index=False), saida, compression=compressao)
+    finally:
+        if w is not None:
+            w.close()
+
+
+def _xlsx(df, blocos, saida) -> None:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)  # linhas vão para um temporário em disco até o save
+    ws = wb.create_sheet("base")
+    ws.append([str(c) for c in df.columns])
+    for b in blocos:
+        valores = b.astype(object).where(b.notna(), None)
+        for linha in valores.itertuples(index=False, name=None):
+            ws.append(linha)
+    wb.save(saida)
+
+
+def exportar(df: pd.DataFrame, destino, formato: str = "csv", gzip: bool = False,
+             posicoes=None, bloco: int = BLOCO):
+    """Grava `df` (ou só as linhas `posicoes`, nessa ordem) em `destino` (caminho ou arquivo binário aberto)."""
+    if formato not in FORMATOS:
+        raise ValueError(f"formato desconhecido: {formato!r} (use {', '.join(FORMATOS)})")
+    n = len(df) if posicoes is None else len(posicoes)
+    if formato == "xlsx" and gzip:
+        raise ValueError("xlsx já é compactado; gzip vale só para csv e parquet")
+    if formato == "xlsx" and n > LIMITE_XLSX:
+        raise ValueError(f"{n} linhas não cabem numa planilha xlsx (máx. {LIMITE_XLSX}); use csv ou parquet")
+
+    if isinstance(destino, (str, Path)):
+        Path(destino).parent.mkdir(parents=True, exist_ok=True)
+        with open(destino, "wb") as saida:
+            return exportar(df, saida, formato, gzip, posicoes, bloco)
+
+    with etapa("exportar", formato=formato, gzip=gzip) as m:
+        m.linhas = n
+        blocos = _blocos(df, posicoes, bloco)
+        if formato == "csv":
+            _csv(df, blocos, destino, gzip)
+        elif formato == "parquet":
+            _parquet(df, blocos, destino, gzip)
+        else:
+            _xlsx(df, blocos, destino)
+    return destino
+
+
+def exportar_bytes(df: pd.DataFrame, formato: str = "csv", gzip: bool = False, posicoes=None) -> bytes:
+    """Conteúdo do arquivo exportado, para o download do app.
+
+    A escrita é em blocos num temporário em disco (fechado antes de voltar); o que fica em memória é
+    só o arquivo pronto, uma cópia, já que o `download_button` serve bytes (não um stream).
+    """
+    with tempfile.TemporaryFile() as tmp:
+        exportar(df, tmp, formato, gzip, posicoes)
+        tmp.seek(0)
+        return tmp.read()
+
+
+def nome_arquivo(base: str, formato: str, gzip: bool = False) -> str:
+    return base + FORMATOS[formato][1] + (".gz" if gzip and formato == "csv" else "")
+
+
+def mime(formato: str, gzip: bool = False) -> str:
+    return "application/gzip" if gzip and formato == "csv" else FORMATOS[formato][0]
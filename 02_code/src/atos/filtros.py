@@ -0,0 +1,96 @@
+"""Índice de filtro da sidebar (Cliente × Tipo de serviço × Mês), montado uma vez por base.
+
+Cada dimensão vira códigos inteiros (ordem = valores ordenados) + posições das linhas
+agrupadas por valor. Uma seleção é respondida combinando máscaras/posições e a base
+filtrada sai com um único `take`, sem `df.copy()` nem `isin` sobre o frame inteiro.
+"""
+import numpy as np
+import pandas as pd
+
+from .instrumentacao import medido
+
+DIMENSOES = ("CLIENTE", "tipo_servico", "mes_autorizacao")
+
+# abaixo desta fração de linhas selecionadas, parte das listas de posições em vez de varrer a base
+FRACAO_ESPARSA = 1 / 16
+
+
+class _Dimensao:
+    def __init__(self, s: pd.Series):
+        codes, uniques = pd.factorize(s, sort=True)
+        self.valores = uniques.tolist()
+        n_valores = len(self.valores)
+
+        # nulo -> código extra (n_valores), nunca selecionado (igual ao isin)
+        codes = np.where(codes < 0, n_valores, codes)
+        self.codes = codes.astype(np.min_scalar_type(n_valores))
+        self.contagens = np.bincount(self.codes, minlength=n_valores + 1)
+
+        # posições das linhas agrupadas por código (ordem crescente dentro de cada grupo)
+        self.ordem = np.argsort(self.codes, kind="stable")
+        self.inicio = np.concatenate([[0], np.cumsum(self.contagens)])
+        self._pos = {v: i for i, v in enumerate(self.valores)}
+
+    def codigos(self, selecao) -> np.ndarray:
+        return np.array([self._pos[v] for v in selecao if v in self._pos], dtype=np.intp)
+
+    def tabela(self, codigos: np.ndarray) -> np.ndarray:
+        """Tabela código -> selecionado (a última posição é o nulo, sempre False)."""
+        lut = np.zeros(len(self.valores) + 1, dtype=bool)
+        lut[codigos] = True
+        return lut
+
+    def posicoes(self, codigos: np.ndarray) -> np.ndarray:
+        partes = [self.ordem[self.inicio[c]:self.inicio[c + 1]] for c in codigos]
+        return np.sort(np.concatenate(partes)) if partes else np.empty(0, dtype=np.intp)
+
+
+class IndiceFiltro:
+    """Filtro por seleção de valores; seleção vazia numa dimensão = sem filtro nela."""
+
+    def __init__(self, df: pd.DataFrame, dimensoes=DIMENSOES):
+        self.df = df
+        self.n = len(df)
+        self.dims = {d: _Dimensao(df[d]) for d in dimensoes}
+
+    def opcoes(self, dim: str) -> list:
+        """Valores distintos (sem nulos) em ordem, como `sorted(df[dim].dropna().unique())`."""
+        return self.dims[dim].valores
+
+    @medido()
+    def posicoes(self, selecao: dict) -> np.ndarray:
+        """Posições (ordem crescente) das linhas que atendem a seleção."""
+        ativos = []
+        for dim, valores in selecao.items():
+            if not valores:
+                continue
+            d = self.dims[dim]
+            cods = d.codigos(valores)
+            qtd = int(d.contagens[cods].sum())
+            if qtd < self.n:  # seleção que cobre todas as linhas não filtra nada
+                ativos.append((qtd, d, cods))
+
+        if not ativos:
+            return np.arange(self.n)
+
+        # parte da dimensão mais seletiva
+        ativos.sort(key=lambda a: a[0])
+        qtd, d0, cods0 = ativos[0]
+
+        if qtd <= self.n * FRACAO_ESPARSA:
+            pos = d0.posicoes(cods0)
+            for _, d, cods in ativos[1:]:
+                pos = pos[np.take(d.tabela(cods), d.codes[pos])]
+            return pos
+
+        mask = np.take(d0.tabela(cods0), d0.codes)
+        for _, d, cods in ativos[1:]:
+            mask &= np.take(d.tabela(cods), d.codes)
+        return np.flatnonzero(mask)
+
+    def filtrar(self, selecao: dict) -> pd.DataFrame:
+        """Base filtrada (um único `take`); sem filtro efetivo devolve a própria base — não modificar."""
+        pos = self.posicoes(selecao)
+        if len(pos) == self.n:
+            return self.df
+        return self.df.take(pos)
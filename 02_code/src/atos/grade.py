@@ -0,0 +1,63 @@
+"""Consulta paginada da base (aba Base): busca, ordenação e escolha de colunas no servidor.
+
+A `Grade` trabalha sobre a base compartilhada + as posições da seleção da sidebar, sem montar a
+base filtrada; só as linhas da página (e só as colunas escolhidas) são copiadas e enviadas ao
+navegador. A ordem da última busca/ordenação fica guardada: trocar de página é só fatiar.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+TAMANHOS_PAGINA = (50, 100, 250, 500)
+
+
+def contem(s: pd.Series, texto: str) -> np.ndarray:
+    """Máscara "o valor, como texto, contém `texto`" (sem diferenciar maiúsculas); testa só os valores distintos."""
+    codes, uniques = pd.factorize(s)
+    achou = pd.Index(uniques).astype(str).str.contains(texto, case=False, regex=False)
+    return np.append(np.asarray(achou, dtype=bool), False)[codes]
+
+
+@dataclass(frozen=True)
+class Consulta:
+    busca: str = ""
+    busca_coluna: str | None = None  # None = qualquer coluna
+    ordenar_por: str | None = None  # None = ordem da planilha
+    crescente: bool = True
+
+
+class Grade:
+    def __init__(self, df: pd.DataFrame, posicoes: np.ndarray):
+        self.df = df
+        self.posicoes = posicoes
+        self._ultima = None  # (consulta, posições resultantes)
+
+    def linhas(self, consulta: Consulta) -> np.ndarray:
+        """Posições (na base) das linhas que passam na busca, já na ordem pedida."""
+        if self._ultima is not None and self._ultima[0] == consulta:
+            return self._ultima[1]
+
+        pos = self.posicoes
+        texto = consulta.busca.strip()
+        if texto:
+            colunas = [consulta.busca_coluna] if consulta.busca_coluna else list(self.df.columns)
+            mask = np.zeros(len(pos), dtype=bool)
+            for c in colunas:
+                mask |= contem(self.df[c].take(pos), texto)
+            pos = pos[mask]
+
+        if consulta.ordenar_por:
+            valores = self.df[consulta.ordenar_por].take(pos).reset_index(drop=True)
+            ordem = valores.sort_values(ascending=consulta.crescente, kind="stable", na_position="last").index
+            pos = pos[ordem.to_numpy()]
+
+        self._ultima = (consulta, pos)
+        return pos
+
+    def pagina(self, consulta: Consulta, pagina: int, tamanho: int, colunas=None) -> tuple[pd.DataFrame, int]:
+        """(linhas da página `pagina` (0-based) só com `colunas`, total de linhas da consulta)."""
+        pos = self.linhas(consulta)
+        fatia = pos[pagina * tamanho:(pagina + 1) * tamanho]
+        df = self.df if colunas is None else self.df[list(colunas)]
+        return df.take(fatia), len(pos)
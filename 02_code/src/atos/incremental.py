@@ -0,0 +1,319 @@
+"""Ingestão incremental: loja local de linhas já enriquecidas + diff contra cada novo upload.
+
+Cada linha da planilha é identificada por (OS, CHAMADO, ocorrência) e tem um hash do
+conteúdo. A cada upload só as linhas novas ou alteradas passam por `enrich`/`apply_sla`;
+as removidas viram tombstone (`_ativo=False`) na loja e o cubo de KPIs recebe só o delta.
+Se os mapeamentos (ou as colunas da planilha) mudarem, tudo é reprocessado (`Ingestao.reprocessada`).
+
+Há uma loja por conjunto de dados (linhagem = pares (arquivo, aba) de origem das linhas), numa
+subpasta de `STORE_DIR`: um upload só é comparado com o último upload dos mesmos arquivos/abas, e
+um conjunto novo começa uma loja vazia em vez de marcar como removidas as linhas de outro. Lojas sem
+ingestão há mais de `RETENCAO_TOMBSTONE` são apagadas.
+
+Em memória ficam só o meta e as colunas `_chave`/`_hash` das linhas ativas (para o diff); as linhas
+enriquecidas e o cubo da última ingestão são relidos do disco quando há o que reaproveitar — a base
+publicada já vive no registro do dashboard (`registro.RegistroBases`), e não é duplicada aqui.
+"""
+import hashlib
+import json
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import config
+from .compactacao import compactar, concatenar
+from .cubo import CuboKPI
+from .instrumentacao import medido
+from .pipeline import apply_sla, enrich
+from .regras_sla import RegrasSLA, compilar_sla
+
+STORE_DIR = config.INTERIM_DIR / "incremental"
+
+INTERNAS = ["_chave", "_hash", "_ordem", "_id", "_ativo", "_removido_em"]
+
+# linhas enriquecidas por vez (entre blocos sai o aviso de progresso e dá para cancelar)
+BLOCO_ENRIQUECIMENTO = 200_000
+
+# linhas removidas/substituídas ficam na loja (só para auditoria) por este período
+RETENCAO_TOMBSTONE = pd.Timedelta(days=30)
+
+# lojas com chaves mantidas em memória no processo (as mais recentes); as demais são relidas do disco
+MAX_LOJAS_MEMORIA = 4
+
+_lock = threading.Lock()
+_memoria = OrderedDict()  # pasta da loja -> (meta, _chave/_hash das ativas) da última ingestão neste processo
+_gravacao = None
+_falha = None  # erro da última gravação em segundo plano, até `aguardar_gravacao` o levantar
+
+
+@dataclass
+class Ingestao:
+    df: pd.DataFrame
+    cubo: CuboKPI
+    inseridas: int
+    modificadas: int
+    removidas: int
+    reaproveitadas: int
+    reprocessada: bool  # mapeamentos/colunas mudaram: tudo reprocessado, sem diff (contagens acima em 0)
+    segundos: float
+    segundos_economizados: float
+    memoria: pd.DataFrame  # bytes por coluna antes/depois da compactação das linhas processadas
+
+
+def _hash_coluna(s: pd.Series) -> np.ndarray:
+    """Hash uint64 por valor, calculado só sobre os valores distintos (nulo -> 0)."""
+    codes, uniques = pd.factorize(s)
+    return np.append(pd.util.hash_array(np.asarray(uniques, dtype=object)), np.uint64(0))[codes]
+
+
+def _combinar(hashes) -> np.ndarray:
+    h = None
+    for x in hashes:
+        h = x.copy() if h is None else h * np.uint64(1_000_003) ^ x
+    return h
+
+
+def _marcar(raw: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta chave da linha, hash do conteúdo e posição na planilha.
+
+    A chave é o hash de (OS, CHAMADO, ocorrência do par) — a ocorrência distingue
+    linhas repetidas com a mesma OS/CHAMADO.
+    """
+    raw = raw.reset_index(drop=True)
+    hs = {col: _hash_coluna(raw[col]) for col in raw.columns}
+    par = _combinar([hs["OS"], hs["CHAMADO"]])
+    ocorrencia = pd.Series(par).groupby(par, sort=False).cumcount().to_numpy()
+    return raw.assign(
+        _chave=_combinar([par, pd.util.hash_array(ocorrencia)]),
+        _hash=_combinar(hs.values()),
+        _ordem=np.arange(len(raw)),
+    )
+
+
+def linhagem(raw: pd.DataFrame) -> list[list[str]]:
+    """Pares [arquivo, aba] distintos das linhas, ordenados ([] sem as colunas de origem)."""
+    if not {"arquivo", "aba"} <= set(raw.columns):
+        return []
+    pares = raw[["arquivo", "aba"]].drop_duplicates().astype(str)
+    return sorted(map(list, pares.itertuples(index=False)))
+
+
+def pasta_loja(raiz: Path, origem: list) -> Path:
+    """Subpasta da loja de uma linhagem (hash dos pares arquivo/aba)."""
+    return raiz / hashlib.sha1(json.dumps(origem, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def _chaves(pasta):
+    """(meta, `_chave`/`_hash` das linhas ativas) da loja: da memória do processo ou do disco; ({}, None) sem loja."""
+    if pasta in _memoria:
+        _memoria.move_to_end(pasta)
+        return _memoria[pasta]
+    linhas_path, meta_path = pasta / "linhas.parquet", pasta / "meta.json"
+    if not (linhas_path.exists() and meta_path.exists() and (pasta / "cubo").exists()):
+        return {}, None
+    loja = pd.read_parquet(linhas_path, columns=["_chave", "_hash", "_ativo"])
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    return meta, loja.loc[loja["_ativo"].to_numpy(dtype=bool), ["_chave", "_hash"]].reset_index(drop=True)
+
+
+def _carregar(pasta):
+    """(ativas, mortas) da loja em disco, depois da gravação pendente."""
+    aguardar_gravacao()
+    loja = pd.read_parquet(pasta / "linhas.parquet")
+    ativo = loja["_ativo"].to_numpy(dtype=bool)
+    return loja[ativo], loja[~ativo]
+
+
+def _gravar(pasta, ativas, mortas, meta, cubo) -> None:
+    """Grava a loja inteira numa pasta temporária e só então a troca pela anterior.
+
+    Se algo falhar no meio, a loja anterior fica como estava (coerente com o seu cubo) e a entrada da
+    memória, que já descrevia a nova, é descartada: a próxima ingestão compara com o que está em disco.
+    """
+    global _falha
+    tmp, velha = pasta.with_name(pasta.name + ".tmp"), pasta.with_name(pasta.name + ".old")
+    try:
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        concatenar([mortas, ativas]).to_parquet(tmp / "linhas.parquet", index=False)
+        cubo.salvar(tmp / "cubo")
+        (tmp / "meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+        shutil.rmtree(velha, ignore_errors=True)
+        if pasta.exists():
+            pasta.rename(velha)
+        tmp.rename(pasta)  # entre as duas trocas não há loja: a próxima ingestão reprocessa tudo
+        shutil.rmtree(velha, ignore_errors=True)
+    except BaseException as e:
+        _memoria.pop(pasta, None)
+        shutil.rmtree(tmp, ignore_errors=True)
+        _falha = e
+        return
+    _podar(pasta.parent, pd.Timestamp(meta["atualizado_em"]))
+
+
+def _podar(raiz, agora: pd.Timestamp) -> None:
+    """Apaga as lojas (de outras linhagens) sem ingestão dentro da retenção."""
+    for meta_path in raiz.glob("*/meta.json"):
+        try:
+            atualizado = pd.Timestamp(json.loads(meta_path.read_text(encoding="utf-8"))["atualizado_em"])
+        except (OSError, ValueError, KeyError):
+            continue
+        if atualizado < agora - RETENCAO_TOMBSTONE and meta_path.parent not in _memoria:
+            shutil.rmtree(meta_path.parent, ignore_errors=True)
+
+
+def aguardar_gravacao() -> None:
+    """Espera a gravação em disco da última ingestão (scripts devem chamar antes de sair) e levanta o erro
+    dela, se houve (a loja em disco continua a anterior)."""
+    global _falha
+    if _gravacao is not None:
+        _gravacao.join()
+    if _falha is not None:
+        erro, _falha = _falha, None
+        raise erro
+
+
+def _enriquecer(linhas, ms, mserv, sla, proximo_id, classificador=None, aproximacao=None, progresso=None):
+    """Enriquece (em blocos de `BLOCO_ENRIQUECIMENTO`, chamando `progresso(feitas, total)` a cada um) e
+    compacta as linhas; devolve também o relatório de memória da compactação."""
+    regras = sla if isinstance(sla, RegrasSLA) else compilar_sla(sla)
+    n = len(linhas)
+    partes = []
+    for i in range(0, max(n, 1), BLOCO_ENRIQUECIMENTO):
+        bloco = linhas.iloc[i:i + BLOCO_ENRIQUECIMENTO]
+        partes.append(apply_sla(enrich(bloco, ms, mserv, classificador, aproximacao), regras, aproximacao=aproximacao))
+        if progresso is not None:
+            progresso(min(i + BLOCO_ENRIQUECIMENTO, n), n)
+    enriquecidas = partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+    del partes
+    out, memoria = compactar(enriquecidas, excluir=INTERNAS)
+    out["_id"] = np.arange(proximo_id, proximo_id + len(out))
+    out["_ativo"] = True
+    out["_removido_em"] = pd.NaT
+    return out, memoria[~memoria["coluna"].isin(INTERNAS)].reset_index(drop=True)
+
+
+def _publica(linhas: pd.DataFrame) -> pd.DataFrame:
+    """Linhas da loja -> base do dashboard (ordem da planilha, índice = id da linha)."""
+    if not linhas["_ordem"].is_monotonic_increasing:
+        linhas = linhas.sort_values("_ordem", kind="stable")
+    df = linhas.set_index("_id")
+    df.index.name = None
+    return df.drop(columns=[c for c in INTERNAS if c in df.columns])
+
+
+@medido()
+def ingerir(raw: pd.DataFrame, ms, mserv, sla, versao_mapas, pasta=STORE_DIR, classificador=None,
+            aproximacao=None, progresso=None) -> Ingestao:
+    """Enriquece só o que mudou desde o último upload dos mesmos arquivos/abas e atualiza loja + cubo.
+
+    A loja fica em `pasta_loja(pasta, linhagem(raw))`; sem loja para essa linhagem, tudo é processado.
+
+    `classificador` e `aproximacao` resolvem na hora os valores fora dos mapeamentos (ver `enrich` e
+    `apply_sla`); os arquivos de que dependem devem entrar em `versao_mapas`, como os mapeamentos.
+    `progresso(feitas, total)` acompanha o enriquecimento; uma exceção levantada nele cancela a ingestão
+    sem tocar na loja (nada é publicado antes do fim).
+    """
+    global _gravacao
+    with _lock:
+        t0 = time.perf_counter()
+        try:
+            aguardar_gravacao()
+        except Exception as e:  # a loja da ingestão anterior não foi gravada; o diff usa a que está em disco
+            print("Aviso: falha ao gravar a loja incremental -", f"{type(e).__name__}: {e}")
+        novo = _marcar(raw)
+        origem = linhagem(raw)
+        pasta = pasta_loja(pasta, origem)
+        meta, chaves = _chaves(pasta)
+        compativel = (
+            chaves is not None
+            and meta.get("linhagem") == origem
+            and meta.get("versao_mapas") == [str(v) for v in versao_mapas]
+            and meta.get("colunas") == list(raw.columns)
+        )
+        agora = pd.Timestamp(datetime.now())
+        ativos, mortas = _carregar(pasta) if chaves is not None else (None, None)
+
+        if compativel:
+            ref = chaves.drop_duplicates("_chave")
+            pos = pd.Index(ref["_chave"]).get_indexer(novo["_chave"])
+            casou = pos >= 0
+            igual = casou & (novo["_hash"].to_numpy() == ref["_hash"].to_numpy()[pos])
+
+            # linhas iguais: reaproveita o enriquecimento da loja, só atualiza a posição
+            ordem_nova = pd.Series(novo["_ordem"].to_numpy()[igual], index=novo["_chave"].to_numpy()[igual])
+            fica = ativos["_chave"].isin(ordem_nova.index).to_numpy()
+            reaproveitadas = (ativos if fica.all() else ativos[fica]).copy()
+            reaproveitadas["_ordem"] = ordem_nova.reindex(reaproveitadas["_chave"]).to_numpy()
+            saem = ativos[~fica]
+
+            n_removidas = len(ref) - int(casou.sum())
+            n_modificadas = int((casou & ~igual).sum())
+            n_inseridas = int((~casou).sum())
+            processar = novo[~igual]
+        else:
+            # loja de mapeamentos/colunas antigos: reprocessa tudo, sem contar como removidas/inseridas
+            reaproveitadas = novo.iloc[:0]
+            saem = ativos if ativos is not None else novo.iloc[:0]
+            n_removidas = n_modificadas = 0
+            n_inseridas = 0 if ativos is not None else len(novo)
+            processar = novo
+
+        t_proc = time.perf_counter()
+        novas, memoria = _enriquecer(processar, ms, mserv, sla, int(meta.get("proximo_id", 0)),
+                                      classificador, aproximacao, progresso)
+        linhas = concatenar([reaproveitadas, novas]) if len(novas) else reaproveitadas
+        df = _publica(linhas)
+        if compativel:
+            cubo = CuboKPI.carregar(pasta / "cubo", None).atualizar(df, _publica(saem), _publica(novas))
+        else:
+            cubo = CuboKPI.de_base(df)
+        seg_processamento = time.perf_counter() - t_proc
+
+        # tombstones das linhas que saíram, descartados após a retenção
+        if mortas is None:
+            mortas = linhas.iloc[:0]
+        elif len(saem):
+            recentes = mortas[mortas["_removido_em"] >= agora - RETENCAO_TOMBSTONE]
+            mortas = concatenar([recentes, saem.assign(_ativo=False, _removido_em=agora)])
+
+        # custo por linha de um reprocessamento completo (enriquecimento + cubo), medido no último
+        por_linha = seg_processamento / len(novo) if not compativel and len(novo) else meta.get("seg_por_linha", 0.0)
+        meta = {
+            "linhagem": origem,
+            "versao_mapas": [str(v) for v in versao_mapas],
+            "colunas": list(raw.columns),
+            "proximo_id": int(meta.get("proximo_id", 0)) + len(novas),
+            "seg_por_linha": por_linha,
+            "atualizado_em": agora.isoformat(),
+        }
+        _memoria[pasta] = (meta, linhas[["_chave", "_hash"]].reset_index(drop=True))
+        _memoria.move_to_end(pasta)
+        while len(_memoria) > MAX_LOJAS_MEMORIA:
+            _memoria.popitem(last=False)
+
+        # disco fora do caminho crítico; uma gravação por vez, na ordem das ingestões
+        aguardar_gravacao()
+        _gravacao = threading.Thread(target=_gravar, args=(pasta, linhas, mortas, meta, cubo), name="atos-loja")
+        _gravacao.start()
+
+        segundos = time.perf_counter() - t0
+        return Ingestao(
+            df=df,
+            cubo=cubo,
+            inseridas=n_inseridas,
+            modificadas=n_modificadas,
+            removidas=n_removidas,
+            reaproveitadas=len(novo) - len(processar),
+            reprocessada=not compativel and ativos is not None,
+            segundos=segundos,
+            segundos_economizados=max(0.0, por_linha * len(novo) - segundos),
+            memoria=memoria,
+        )
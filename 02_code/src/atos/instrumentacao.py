@@ -0,0 +1,179 @@
+"""Instrumentação por etapa: tempo, RSS do processo, linhas e tamanho do frame resultante.
+
+Desligada por padrão; liga com `ATOS_PERFIL=1` no ambiente (vale para o app, a CLI e os scripts 01–07)
+ou com `ativar()`. Desligada, `etapa` devolve um contexto vazio e `medido` chama a função direto — o
+custo é uma checagem de flag. Ligada, cada etapa vira um registro:
+
+    {"ts", "etapa", "segundos", "rss_mb", "rss_delta_mb", "linhas_entrada", "linhas", "mb", "pid", "erro", ...}
+
+gravado como uma linha JSON em `05_reports/logs/perfil_AAAAMMDD.jsonl` e guardado nos últimos
+`MAX_REGISTROS` em memória, para o painel de debug. Campos extras (aba, sessão, ...) entram como contexto.
+O tamanho do frame é `memory_usage(deep=True)`, medido só com a instrumentação ligada.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .config import LOGS_DIR
+
+MAX_REGISTROS = 2000
+REGISTRO_COLS = ["ts", "etapa", "segundos", "rss_mb", "rss_delta_mb", "linhas_entrada", "linhas", "mb", "erro"]
+
+_ativo = os.environ.get("ATOS_PERFIL", "").strip().lower() in ("1", "true", "sim")
+_pasta = LOGS_DIR
+_registros = deque(maxlen=MAX_REGISTROS)
+_lock = threading.Lock()
+
+
+def ativo() -> bool:
+    return _ativo
+
+
+def ativar(ligado: bool = True, pasta=None) -> None:
+    """Liga/desliga a instrumentação no processo (e nos processos filhos criados depois, via ambiente)."""
+    global _ativo, _pasta
+    _ativo = ligado
+    os.environ["ATOS_PERFIL"] = "1" if ligado else ""
+    if pasta is not None:
+        _pasta = pasta
+
+
+def rss_mb() -> float | None:
+    """RSS atual do processo em MB (None fora do Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _tamanho(obj) -> tuple[int | None, float | None]:
+    """(linhas, MB) de um frame/série/array; de tupla, o do primeiro elemento que for um deles."""
+    if isinstance(obj, tuple):
+        for o in obj:
+            if isinstance(o, (pd.DataFrame, pd.Series, np.ndarray)):
+                return _tamanho(o)
+        return None, None
+    if isinstance(obj, pd.DataFrame):
+        return len(obj), obj.memory_usage(deep=True).sum() / 2**20
+    if isinstance(obj, pd.Series):
+        return len(obj), obj.memory_usage(deep=True) / 2**20
+    if isinstance(obj, np.ndarray):
+        return len(obj), obj.nbytes / 2**20
+    if isinstance(obj, (bytes, bytearray)):
+        return None, len(obj) / 2**20
+    return None, None
+
+
+def _gravar(reg: dict) -> None:
+    with _lock:
+        _registros.append(reg)
+        try:
+            _pasta.mkdir(parents=True, exist_ok=True)
+            with open(_pasta / f"perfil_{reg['ts'][:10].replace('-', '')}.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps(reg, ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            pass  # sem pasta de logs gravável: fica só em memória
+
+
+class Medicao:
+    """Uma etapa em andamento; `resultado(obj)` registra linhas/tamanho do que a etapa produziu."""
+
+    def __init__(self, nome: str, entrada=None, contexto=None):
+        self.nome = nome
+        self.contexto = contexto or {}
+        self.linhas_entrada = _tamanho(entrada)[0] if entrada is not None else None
+        self.linhas = self.mb = None
+
+    def resultado(self, obj):
+        self.linhas, self.mb = _tamanho(obj)
+        return obj
+
+    def __enter__(self):
+        self._rss = rss_mb()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, erro, tb):
+        segundos = time.perf_counter() - self._t0
+        rss = rss_mb()
+        _gravar({
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "etapa": self.nome,
+            "segundos": round(segundos, 4),
+            "rss_mb": None if rss is None else round(rss, 1),
+            "rss_delta_mb": None if rss is None or self._rss is None else round(rss - self._rss, 1),
+            "linhas_entrada": self.linhas_entrada,
+            "linhas": self.linhas,
+            "mb": None if self.mb is None else round(float(self.mb), 2),
+            "pid": os.getpid(),
+            "erro": None if erro is None else f"{tipo.__name__}: {erro}",
+            **self.contexto,
+        })
+        return False
+
+
+class _Desligada:
+    def resultado(self, obj):
+        return obj
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_DESLIGADA = _Desligada()
+
+
+def etapa(nome: str, entrada=None, **contexto):
+    """Contexto que mede o bloco (`with etapa("enrich", df) as m: out = m.resultado(enrich(df, ...))`)."""
+    return Medicao(nome, entrada, contexto) if _ativo else _DESLIGADA
+
+
+def medido(nome: str | None = None):
+    """Decorador: mede cada chamada; o 1º argumento frame/série/array conta como entrada, o retorno como resultado."""
+    def decorar(func):
+        rotulo = nome or func.__qualname__
+
+        @functools.wraps(func)
+        def envolvida(*args, **kwargs):
+            if not _ativo:
+                return func(*args, **kwargs)
+            entrada = next((a for a in args if isinstance(a, (pd.DataFrame, pd.Series, np.ndarray))), None)
+            with Medicao(rotulo, entrada) as m:
+                return m.resultado(func(*args, **kwargs))
+        return envolvida
+    return decorar
+
+
+def registros() -> pd.DataFrame:
+    """Últimos registros do processo (mais recente por último)."""
+    with _lock:
+        regs = list(_registros)
+    return pd.DataFrame(regs, columns=list(dict.fromkeys(REGISTRO_COLS + [k for r in regs for k in r])))
+
+
+def resumo(regs: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Por etapa: nº de chamadas, segundos (total, mediana, máximo), maior RSS e últimas linhas."""
+    regs = registros() if regs is None else regs
+    if regs.empty:
+        return pd.DataFrame(columns=["etapa", "chamadas", "seg_total", "seg_mediana", "seg_max", "rss_max_mb", "linhas"])
+    g = regs.groupby("etapa", sort=False)
+    out = pd.DataFrame({
+        "chamadas": g.size(),
+        "seg_total": g["segundos"].sum().round(3),
+        "seg_mediana": g["segundos"].median().round(3),
+        "seg_max": g["segundos"].max().round(3),
+        "rss_max_mb": g["rss_mb"].max(),
+        "linhas": g["linhas"].last(),
+    })
+    return out.sort_values("seg_total", ascending=False).reset_index()
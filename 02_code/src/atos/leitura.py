@@ -0,0 +1,285 @@
+"""Leitura da planilha ATOS (cabeçalho na 2ª linha) com projeção de colunas e escolha de motor.
+
+Motores:
+- "calamine": `pd.read_excel(engine="calamine")` com `usecols` — usado se `python-calamine` estiver instalado;
+- "openpyxl": streaming em modo read-only (`iter_rows(values_only=True)`, só API pública); só as
+  colunas projetadas são convertidas e a inferência de tipos (o mesmo `TextParser` do `read_excel`)
+  roda bloco a bloco;
+- "pandas": `pd.read_excel(header=1)` da planilha inteira (referência).
+
+Os três devolvem o mesmo frame que `pd.read_excel(fonte, header=1)` restrito às colunas pedidas
+(ver `02_code/tests/test_leitura.py`; tempo e memória em `02_code/bench/comparar_leitura.py`).
+`ler_blocos` entrega a aba em blocos, sem juntá-la em memória (etapa 01).
+"""
+import importlib.util
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from .config import DATE_COLS, TEXT_COLS
+
+# colunas da planilha usadas pelo pipeline (clean -> enrich -> apply_sla)
+COLUNAS_PIPELINE = TEXT_COLS + DATE_COLS + ["RECEITA"]
+
+# sem estas no cabeçalho, a aba não é uma planilha ATOS (ex.: abas de resumo)
+COLUNAS_OBRIGATORIAS = ["OS", "CHAMADO"] + DATE_COLS
+
+LINHA_CABECALHO = 1
+TAMANHO_BLOCO = 50_000
+AVISO_LINHAS = 5_000  # de quantas em quantas linhas lidas o `progresso` é chamado
+
+MOTORES = ("calamine", "openpyxl", "pandas")
+
+
+def motor_padrao() -> str:
+    return "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
+
+def _descartar(nome) -> bool:
+    return str(nome).startswith("Unnamed")
+
+
+def _arrumar(df: pd.DataFrame, colunas) -> pd.DataFrame:
+    """Remove as colunas Unnamed (lixo), limpa os nomes e aplica a projeção."""
+    df = df.loc[:, [not _descartar(c) for c in df.columns]]
+    df.columns = [str(c).strip() for c in df.columns]
+    if colunas is not None:
+        df = df[[c for c in df.columns if c in set(colunas)]]
+    return df
+
+
+def _usecols(colunas):
+    if colunas is None:
+        return lambda c: not _descartar(c)
+    pedidas = set(colunas)
+    return lambda c: str(c).strip() in pedidas
+
+
+# ---------------- openpyxl (streaming) ----------------
+def _erros():
+    from openpyxl.cell.cell import ERROR_CODES
+    return frozenset(ERROR_CODES)
+
+
+def _converter(v, erros):
+    """Igual ao `_convert_cell` do leitor openpyxl do pandas (sem o objeto célula)."""
+    if v is None:
+        return ""
+    if type(v) is float:
+        i = int(v)
+        return i if i == v else v
+    if type(v) is str and v in erros:
+        return np.nan
+    return v
+
+
+def _abrir(fonte):
+    from openpyxl import load_workbook
+
+    if hasattr(fonte, "seek"):
+        fonte.seek(0)
+    return load_workbook(fonte, read_only=True, data_only=True, keep_links=False)
+
+
+def _linhas(ws, indices):
+    """Linhas da aba: (tem_dado, valores só das colunas `indices`)."""
+    for row in ws.iter_rows(values_only=True):
+        largura = len(row)
+        yield (
+            any(v is not None and v != "" for v in row),
+            [row[i] if i < largura else None for i in indices],
+        )
+
+
+def _aba(wb, aba):
+    ws = wb.worksheets[0] if aba is None else wb[aba]
+    ws.reset_dimensions()
+    return ws
+
+
+def _blocos(ws, indices, tamanho, progresso=None):
+    """Gera blocos de linhas (só as colunas `indices`, já convertidas) após o cabeçalho.
+
+    Como no `read_excel`: linhas vazias no meio ficam, as do fim da planilha são descartadas.
+    `progresso(linhas_lidas)` é chamado a cada `AVISO_LINHAS` linhas da planilha.
+    """
+    erros = _erros()
+    vazias = 0
+    bloco = []
+    for n, (tem_dado, valores) in enumerate(_linhas(ws, indices)):
+        if n <= LINHA_CABECALHO:
+            continue
+        if progresso is not None and n % AVISO_LINHAS == 0:
+            progresso(n - LINHA_CABECALHO)
+        if not tem_dado:
+            vazias += 1
+            continue
+        if vazias:
+            bloco.extend([[""] * len(indices)] * vazias)
+            vazias = 0
+        bloco.append([_converter(v, erros) for v in valores])
+        if tamanho and len(bloco) >= tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def _linha_cabecalho(ws, erros) -> list:
+    for n, row in enumerate(ws.iter_rows(values_only=True)):
+        if n == LINHA_CABECALHO:
+            return [_converter(v, erros) for v in row]
+    return []
+
+
+def _cabecalho(ws) -> list:
+    """Nomes das colunas como o `read_excel` os monta (Unnamed, duplicadas com sufixo)."""
+    cab = _linha_cabecalho(ws, _erros())
+    while cab and cab[-1] == "":
+        cab.pop()
+    return list(TextParser([cab], header=0, skip_blank_lines=False).read().columns)
+
+
+def _parse(linhas, nomes, dtype=None) -> pd.DataFrame:
+    return TextParser(linhas, names=nomes, header=None, skip_blank_lines=False, dtype=dtype).read()
+
+
+def _tipo(s: pd.Series):
+    """Família do dtype inferido num bloco; None = bloco todo nulo (não decide nada)."""
+    if s.isna().all():
+        return None
+    k = s.dtype.kind
+    return {"i": "num", "u": "num", "f": "num", "M": "data", "b": "bool"}.get(k, "obj")
+
+
+def _juntar(partes: list[pd.Series]) -> pd.Series:
+    """Concatena os blocos de uma coluna (todos de uma mesma família; blocos nulos seguem a família)."""
+    cheias = [p for p in partes if _tipo(p) is not None]
+    if cheias and len(cheias) < len(partes):
+        dtypes = {p.dtype for p in cheias}
+        if cheias[0].dtype.kind in "iuf":
+            alvo = "float64"
+        else:
+            alvo = dtypes.pop() if len(dtypes) == 1 else object
+        partes = [p if _tipo(p) is not None else p.astype(alvo) for p in partes]
+    return pd.concat(partes, ignore_index=True)
+
+
+def _ler_openpyxl(fonte, colunas, tamanho=TAMANHO_BLOCO, aba=None, progresso=None) -> pd.DataFrame:
+    wb = _abrir(fonte)  # uma abertura por leitura (cabeçalho, blocos e releitura das colunas mistas)
+    try:
+        return _ler_aba(_aba(wb, aba), colunas, tamanho, progresso)
+    finally:
+        wb.close()
+
+
+def _ler_aba(ws, colunas, tamanho, progresso) -> pd.DataFrame:
+    nomes = _cabecalho(ws)
+    if progresso is not None:
+        progresso(0)
+    pedidas = _usecols(colunas)
+    indices = [i for i, c in enumerate(nomes) if pedidas(c)]
+    proj = [nomes[i] for i in indices]
+
+    partes = {c: [] for c in proj}
+    for bloco in _blocos(ws, indices, tamanho, progresso):
+        df = _parse(bloco, proj)
+        for c in proj:
+            partes[c].append(df[c])
+        del bloco, df
+
+    if not any(partes.values()) or not all(partes.values()):
+        return _parse([], proj)
+
+    # blocos de uma coluna com inferências diferentes (ex.: números num bloco, texto noutro):
+    # o read_excel decidiria olhando a coluna inteira -> relê só essas colunas de uma vez
+    mistas = [c for c in proj if len({_tipo(p) for p in partes[c]} - {None}) > 1]
+    out = {c: _juntar(partes[c]) for c in proj if c not in mistas}
+    if mistas:
+        idx_mistas = [indices[proj.index(c)] for c in mistas]
+        inteiras = _parse(next(_blocos(ws, idx_mistas, None), []), mistas)
+        out.update({c: inteiras[c] for c in mistas})
+    return pd.DataFrame({c: out[c] for c in proj})
+
+
+def _forcar(df: pd.DataFrame, tipos: dict) -> pd.DataFrame:
+    """Colunas "num"/"data" de `tipos` em float64/datetime64, como sairiam lidas inteiras ("obj" vem do parse)."""
+    for c, t in tipos.items():
+        if c in df.columns and t == "num":
+            df[c] = df[c].astype("float64")
+        elif c in df.columns and t == "data":
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+    return df
+
+
+# ---------------- entrada ----------------
+def cabecalhos_atos(fonte, colunas=COLUNAS_PIPELINE) -> dict[str, list[str]]:
+    """Colunas que `ler_planilha` devolve de cada aba ATOS (cabeçalho na 2ª linha com as obrigatórias),
+    lendo só os cabeçalhos."""
+    wb = _abrir(fonte)
+    try:
+        cabecalhos = {}
+        for nome in wb.sheetnames:
+            nomes = _cabecalho(_aba(wb, nome))
+            if set(COLUNAS_OBRIGATORIAS) <= {str(c).strip() for c in nomes}:
+                cabecalhos[nome] = list(_arrumar(pd.DataFrame(columns=nomes), colunas).columns)
+        return cabecalhos
+    finally:
+        wb.close()
+
+
+def abas_atos(fonte) -> list[str]:
+    """Abas da planilha cujo cabeçalho (2ª linha) tem as colunas obrigatórias da ATOS."""
+    return list(cabecalhos_atos(fonte))
+
+
+def ler_blocos(fonte, colunas=COLUNAS_PIPELINE, motor: str | None = None, aba: str | None = None,
+               tamanho: int = TAMANHO_BLOCO, tipos: dict | None = None):
+    """Como `ler_planilha`, mas gera a aba em blocos de até `tamanho` linhas, sem juntá-la em memória.
+
+    O tipo de cada coluna é inferido bloco a bloco, então uma coluna pode vir número num bloco e texto
+    noutro; `tipos` ({coluna: "num" | "data" | "obj"}) fixa essas colunas em float64, datetime64 ou object
+    em todos os blocos, como o `read_excel` as leria inteiras. Só o motor openpyxl lê em blocos; nos outros
+    a aba sai num bloco só.
+    """
+    motor = motor or motor_padrao()
+    tipos = tipos or {}
+    if motor != "openpyxl":
+        yield _forcar(ler_planilha(fonte, colunas, motor, aba), tipos)
+        return
+
+    wb = _abrir(fonte)
+    try:
+        ws = _aba(wb, aba)
+        nomes = _cabecalho(ws)
+        pedidas = _usecols(colunas)
+        indices = [i for i, c in enumerate(nomes) if pedidas(c)]
+        proj = [nomes[i] for i in indices]
+        objetos = {c: object for c in proj if tipos.get(str(c).strip()) == "obj"}
+        for bloco in _blocos(ws, indices, tamanho):
+            yield _forcar(_arrumar(_parse(bloco, proj, objetos or None), colunas), tipos)
+    finally:
+        wb.close()
+
+
+def ler_planilha(fonte, colunas=COLUNAS_PIPELINE, motor: str | None = None, aba: str | None = None,
+                 progresso=None) -> pd.DataFrame:
+    """Lê a planilha ATOS só com as colunas `colunas` (None = todas, menos as Unnamed).
+
+    `motor` = "calamine" | "openpyxl" | "pandas" (None = o mais rápido instalado);
+    `aba` = nome da aba (None = a primeira);
+    `progresso(linhas_lidas)` é chamado durante a leitura (só no motor openpyxl, o único que lê em blocos).
+    """
+    motor = motor or motor_padrao()
+    if motor not in MOTORES:
+        raise ValueError(f"motor desconhecido: {motor!r} (use um de {MOTORES})")
+
+    if motor == "openpyxl":
+        df = _ler_openpyxl(fonte, colunas, aba=aba, progresso=progresso)
+    else:
+        if hasattr(fonte, "seek"):
+            fonte.seek(0)
+        kw = {"engine": "calamine", "usecols": _usecols(colunas)} if motor == "calamine" else {}
+        df = pd.read_excel(fonte, sheet_name=0 if aba is None else aba, header=LINHA_CABECALHO, **kw)
+    return _arrumar(df, colunas)
@@ -0,0 +1,191 @@
+"""Relatórios executivos em lote: um .docx por valor de uma dimensão (ex.: por cliente), num zip.
+
+O cubo de KPIs é montado uma vez e cada relatório é um recorte dele, sem reprocessar a base. Os
+relatórios são gerados num pool de processos e gravados no zip à medida que ficam prontos; cada worker
+recebe uma vez só o que o relatório consulta (`CuboKPI.enxuto`: células, tabelas e as linhas FORA), não a
+base. No dashboard o lote roda em segundo plano (`lote_temporario` numa `carga.FilaCargas`).
+
+    PYTHONPATH=02_code/src python -m atos.lote                        # por cliente, da base da etapa 07
+    PYTHONPATH=02_code/src python -m atos.lote --por tipo_servico --saida tipos.zip
+    PYTHONPATH=02_code/src python -m atos.lote --entrada a.xlsx b.xlsx --meses 2025-05 2025-06
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from zipfile import ZIP_STORED, ZipFile
+
+import pandas as pd
+
+from . import config
+from .armazenamento import ler
+from .cubo import CuboKPI
+from .relatorio import gerar_relatorio_docx
+
+# dimensões do filtro da sidebar -> chave em `filtros` do relatório
+FILTROS = {"CLIENTE": "clientes", "tipo_servico": "tipos", "mes_autorizacao": "meses"}
+SAIDA_PADRAO = config.EXPORTS_DIR / "relatorios_por_cliente.zip"
+
+RELATORIO_COLS = ["valor", "arquivo", "segundos", "kb", "erro"]
+
+_cubo: CuboKPI | None = None  # cubo do worker (definido por `_iniciar`)
+_arquivos = threading.Lock()  # leitura/fechamento dos zips temporários (compartilhados entre sessões)
+
+
+def _iniciar(cubo: CuboKPI) -> None:
+    global _cubo
+    _cubo = cubo
+
+
+def _filtros(cubo: CuboKPI, selecao: dict) -> dict:
+    """Filtros do escopo do relatório; dimensão sem seleção = todos os valores (como o padrão da sidebar)."""
+    return {chave: list(selecao.get(dim) or cubo.valores[dim]) for dim, chave in FILTROS.items()}
+
+
+def _relatorio(dim: str, valor, selecao: dict, cubo: CuboKPI | None = None) -> tuple[bytes, float]:
+    """Um relatório, do `cubo` dado ou (nos workers) do recebido em `_iniciar`."""
+    t0 = time.perf_counter()
+    cubo = cubo or _cubo
+    sel = {**selecao, dim: [valor]}
+    doc = gerar_relatorio_docx(cubo.recorte(sel), _filtros(cubo, sel))
+    return doc, time.perf_counter() - t0
+
+
+def nome_arquivo(valor, usados: set) -> str:
+    """Nome de arquivo seguro e único dentro do zip para o relatório de `valor`."""
+    base = re.sub(r"[^\w.-]+", "_", str(valor)).strip("_.") or "sem_nome"
+    nome, i = f"{base}.docx", 2
+    while nome in usados:
+        nome, i = f"{base}_{i}.docx", i + 1
+    usados.add(nome)
+    return nome
+
+
+def gerar_lote(cubo: CuboKPI, destino, dim: str = "CLIENTE", valores=None, selecao: dict | None = None,
+               processos: int | None = None, progresso=None) -> pd.DataFrame:
+    """Um relatório por valor de `dim` (padrão: todos os do cubo) dentro da `selecao`, gravados no zip `destino`.
+
+    `destino` é um caminho ou arquivo binário aberto; `progresso(feitos, total, linha)` é chamado a cada
+    relatório pronto (uma exceção levantada nele cancela os que faltam). Devolve valor, arquivo no zip,
+    segundos, tamanho e erro de cada relatório; um relatório com erro não interrompe os demais.
+    """
+    selecao = {d: v for d, v in (selecao or {}).items() if d != dim}
+    valores = list(cubo.valores[dim] if valores is None else valores)
+    processos = min(len(valores), processos or os.cpu_count() or 1)
+    if isinstance(destino, (str, Path)):
+        Path(destino).parent.mkdir(parents=True, exist_ok=True)
+
+    linhas, usados = [], set()
+    with ZipFile(destino, "w", ZIP_STORED) as zf:  # .docx já é compactado
+
+        def gravar(valor, fut_ou_res):
+            try:
+                doc, segundos = fut_ou_res() if callable(fut_ou_res) else fut_ou_res.result()
+                nome = nome_arquivo(valor, usados)
+                zf.writestr(nome, doc)
+                linha = {"valor": valor, "arquivo": nome, "segundos": segundos, "kb": len(doc) / 1024, "erro": None}
+            except Exception as e:
+                linha = {"valor": valor, "arquivo": None, "segundos": float("nan"), "kb": 0.0,
+                         "erro": f"{type(e).__name__}: {e}"}
+            linhas.append(linha)
+            if progresso is not None:
+                progresso(len(linhas), len(valores), linha)
+
+        if processos <= 1:
+            for v in valores:
+                gravar(v, lambda v=v: _relatorio(dim, v, selecao, cubo))
+        else:
+            # spawn, como em `pipeline.clean_varias`: no dashboard o pool nasce da thread de `lotes()`
+            with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_iniciar, initargs=(cubo.enxuto(),)) as ex:
+                futuros = {ex.submit(_relatorio, dim, v, selecao): v for v in valores}
+                try:
+                    for fut in as_completed(futuros):
+                        gravar(futuros[fut], fut)
+                except BaseException:
+                    ex.shutdown(wait=False, cancel_futures=True)
+                    raise
+    return pd.DataFrame(linhas, columns=RELATORIO_COLS)
+
+
+def lote_temporario(cubo: CuboKPI, dim: str = "CLIENTE", valores=None, selecao: dict | None = None,
+                    processos: int | None = None, progresso=None):
+    """`gerar_lote` num arquivo temporário em disco, já rebobinado: (arquivo, relatório). Quem recebe fecha
+    o arquivo; se o lote falhar ou for cancelado, ele é fechado aqui."""
+    tmp = tempfile.TemporaryFile()
+    try:
+        rel = gerar_lote(cubo, tmp, dim, valores, selecao, processos, progresso)
+    except BaseException:
+        tmp.close()
+        raise
+    tmp.seek(0)
+    return tmp, rel
+
+
+def ler_zip(arquivo) -> bytes:
+    """Conteúdo do zip de `lote_temporario` (para o download; seguro entre threads)."""
+    with _arquivos:
+        arquivo.seek(0)
+        return arquivo.read()
+
+
+def fechar_zip(resultado) -> None:
+    """Fecha (e apaga) o zip de um resultado de `lote_temporario`."""
+    with _arquivos:
+        resultado[0].close()
+
+
+def _base(entrada: list[Path] | None) -> pd.DataFrame:
+    """Base com SLA: a da etapa 07 em disco ou, com `entrada`, processada uma vez em memória."""
+    if not entrada:
+        return ler(config.COM_SLA_PARQUET)
+    from .mapeamentos import load_mappings
+    from .pipeline import apply_sla, clean_varias, enrich
+
+    raw, relatorio = clean_varias(entrada)
+    if raw.empty:
+        raise SystemExit(f"nenhuma planilha ATOS pôde ser lida:\n{relatorio.to_string(index=False)}")
+    ms, mserv, sla = load_mappings()
+    return apply_sla(enrich(raw, ms, mserv), sla)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="atos.lote", description="Relatório executivo (.docx) por cliente/dimensão, num zip.")
+    parser.add_argument("--por", choices=list(FILTROS), default="CLIENTE", help="um relatório por valor desta dimensão")
+    parser.add_argument("--saida", type=Path, default=None, help=f"zip de saída (padrão: {SAIDA_PADRAO})")
+    parser.add_argument("--entrada", type=Path, nargs="+",
+                        help=f"planilha(s) .xlsx (padrão: lê {config.COM_SLA_PARQUET}, gerado pela etapa 07)")
+    parser.add_argument("--clientes", nargs="+", help="só estes clientes")
+    parser.add_argument("--tipos", nargs="+", help="só estes tipos de serviço")
+    parser.add_argument("--meses", nargs="+", help="só estes meses de autorização (AAAA-MM)")
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    saida = args.saida or (SAIDA_PADRAO if args.por == "CLIENTE" else config.EXPORTS_DIR / f"relatorios_por_{args.por}.zip")
+    t0 = time.perf_counter()
+    cubo = CuboKPI.de_base(_base(args.entrada).reset_index(drop=True))
+    print(f"Base e cubo prontos em {time.perf_counter() - t0:.1f}s")
+
+    selecao = {"CLIENTE": args.clientes or [], "tipo_servico": args.tipos or [], "mes_autorizacao": args.meses or []}
+    valores = selecao.pop(args.por) or None
+
+    def progresso(feitos, total, linha):
+        status = f"{linha['segundos']:.2f}s" if linha["erro"] is None else f"ERRO {linha['erro']}"
+        print(f"[{feitos:>4}/{total}] {linha['valor']}: {status}")
+
+    rel = gerar_lote(cubo, saida, args.por, valores, selecao, args.processos, progresso)
+    ok = rel["erro"].isna()
+    print(f"OK! {int(ok.sum())} relatórios em {saida.resolve()} ({time.perf_counter() - t0:.1f}s no total, "
+          f"{rel.loc[ok, 'segundos'].mean():.2f}s por relatório)")
+    if not ok.all():
+        print(f"{int((~ok).sum())} com erro:")
+        print(rel.loc[~ok, ["valor", "erro"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from functools import lru_cache
+
+import pandas as pd
+
+from .aproximacao import Aproximacao
+from .calendario import Calendario, carregar_calendario
+from .classificacao import Classificador, carregar_classificador
+from .config import FERIADOS_ESTADUAIS, FERIADOS_NACIONAIS, MAP_SERV, MAP_STATUS, REGRAS_CLASSIFICACAO, SLA_CAD
+from .normalizacao import norm_key_series
+from .regras_sla import compilar_sla
+
+
+def coluna_servico(mserv: pd.DataFrame) -> str:
+    """Primeira coluna que contenha "SERV" no nome (pode vir com espaços/encoding)."""
+    for c in mserv.columns:
+        if "SERV" in str(c).upper():
+            return c
+    raise ValueError(f"Não achei coluna SERVIÇO no mapeamento. Colunas: {mserv.columns.tolist()}")
+
+
+def carregar_status(path=MAP_STATUS) -> pd.DataFrame:
+    ms = pd.read_csv(path)
+    ms["status_key"] = norm_key_series(ms["STATUS"])
+    return ms
+
+
+def carregar_servicos(path=MAP_SERV) -> pd.DataFrame:
+    mserv = pd.read_csv(path)
+    mserv["servico_key"] = norm_key_series(mserv[coluna_servico(mserv)])
+    return mserv
+
+
+def carregar_sla(path=SLA_CAD) -> pd.DataFrame:
+    sla = pd.read_csv(path)
+    sla["cliente"] = sla["cliente"].astype(str).str.strip()
+    sla["tipo_servico"] = sla["tipo_servico"].astype(str).str.strip()
+    sla["k_cli"] = norm_key_series(sla["cliente"])
+    sla["k_tipo"] = norm_key_series(sla["tipo_servico"])
+    sla["sla_dias"] = pd.to_numeric(sla["sla_dias"], errors="coerce")
+    compilar_sla(sla)  # valida já na carga: regra repetida com meta/base diferentes é erro
+    return sla
+
+
+@lru_cache(maxsize=2)
+def _calendario(nacionais: str, estaduais: str, mtimes: tuple) -> Calendario:
+    return carregar_calendario(nacionais, estaduais)
+
+
+def calendario_sla(nacionais=FERIADOS_NACIONAIS, estaduais=FERIADOS_ESTADUAIS) -> Calendario:
+    """Calendário de dias úteis das tabelas de feriados (relido só quando um dos arquivos muda)."""
+    mtimes = tuple(p.stat().st_mtime_ns for p in (nacionais, estaduais))
+    return _calendario(str(nacionais), str(estaduais), mtimes)
+
+
+@lru_cache(maxsize=2)
+def _classificador(path: str, mtime: int) -> Classificador:
+    return carregar_classificador(path)
+
+
+def classificador_servicos(path=REGRAS_CLASSIFICACAO) -> Classificador:
+    """Classificador das regras de palavras-chave (recompilado, e com memo zerado, só quando o arquivo muda)."""
+    return _classificador(str(path), path.stat().st_mtime_ns)
+
+
+def load_mappings():
+    """(status financeiro, serviços, cadastro SLA) já com as chaves normalizadas."""
+    return carregar_status(), carregar_servicos(), carregar_sla()
+
+
+@lru_cache(maxsize=2)
+def _aproximacao(mtimes: tuple) -> Aproximacao:
+    return Aproximacao(*load_mappings())
+
+
+def aproximacao_mapas() -> Aproximacao:
+    """Índices de trigramas dos mapeamentos padrão (refeitos, com memo zerado, só quando um deles muda)."""
+    return _aproximacao(tuple(p.stat().st_mtime_ns for p in (MAP_STATUS, MAP_SERV, SLA_CAD)))
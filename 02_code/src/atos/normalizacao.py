@@ -0,0 +1,53 @@
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+
+def norm_key(x) -> str:
+    """Normaliza texto p/ chave: lowercase, sem acento, sem espaços duplos."""
+    if x is None:
+        return ""
+    s = str(x).strip().lower()
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))  # remove acentos
+    s = " ".join(s.split())  # remove espaços extras
+    return s
+
+
+def norm_key_series(s: pd.Series) -> pd.Series:
+    """`norm_key` vetorizado: normaliza cada valor distinto uma única vez e remapeia.
+
+    Equivalente a `s.apply(norm_key)` (inclusive p/ valores nulos), mas o custo
+    Python passa a ser O(n_distintos) em vez de O(n_linhas).
+    """
+    codes, uniques = pd.factorize(s)
+    chaves = np.array([norm_key(u) for u in uniques] + [""], dtype=object)
+    out = chaves[codes]
+
+    # nulos: None -> "", NaN -> "nan", pd.NA -> "<na>" (igual ao apply); memo por tipo
+    nulos = codes == -1
+    if nulos.any():
+        memo = {}
+        out[nulos] = [
+            memo[type(v)] if type(v) in memo else memo.setdefault(type(v), norm_key(v))
+            for v in s.to_numpy(dtype=object)[nulos]
+        ]
+    return pd.Series(out, index=s.index, name=s.name)
+
+
+def _as_float(x) -> np.ndarray:
+    if isinstance(x, pd.Series):
+        return pd.to_numeric(x, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return np.asarray(x, dtype=float)
+
+
+def sla_resultado(sla_dias, sla_meta_dias) -> np.ndarray:
+    """Veredito SLA vetorizado: SEM_DADO (algum nulo), DENTRO (dias <= meta) ou FORA."""
+    dias = _as_float(sla_dias)
+    meta = _as_float(sla_meta_dias)
+    return np.select(
+        [np.isnan(dias) | np.isnan(meta), dias <= meta],
+        ["SEM_DADO", "DENTRO"],
+        default="FORA",
+    )
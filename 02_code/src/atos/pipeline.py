@@ -0,0 +1,600 @@
+"""Etapas 01→07 do pipeline ATOS, usadas tanto pelos scripts quanto pelo dashboard.
+
+A etapa 01 lê a planilha em blocos e grava o ATOS_clean.parquet e o dicionário sem juntar a base em
+memória; daí em diante o frame fica em memória entre as etapas (`run`). Cada etapa grava seu
+intermediário em parquet tipado (CSV só com `csv=True`), para quem roda os scripts 01–07 separadamente.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+
+from . import config
+from .armazenamento import ler, salvar, salvar_blocos
+from .classificacao import autoclassificar
+from .instrumentacao import medido
+from .leitura import COLUNAS_PIPELINE, abas_atos, cabecalhos_atos, ler_blocos, ler_planilha
+from .mapeamentos import calendario_sla, carregar_servicos, carregar_sla, carregar_status, classificador_servicos
+from .normalizacao import norm_key_series, sla_resultado
+from .qualidade import fatias, perfilar
+from .regras_sla import RegrasSLA, aplicar_regras, compilar_sla
+
+# colunas calculadas em `clean` (não fazem parte da planilha original)
+DERIVED_COLS = ["receita", "sla_dias", "mes_autorizacao"]
+
+# origem de cada linha, acrescentada por `clean_varias`
+ORIGEM_COLS = ["arquivo", "aba"]
+RELATORIO_COLS = ["arquivo", "aba", "linhas", "segundos", "erro"]
+
+# projeção: colunas lidas do intermediário por cada etapa avulsa (None = todas)
+COLS_02 = ["SERVIÇO", "STATUS"]
+COLS_03 = ["SERVIÇO"]
+COLS_06 = ["CLIENTE", "CHAMADO", "OS", "mes_autorizacao", "billing_status", "receita", "tipo_servico", "sla_dias"]
+
+
+# ---------------- núcleo ----------------
+@medido()
+def clean(fonte, colunas=COLUNAS_PIPELINE, motor: str | None = None) -> pd.DataFrame:
+    """Planilha (caminho ou arquivo) -> base tipada, com receita, sla_dias e mes_autorizacao.
+
+    Da planilha só são lidas as `colunas` (None = todas); `motor` escolhe o leitor (ver `leitura`).
+    """
+    return _limpar(fonte if isinstance(fonte, pd.DataFrame) else ler_planilha(fonte, colunas, motor))
+
+
+def _limpar(df: pd.DataFrame) -> pd.DataFrame:
+    for c in config.TEXT_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype("string").str.strip()
+
+    for c in config.DATE_COLS:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+
+    # qualquer coluna ainda "object" vira string (robusto pro pyarrow)
+    for c in df.select_dtypes(include=["object", "string"]).columns:
+        df[c] = df[c].astype("string")
+
+    df["receita"] = pd.to_numeric(df.get("RECEITA", 0), errors="coerce").fillna(0)
+    df["sla_dias"] = (df["TÉRMINO"] - df["AUTORIZAÇÃO"]).dt.days
+    df["mes_autorizacao"] = df["AUTORIZAÇÃO"].dt.to_period("M").astype(str)
+    return df
+
+
+def _erro(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def _clean_arquivo(nome: str, fonte, colunas, motor, progresso=None) -> tuple[list, list]:
+    """Todas as abas ATOS de um arquivo, já limpas e marcadas com arquivo/aba (roda num worker).
+
+    `progresso(linhas_lidas)` acompanha a leitura, somando as abas (só quando roda no próprio processo).
+    """
+    if isinstance(fonte, bytes):
+        fonte = BytesIO(fonte)
+    t0 = time.perf_counter()
+    try:
+        abas = abas_atos(fonte)
+        if not abas:
+            raise ValueError("nenhuma aba com o cabeçalho ATOS na 2ª linha")
+    except Exception as e:
+        return [], [{"arquivo": nome, "aba": None, "linhas": 0, "segundos": time.perf_counter() - t0, "erro": _erro(e)}]
+
+    frames, relatorio = [], []
+    lidas = 0
+    for aba in abas:
+        t = time.perf_counter()
+        linhas, erro = 0, None
+        por_bloco = None
+        if progresso is not None:
+            por_bloco = lambda n, antes=lidas: progresso(antes + n)  # noqa: E731
+            por_bloco(0)
+        try:
+            df = clean(ler_planilha(fonte, colunas, motor, aba, por_bloco))
+            df["arquivo"] = pd.Series(nome, index=df.index, dtype="string")
+            df["aba"] = pd.Series(aba, index=df.index, dtype="string")
+            frames.append(df)
+            linhas = len(df)
+            lidas += linhas
+        except Exception as e:
+            erro = _erro(e)
+        relatorio.append({"arquivo": nome, "aba": aba, "linhas": linhas, "segundos": time.perf_counter() - t, "erro": erro})
+    return frames, relatorio
+
+
+@medido()
+def clean_varias(fontes, colunas=COLUNAS_PIPELINE, motor: str | None = None,
+                 processos: int | None = None, progresso=None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Vários arquivos (caminhos ou pares (nome, bytes)), todas as abas ATOS, lidos em paralelo.
+
+    Devolve a base concatenada (colunas `arquivo` e `aba` no fim) e o relatório por arquivo/aba
+    (linhas, segundos, erro); um arquivo com erro não interrompe os demais. `progresso(feitos, total,
+    linhas_lidas)` é chamado a cada arquivo pronto e, lendo no próprio processo, também a cada bloco lido;
+    uma exceção levantada nele interrompe a leitura (é o cancelamento da carga em segundo plano).
+    """
+    jobs = [f if isinstance(f, tuple) else (Path(f).name, str(f)) for f in fontes]
+    processos = min(len(jobs), processos or os.cpu_count() or 1)
+    avisar = progresso or (lambda feitos, total, linhas: None)
+
+    resultados, lidas = [], 0
+    if processos <= 1:
+        for nome, fonte in jobs:
+            resultados.append(_clean_arquivo(nome, fonte, colunas, motor,
+                                             lambda n: avisar(len(resultados), len(jobs), lidas + n)))
+            lidas += sum(r["linhas"] for r in resultados[-1][1])
+            avisar(len(resultados), len(jobs), lidas)
+    else:
+        # spawn: o dashboard chama daqui de uma thread (`carga.FilaCargas`), e fork de processo com threads
+        # pode travar o filho num lock (logging, import, pyarrow) que estava preso na hora do fork
+        with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn")) as ex:
+            futuros = [ex.submit(_clean_arquivo, nome, fonte, colunas, motor) for nome, fonte in jobs]
+            try:
+                for (nome, _), fut in zip(jobs, futuros):
+                    try:
+                        resultados.append(fut.result())
+                    except Exception as e:  # worker morreu (ex.: memória)
+                        resultados.append(([], [{"arquivo": nome, "aba": None, "linhas": 0, "segundos": float("nan"), "erro": _erro(e)}]))
+                    lidas += sum(r["linhas"] for r in resultados[-1][1])
+                    avisar(len(resultados), len(jobs), lidas)
+            except BaseException:
+                ex.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    frames = [df for dfs, _ in resultados for df in dfs]
+    relatorio = pd.DataFrame([r for _, rel in resultados for r in rel], columns=RELATORIO_COLS)
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return df, relatorio
+
+
+@medido()
+def enrich(df: pd.DataFrame, ms: pd.DataFrame, mserv: pd.DataFrame, classificador=None,
+           aproximacao=None) -> pd.DataFrame:
+    """STATUS -> billing_status e SERVIÇO -> tipo_servico/categoria.
+
+    Com `aproximacao` (`aproximacao.Aproximacao`), status/serviço sem chave exata no mapeamento usam a
+    chave mais parecida (trigramas, acima do limiar). Com `classificador` (`classificacao.Classificador`),
+    serviço que ainda ficou fora (ou mapeado sem tipo) é classificado na hora pelas palavras-chave, uma vez
+    por chave normalizada distinta; só o que nenhuma regra pega fica NAO_MAPEADO.
+    """
+    df = df.copy()
+
+    df["status_key"] = norm_key_series(df["STATUS"])
+    mapa_status = ms[["status_key", "billing_status"]]
+    if aproximacao is not None:
+        mapa_status = aproximacao.completar("STATUS", mapa_status, "status_key", df["status_key"])
+    df = df.merge(mapa_status, on="status_key", how="left")
+    df["billing_status"] = df["billing_status"].fillna("NAO_MAPEADO")
+
+    df["servico_key"] = norm_key_series(df["SERVIÇO"])
+    mapa = mserv[["servico_key", "tipo_servico", "categoria"]]
+    if aproximacao is not None:
+        mapa = aproximacao.completar("SERVIÇO", mapa, "servico_key", df["servico_key"])
+    if classificador is not None:
+        mapa = _completar_mapa(mapa, df["servico_key"], classificador)
+    df = df.merge(mapa, on="servico_key", how="left")
+    df["tipo_servico"] = df["tipo_servico"].fillna("NAO_MAPEADO")
+    df["categoria"] = df["categoria"].fillna("NAO_MAPEADO")
+
+    return df.drop(columns=["status_key", "servico_key"], errors="ignore")
+
+
+def _completar_mapa(mapa: pd.DataFrame, chaves: pd.Series, classificador) -> pd.DataFrame:
+    """Mapeamento de serviços + as chaves da base que faltam nele, com tipo vindo do `classificador`."""
+    novas = pd.Index(chaves.unique()).difference(mapa["servico_key"])
+    mapa = pd.concat([mapa, pd.DataFrame({"servico_key": novas})], ignore_index=True)
+    vazio = mapa["tipo_servico"].isna().to_numpy()
+    if vazio.any():
+        tipos, cats = classificador.classificar(mapa.loc[vazio, "servico_key"])
+        achou = tipos != ""
+        linhas = mapa.index[vazio][achou]
+        mapa.loc[linhas, "tipo_servico"] = tipos[achou]
+        mapa.loc[linhas, "categoria"] = cats[achou]
+    return mapa
+
+
+@medido()
+def apply_sla(df: pd.DataFrame, sla, calendario=None, aproximacao=None) -> pd.DataFrame:
+    """Meta de SLA (cliente + tipo, senão "*" + tipo, senão "*" + "*") e sla_resultado, sem joins.
+
+    `sla` é o cadastro (`carregar_sla`) ou as regras já compiladas; regras com `base` diferente de
+    AUTORIZAÇÃO ou em dias úteis recalculam o sla_dias da linha (`calendario` padrão: `calendario_sla()`).
+    Com `aproximacao`, cliente parecido com o de uma regra específica (acima do limiar) usa essa regra.
+    """
+    regras = sla if isinstance(sla, RegrasSLA) else compilar_sla(sla)
+    if calendario is None and regras.usa_uteis:
+        calendario = calendario_sla()
+    meta, dias = aplicar_regras(df, regras, calendario, aproximacao)
+    df = df.copy()
+    if dias is not None:
+        df["sla_dias"] = dias
+    df["sla_meta_dias"] = meta
+    df["sla_resultado"] = sla_resultado(df["sla_dias"], df["sla_meta_dias"])
+    return df
+
+
+# ---------------- etapa 01 em blocos ----------------
+class _TipoDivergente(Exception):
+    """Coluna com tipos incompatíveis entre blocos; `familia` é como a leitura deve fixá-la (`ler_blocos`)."""
+
+    def __init__(self, coluna: str, familia: str):
+        super().__init__(f"coluna {coluna!r} com tipos diferentes entre blocos (relida como {familia})")
+        self.coluna, self.familia = coluna, familia
+
+
+class _AbaInterrompida(Exception):
+    """Erro numa aba depois de parte dela já ter sido gravada."""
+
+    def __init__(self, arquivo: str, aba: str, erro: Exception):
+        super().__init__(f"{arquivo} / {aba}: {_erro(erro)}")
+        self.arquivo, self.aba = arquivo, aba
+
+
+def _familia(dtype) -> str:
+    return {"i": "num", "u": "num", "f": "num", "M": "data"}.get(dtype.kind, "obj")
+
+
+def _uniformes(blocos):
+    """Blocos com os dtypes do 1º (o parquet tem um schema só).
+
+    Bloco todo nulo, int num float e datas em outra unidade são convertidos; qualquer outra divergência
+    levanta `_TipoDivergente` com a família que a coluna teria lida inteira (as duas ou "obj").
+    """
+    dtypes = nulas = None
+    for b in blocos:
+        if dtypes is None:
+            dtypes, nulas = b.dtypes, {c for c in b.columns if b[c].isna().all()}
+            yield b
+            continue
+        mudar = {}
+        for c in b.columns:
+            s, alvo = b[c], dtypes[c]
+            vazia = s.isna().all()
+            if s.dtype == alvo:
+                pass
+            elif ((vazia and alvo.kind not in "iub") or (s.dtype.kind in "iu" and alvo.kind == "f")
+                    or s.dtype.kind == alvo.kind == "M"):
+                mudar[c] = alvo
+            else:
+                familias = ({_familia(alvo)} if c not in nulas else set()) | ({_familia(s.dtype)} if not vazia else set())
+                raise _TipoDivergente(c, familias.pop() if len(familias) == 1 else "obj")
+            if not vazia:
+                nulas.discard(c)
+        yield b.astype(mudar) if mudar else b
+
+
+def _abas(jobs, relatorio: list) -> tuple[list, list]:
+    """(arquivo, fonte, aba) de cada aba ATOS e a união das colunas delas, lendo só os cabeçalhos."""
+    abas, colunas = [], {}
+    for nome, fonte in jobs:
+        if isinstance(fonte, bytes):
+            fonte = BytesIO(fonte)
+        t0 = time.perf_counter()
+        try:
+            cabecalhos = cabecalhos_atos(fonte, None)
+            if not cabecalhos:
+                raise ValueError("nenhuma aba com o cabeçalho ATOS na 2ª linha")
+            for aba, cols in cabecalhos.items():
+                colunas.update(dict.fromkeys(cols))
+                abas.append((nome, fonte, aba))
+        except Exception as e:
+            relatorio.append({"arquivo": nome, "aba": None, "linhas": 0, "segundos": time.perf_counter() - t0, "erro": _erro(e)})
+    return abas, list(colunas)
+
+
+def _clean_blocos(abas, colunas, tipos: dict, pular: set, relatorio: list):
+    """Blocos limpos de todas as `abas`, com as `colunas` (faltantes = nulas) + derivadas + arquivo/aba.
+
+    Aba com erro antes do 1º bloco entra no relatório e é pulada; depois dele, levanta `_AbaInterrompida`
+    (o que já foi gravado dela não pode ser desfeito, então a etapa recomeça sem ela).
+    """
+    vazias = {"obj": object, "data": "datetime64[ns]"}
+    for nome, fonte, aba in abas:
+        t, linhas, erro = time.perf_counter(), 0, None
+        if (nome, aba) in pular:
+            erro = "interrompida no meio da leitura (ver aviso acima)"
+        else:
+            try:
+                for df in ler_blocos(fonte, None, aba=aba, tipos=tipos):
+                    for c in colunas:
+                        if c not in df.columns:
+                            df[c] = pd.Series(None, index=df.index, dtype=vazias.get(tipos.get(c), "float64"))
+                    df = _limpar(df[colunas])
+                    df["arquivo"] = pd.Series(nome, index=df.index, dtype="string")
+                    df["aba"] = pd.Series(aba, index=df.index, dtype="string")
+                    linhas += len(df)
+                    yield df
+            except Exception as e:
+                if linhas:
+                    raise _AbaInterrompida(nome, aba, e) from e
+                erro = _erro(e)
+        relatorio.append({"arquivo": nome, "aba": aba, "linhas": linhas, "segundos": time.perf_counter() - t, "erro": erro})
+
+
+# ---------------- etapas ----------------
+def dicionario_dados(dados, posicoes=None) -> pd.DataFrame:
+    """Dicionário de dados: tipo, vazios e exemplos de cada coluna, mais o perfil de qualidade
+    (distintos, mín./máx., quartis, mais frequentes), numa só passada em blocos (`qualidade.perfilar`).
+
+    `dados` = frame já carregado (só as `posicoes`, se dadas) ou iterável de blocos (ex.: leitura em blocos).
+    """
+    blocos = fatias(dados, posicoes=posicoes) if isinstance(dados, pd.DataFrame) else dados
+    return perfilar(blocos).sort_values("coluna", ignore_index=True)
+
+
+@medido()
+def etapa_01_dicionario(fonte=config.RAW, csv: bool = False) -> pd.DataFrame:
+    """`fonte` = uma planilha ou uma lista delas (todas as abas ATOS de cada uma); devolve o dicionário.
+
+    Lê em blocos (`leitura.ler_blocos`): cada bloco limpo é gravado no ATOS_clean.parquet e resumido no
+    dicionário (`dicionario_dados`) antes do próximo, então a memória não cresce com o tamanho da
+    planilha. Coluna com tipos diferentes entre blocos ou aba com erro no meio fazem a etapa recomeçar,
+    já com a coluna fixada / sem a aba.
+    """
+    fontes = list(fonte) if isinstance(fonte, (list, tuple)) else [fonte]
+    jobs = [f if isinstance(f, tuple) else (Path(f).name, str(f)) for f in fontes]
+    erros_cabecalho = []
+    abas, colunas = _abas(jobs, erros_cabecalho)  # dicionário descreve todas as colunas da planilha
+    originais = [c for c in colunas if c not in DERIVED_COLS + ORIGEM_COLS]
+
+    tipos, pular, amostra = {}, set(), []
+
+    def _originais(blocos):
+        for b in blocos:
+            if not amostra:
+                amostra.append(b.head(5))
+            yield b[originais]
+
+    while True:
+        relatorio = list(erros_cabecalho)
+        blocos = salvar_blocos(_uniformes(_clean_blocos(abas, colunas, tipos, pular, relatorio)),
+                               config.CLEAN_PARQUET, config.CLEAN_CSV if csv else None)
+        try:
+            dicionario = dicionario_dados(_originais(blocos))
+            break
+        except _TipoDivergente as e:
+            if tipos.get(e.coluna) == e.familia:
+                raise
+            tipos[e.coluna] = e.familia
+            print("Aviso:", e, "- recomeçando a leitura")
+        except _AbaInterrompida as e:
+            pular.add((e.arquivo, e.aba))
+            print("Aviso:", e, "- recomeçando a leitura sem ela")
+        amostra.clear()
+
+    relatorio = pd.DataFrame(relatorio, columns=RELATORIO_COLS)
+    print("Arquivos lidos:")
+    print(relatorio.to_string(index=False))
+    if not amostra:
+        raise ValueError("nenhuma planilha ATOS pôde ser lida (ver relatório acima)")
+
+    dic_path = config.ESCOPO_DIR / "dicionario_dados_ATOS.csv"
+    dicionario.to_csv(dic_path, index=False)
+
+    print("OK! ATOS_clean (parquet) salvo em:", config.CLEAN_PARQUET.resolve())
+    if csv:
+        print("OK! ATOS_clean (csv) salvo em:", config.CLEAN_CSV.resolve())
+    print("OK! Dicionário salvo em:", dic_path.resolve())
+    print("\nColunas (limpas):", list(amostra[0].columns))
+    print("\nAmostra (5 linhas):")
+    print(amostra[0])
+    return dicionario
+
+
+@medido()
+def etapa_02_listas(df: pd.DataFrame) -> None:
+    servicos = sorted(df["SERVIÇO"].dropna().astype(str).str.strip().unique())
+    status = sorted(df["STATUS"].dropna().astype(str).str.strip().unique())
+
+    (config.ESCOPO_DIR / "lista_servicos.txt").write_text("\n".join(servicos), encoding="utf-8")
+    (config.ESCOPO_DIR / "lista_status.txt").write_text("\n".join(status), encoding="utf-8")
+
+    print("OK! Salvei:")
+    print(" -", (config.ESCOPO_DIR / "lista_servicos.txt").resolve())
+    print(" -", (config.ESCOPO_DIR / "lista_status.txt").resolve())
+    print("\nSERVIÇOS (primeiros 30):")
+    print(servicos[:30])
+    print("\nSTATUS (todos):")
+    print(status)
+
+
+@medido()
+def etapa_03_mapeamento(df: pd.DataFrame) -> pd.DataFrame:
+    servicos = (
+        df["SERVIÇO"]
+        .dropna()
+        .astype(str)
+        .str.strip()
+        .drop_duplicates()
+        .sort_values()
+    )
+    map_df = pd.DataFrame({
+        "SERVIÇO": servicos,
+        "tipo_servico": "",   # você vai preencher
+        "categoria": ""       # opcional
+    })
+    map_df.to_csv(config.MAP_SERV_BASE, index=False)
+
+    print("OK! Arquivo criado em:", config.MAP_SERV_BASE.resolve())
+    print("Total de serviços:", len(map_df))
+    print("\nAmostra:")
+    print(map_df.head(10))
+    return map_df
+
+
+@medido()
+def etapa_04_autoclassificar() -> pd.DataFrame:
+    df = autoclassificar(pd.read_csv(config.MAP_SERV_BASE), classificador_servicos())
+    df.to_csv(config.MAP_SERV, index=False)
+
+    pendentes = df[df["tipo_servico"].fillna("").astype(str).str.strip() == ""]
+    print("OK! Salvei em:", config.MAP_SERV.resolve())
+    print("Serviços não classificados:", len(pendentes))
+    if len(pendentes) > 0:
+        print(pendentes[["SERVIÇO"]].head(20).to_string(index=False))
+    return df
+
+
+@medido()
+def etapa_05_enriquecer(df: pd.DataFrame, csv: bool = False) -> pd.DataFrame:
+    df = enrich(df, carregar_status(), carregar_servicos())
+    salvar(df, config.ENRIQUECIDO_PARQUET, config.ENRIQUECIDO_CSV if csv else None)
+
+    print("OK! Base enriquecida salva em:", config.ENRIQUECIDO_PARQUET.resolve())
+    print("\nTipo de serviço (top 10):")
+    print(df["tipo_servico"].value_counts(dropna=False).head(10))
+    print("\nBilling status (contagem):")
+    print(df["billing_status"].value_counts(dropna=False))
+    return df
+
+
+@medido()
+def etapa_06_kpis(df: pd.DataFrame) -> None:
+    out = config.EXPORTS_DIR
+    out.mkdir(parents=True, exist_ok=True)
+
+    # 1) Chamadas por cliente (CHAMADO único)
+    chamadas_cliente = (
+        df.dropna(subset=["CLIENTE", "CHAMADO"])
+          .groupby("CLIENTE", observed=True)["CHAMADO"]
+          .nunique()
+          .reset_index(name="qtd_chamados")
+          .sort_values("qtd_chamados", ascending=False)
+    )
+    chamadas_cliente.to_csv(out / "kpi_chamadas_por_cliente.csv", index=False)
+
+    # 2) Demandas por mês
+    demandas_mes = (
+        df.dropna(subset=["mes_autorizacao"])
+          .groupby("mes_autorizacao", observed=True)["OS"]
+          .count()
+          .reset_index(name="qtd_linhas")
+          .sort_values("mes_autorizacao")
+    )
+    demandas_mes.to_csv(out / "kpi_demandas_por_mes.csv", index=False)
+
+    # 3) Financeiro (receita por billing_status)
+    financeiro_status = (
+        df.groupby("billing_status", observed=True)["receita"]
+          .sum()
+          .reset_index(name="receita_total")
+          .sort_values("receita_total", ascending=False)
+    )
+    financeiro_status.to_csv(out / "kpi_financeiro_por_status.csv", index=False)
+
+    # Pendências (as 2 principais)
+    resumo_fin = pd.DataFrame([{
+        "receita_total": df["receita"].sum(),
+        "pendente_faturamento": df.loc[df["billing_status"] == "PENDENTE_FATURAMENTO", "receita"].sum(),
+        "faturado_pendente_receber": df.loc[df["billing_status"] == "FATURADO_PENDENTE", "receita"].sum(),
+    }])
+    resumo_fin.to_csv(out / "kpi_financeiro_resumo.csv", index=False)
+
+    # 4) SLA (provisório): meta padrão de 30 dias, sem consultar o cadastro (ver etapa 07)
+    SLA_PADRAO_DIAS = 30
+    provisorio = df.assign(sla_resultado=sla_resultado(df["sla_dias"], SLA_PADRAO_DIAS))
+    sla_por_tipo = (
+        provisorio.groupby("tipo_servico", observed=True)
+          .agg(
+              qtd=("OS", "count"),
+              sla_media=("sla_dias", "mean"),
+              sla_mediana=("sla_dias", "median"),
+              dentro=("sla_resultado", lambda s: (s == "DENTRO").sum()),
+              fora=("sla_resultado", lambda s: (s == "FORA").sum()),
+              sem_dado=("sla_resultado", lambda s: (s == "SEM_DADO").sum()),
+          )
+          .reset_index()
+          .sort_values("qtd", ascending=False)
+    )
+    sla_por_tipo.to_csv(out / "kpi_sla_por_tipo.csv", index=False)
+
+    print("OK! KPIs exportados em:", out.resolve())
+    print("Arquivos gerados:")
+    for p in sorted(out.glob("kpi_*.csv")):
+        print(" -", p.name)
+
+
+@medido()
+def etapa_07_sla(df: pd.DataFrame, csv: bool = False) -> pd.DataFrame:
+    out = config.EXPORTS_DIR
+    out.mkdir(parents=True, exist_ok=True)
+
+    df_out = apply_sla(df, carregar_sla())
+
+    # export 1: detalhe (parquet p/ o dashboard; CSV opcional)
+    salvar(df_out, config.COM_SLA_PARQUET, config.COM_SLA_CSV if csv else None)
+
+    # export 2: resumo por tipo_servico
+    sla_por_tipo = (
+        df_out.groupby("tipo_servico", observed=True)
+        .agg(
+            qtd=("OS", "count"),
+            sla_media=("sla_dias", "mean"),
+            sla_mediana=("sla_dias", "median"),
+            meta_media=("sla_meta_dias", "mean"),
+            dentro=("sla_resultado", lambda s: (s == "DENTRO").sum()),
+            fora=("sla_resultado", lambda s: (s == "FORA").sum()),
+            sem_dado=("sla_resultado", lambda s: (s == "SEM_DADO").sum()),
+        )
+        .reset_index()
+        .sort_values("qtd", ascending=False)
+    )
+    sla_por_tipo.to_csv(out / "kpi_sla_por_tipo_regras.csv", index=False)
+
+    # export 3: resumo por cliente
+    sla_por_cliente = (
+        df_out.groupby("CLIENTE", observed=True)
+        .agg(
+            qtd=("OS", "count"),
+            dentro=("sla_resultado", lambda s: (s == "DENTRO").sum()),
+            fora=("sla_resultado", lambda s: (s == "FORA").sum()),
+            sem_dado=("sla_resultado", lambda s: (s == "SEM_DADO").sum()),
+        )
+        .reset_index()
+        .sort_values("qtd", ascending=False)
+    )
+    sla_por_cliente.to_csv(out / "kpi_sla_por_cliente.csv", index=False)
+
+    print("OK! SLA aplicado.")
+    print("Gerados:")
+    print(" - atos_com_sla.parquet" + (" (+ csv)" if csv else ""))
+    print(" - kpi_sla_por_tipo_regras.csv")
+    print(" - kpi_sla_por_cliente.csv")
+    return df_out
+
+
+ETAPAS = ["01", "02", "03", "04", "05", "06", "07"]
+
+
+@medido()
+def run(fonte=config.RAW, etapas=None, csv: bool = False) -> pd.DataFrame:
+    """Executa as etapas 01→07 num só processo, passando o frame em memória a partir da 02.
+
+    A 01 grava a base limpa em blocos e as seguintes a leem do parquet; etapas puladas leem o
+    intermediário anterior do disco (ex.: `etapas=["05", "07"]`).
+    """
+    etapas = set(etapas or ETAPAS)
+    df = None
+
+    if "01" in etapas:
+        etapa_01_dicionario(fonte, csv=csv)
+    if etapas & {"02", "03", "05"}:
+        df = ler(config.CLEAN_PARQUET)
+    if "02" in etapas:
+        etapa_02_listas(df)
+    if "03" in etapas:
+        etapa_03_mapeamento(df)
+    if "04" in etapas:
+        etapa_04_autoclassificar()
+    if "05" in etapas:
+        df = etapa_05_enriquecer(df, csv=csv)
+    elif etapas & {"06", "07"}:
+        df = ler(config.ENRIQUECIDO_PARQUET)
+    if "06" in etapas:
+        etapa_06_kpis(df)
+    if "07" in etapas:
+        df = etapa_07_sla(df, csv=csv)
+    return df
@@ -0,0 +1,197 @@
+"""Perfil de qualidade dos dados por coluna, numa só passada por blocos e com memória limitada.
+
+Cada coluna tem um acumulador (`ResumoColuna`) atualizado bloco a bloco, com as colunas de um bloco
+processadas em paralelo (threads). O estado de cada coluna não cresce com o número de linhas:
+
+- vazios e linhas: contadores;
+- distintos: HyperLogLog (2^12 registros, erro típico ~1,6%) sobre o hash dos valores distintos do bloco;
+- mais frequentes: contagens de no máximo `MAX_CONTAGENS` valores (ao passar disso ficam os mais
+  frequentes); exatas enquanto a coluna tiver menos valores distintos que isso;
+- mín./máx./média: números e datas;
+- quartis: de uma amostra uniforme de `AMOSTRA` valores (fica a menor chave aleatória por valor).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .instrumentacao import medido
+
+BLOCO = 100_000
+BITS_HLL = 12
+MAX_CONTAGENS = 1_000
+AMOSTRA = 20_000
+TOP = 5
+N_EXEMPLOS = 3
+
+PERFIL_COLS = ["coluna", "tipo_pandas", "n_linhas", "n_vazios", "pct_vazios", "distintos_aprox",
+               "minimo", "maximo", "media", "p25", "p50", "p75", "mais_frequentes",
+               "exemplo_1", "exemplo_2", "exemplo_3"]
+# mín./máx./quartis: texto em todas as colunas (número, data ou data e hora), para a coluna ter um tipo só
+FAIXA_COLS = ["minimo", "maximo", "p25", "p50", "p75"]
+
+
+def fatias(df: pd.DataFrame, bloco: int = BLOCO, posicoes=None):
+    """Blocos de linhas de um frame já carregado (sem cópia) ou só das `posicoes` (um `take` por bloco)."""
+    if posicoes is None:
+        for i in range(0, len(df), bloco):
+            yield df.iloc[i:i + bloco]
+    else:
+        for i in range(0, len(posicoes), bloco):
+            yield df.take(posicoes[i:i + bloco])
+
+
+def _hash(valores: np.ndarray) -> np.ndarray:
+    """Hash de 64 bits por valor: bits do número/data (8 bytes) ou `hash()` do Python (texto; estável dentro do
+    processo, que é o que o HLL precisa), espalhados pelo finalizador do splitmix64."""
+    if valores.dtype.kind in "iufM" and valores.dtype.itemsize == 8:
+        h = valores.view(np.uint64).copy()
+    elif valores.dtype.kind == "O":
+        h = np.fromiter(map(hash, valores), np.int64, len(valores)).view(np.uint64)
+    else:
+        return pd.util.hash_array(valores)
+    with np.errstate(over="ignore"):
+        h ^= h >> np.uint64(30)
+        h *= np.uint64(0xBF58476D1CE4E5B9)
+        h ^= h >> np.uint64(27)
+        h *= np.uint64(0x94D049BB133111EB)
+        h ^= h >> np.uint64(31)
+    return h
+
+
+def _estimar_hll(registros: np.ndarray) -> float:
+    m = len(registros)
+    est = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.ldexp(1.0, -registros.astype(np.int64)))
+    zeros = int(np.count_nonzero(registros == 0))
+    if est <= 2.5 * m and zeros:
+        est = m * np.log(m / zeros)  # contagem linear: mais precisa com poucos distintos
+    return float(est)
+
+
+class ResumoColuna:
+    """Acumulador de uma coluna; `atualizar(s)` a cada bloco, `linha()` no fim."""
+
+    def __init__(self, nome: str, semente: int = 0):
+        self.nome = nome
+        self.tipo = None
+        self.n = self.vazios = 0
+        self.registros = np.zeros(2**BITS_HLL, dtype=np.uint8)
+        self.contagens = pd.Series(dtype="int64")
+        self.truncado = False
+        self.minimo = self.maximo = None
+        self.soma = 0.0
+        self.n_num = 0
+        self.amostra = np.empty(0)
+        self.chaves = np.empty(0)
+        self.exemplos = []
+        self._rng = np.random.default_rng(semente)
+
+    def atualizar(self, s: pd.Series) -> None:
+        if self.tipo is None:
+            self.tipo = s.dtype
+        validos = s.dropna()
+        self.n += len(s)
+        self.vazios += len(s) - len(validos)
+        if not len(validos):
+            return
+        if len(self.exemplos) < N_EXEMPLOS:
+            self.exemplos += validos.astype(str).head(N_EXEMPLOS - len(self.exemplos)).tolist()
+
+        vc = validos.value_counts(sort=False)
+        vc = vc[vc > 0]  # categóricas listam também as categorias sem linha
+        valores = vc.index.to_numpy()
+        self._hll(valores)
+        self._contar(pd.Series(vc.to_numpy(), index=valores))
+
+        kind = validos.dtype.kind
+        if kind in "iufM":
+            v = validos.to_numpy("datetime64[ns]") if kind == "M" else validos.to_numpy()
+            lo, hi = v.min(), v.max()
+            self.minimo = lo if self.minimo is None else min(self.minimo, lo)
+            self.maximo = hi if self.maximo is None else max(self.maximo, hi)
+            num = v.view("int64") if kind == "M" else v.astype(float)
+            if kind != "M":
+                self.soma += float(num.sum())
+                self.n_num += len(num)
+            self._amostrar(num)
+
+    def _hll(self, valores: np.ndarray) -> None:
+        h = _hash(valores)
+        resto_bits = 64 - BITS_HLL
+        idx = (h >> np.uint64(resto_bits)).astype(np.intp)
+        resto = (h & np.uint64((1 << resto_bits) - 1)).astype(np.float64)  # < 2^52: exato em float
+        rank = (resto_bits + 1 - np.frexp(resto)[1]).astype(np.uint8)  # zeros à esquerda + 1
+        np.maximum.at(self.registros, idx, rank)
+
+    def _contar(self, vc: pd.Series) -> None:
+        if len(vc) > MAX_CONTAGENS:  # bloco de alta cardinalidade: só os mais frequentes dele entram na soma
+            vc = vc.nlargest(MAX_CONTAGENS)
+            self.truncado = True
+        soma = self.contagens.add(vc, fill_value=0) if len(self.contagens) else vc
+        if len(soma) > MAX_CONTAGENS:
+            soma = soma.nlargest(MAX_CONTAGENS)
+            self.truncado = True
+        self.contagens = soma.astype("int64")
+
+    def _amostrar(self, num: np.ndarray) -> None:
+        chaves = np.concatenate([self.chaves, self._rng.random(len(num))])
+        valores = np.concatenate([self.amostra, num.astype(float)])
+        if len(chaves) > AMOSTRA:
+            fica = np.argpartition(chaves, AMOSTRA - 1)[:AMOSTRA]
+            chaves, valores = chaves[fica], valores[fica]
+        self.chaves, self.amostra = chaves, valores
+
+    def linha(self) -> dict:
+        data = self.tipo is not None and self.tipo.kind == "M"
+        quartis = np.quantile(self.amostra, [0.25, 0.5, 0.75]) if len(self.amostra) else [None] * 3
+
+        def fmt(v) -> str | None:
+            if v is None or (isinstance(v, float) and np.isnan(v)):
+                return None
+            if data:  # mín./máx. vêm como datetime64, quartis como ns em float
+                ts = pd.Timestamp(int(v) if isinstance(v, (float, np.floating)) else v).round("s")
+                return str(ts.date()) if ts == ts.normalize() else str(ts)
+            return str(v.item() if hasattr(v, "item") else v)
+
+        top = self.contagens.sort_index().nlargest(TOP)  # empates pelo valor: não depende da ordem dos blocos
+        mais = "; ".join(f"{fmt(v)} ({n}{'+' if self.truncado else ''})" for v, n in top.items())
+        exemplos = self.exemplos + [""] * (N_EXEMPLOS - len(self.exemplos))
+        return {
+            "coluna": self.nome,
+            "tipo_pandas": str(self.tipo),
+            "n_linhas": self.n,
+            "n_vazios": self.vazios,
+            "pct_vazios": round(100 * self.vazios / self.n, 2) if self.n else 0.0,
+            "distintos_aprox": (len(self.contagens) if not self.truncado
+                                else max(int(round(_estimar_hll(self.registros))), MAX_CONTAGENS)),
+            "minimo": fmt(self.minimo),
+            "maximo": fmt(self.maximo),
+            "media": self.soma / self.n_num if self.n_num else None,
+            "p25": fmt(quartis[0]),
+            "p50": fmt(quartis[1]),
+            "p75": fmt(quartis[2]),
+            "mais_frequentes": mais,
+            **{f"exemplo_{i + 1}": e for i, e in enumerate(exemplos[:N_EXEMPLOS])},
+        }
+
+
+@medido()
+def perfilar(blocos, threads: int | None = None) -> pd.DataFrame:
+    """Perfil por coluna (ver `PERFIL_COLS`) de um iterável de frames com as mesmas colunas, em uma passada.
+
+    As colunas de cada bloco são resumidas em paralelo em até `threads` threads (padrão: nº de CPUs).
+    """
+    resumos = {}
+    threads = threads or os.cpu_count() or 1
+    with ThreadPoolExecutor(threads) as ex:
+        for parte in blocos:
+            for i, c in enumerate(parte.columns):
+                resumos.setdefault(c, ResumoColuna(c, semente=i))
+            if threads <= 1:
+                for c in parte.columns:
+                    resumos[c].atualizar(parte[c])
+            else:
+                list(ex.map(lambda c: resumos[c].atualizar(parte[c]), parte.columns))
+    out = pd.DataFrame([r.linha() for r in resumos.values()], columns=PERFIL_COLS)
+    return out.astype({c: "str" for c in FAIXA_COLS + ["mais_frequentes"]} | {"media": "float64"})
@@ -0,0 +1,167 @@
+"""Registro de bases do processo: uma base enriquecida por conteúdo de upload, compartilhada por todas as sessões.
+
+A chave é o hash do upload (+ versão dos mapeamentos); a primeira sessão que pede uma chave constrói a
+base, as demais recebem o mesmo objeto (sem cópia — com copy-on-write do pandas, quem alterar um frame
+recebido altera só a sua cópia). Cada sessão segura no máximo uma base; a referência expira se a
+sessão ficar sem rerun por `SESSAO_OCIOSA`.
+
+Despejo: base sem sessões e ociosa há mais de `OCIOSO` sai; se o total passar do `teto`, saem as
+bases sem sessões menos usadas recentemente. Base em uso nunca é despejada (o teto pode ser
+ultrapassado, e `estado()` mostra isso). Memória = nº de bases distintas, não nº de usuários.
+
+Configuração por ambiente: `ATOS_REGISTRO_TETO_MB` (padrão 2048) e `ATOS_REGISTRO_OCIOSO_MIN` (padrão 30).
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+TETO_MB = float(os.environ.get("ATOS_REGISTRO_TETO_MB", 2048))
+OCIOSO = float(os.environ.get("ATOS_REGISTRO_OCIOSO_MIN", 30)) * 60
+SESSAO_OCIOSA = OCIOSO
+
+ESTADO_COLS = ["chave", "mb", "sessoes", "ocioso_seg", "criada_em"]
+
+
+def tamanho_bytes(*objetos) -> int:
+    """Bytes dos frames/séries (profundo) e dos atributos frame/série de outros objetos (ex.: cubo, índice)."""
+    total = 0
+    vistos = set()
+    pendentes = list(objetos)
+    while pendentes:
+        o = pendentes.pop()
+        if o is None or id(o) in vistos:
+            continue
+        vistos.add(id(o))
+        if isinstance(o, pd.DataFrame):
+            total += int(o.memory_usage(deep=True).sum())
+        elif isinstance(o, pd.Series):
+            total += int(o.memory_usage(deep=True))
+        elif hasattr(o, "nbytes"):
+            total += int(o.nbytes)
+        elif isinstance(o, dict):
+            pendentes.extend(o.values())
+        elif isinstance(o, (list, tuple)):
+            pendentes.extend(o)
+        elif hasattr(o, "__dict__"):
+            pendentes.extend(vars(o).values())
+    return total
+
+
+@dataclass
+class _Entrada:
+    chave: tuple
+    valor: object = None
+    bytes: int = 0
+    criada_em: float = field(default_factory=time.time)
+    ultimo_uso: float = field(default_factory=time.monotonic)
+    sessoes: dict = field(default_factory=dict)  # sessão -> último rerun (monotonic)
+    pronta: threading.Event = field(default_factory=threading.Event)
+    erro: BaseException | None = None
+
+
+class RegistroBases:
+    """Bases compartilhadas por chave, com referência por sessão, despejo por ociosidade e teto de memória."""
+
+    def __init__(self, teto_mb: float = TETO_MB, ocioso: float = OCIOSO, sessao_ociosa: float = SESSAO_OCIOSA):
+        self.teto = teto_mb * 2**20
+        self.ocioso = ocioso
+        self.sessao_ociosa = sessao_ociosa
+        self._lock = threading.Lock()
+        self._entradas: dict[tuple, _Entrada] = {}
+        self._sessao: dict[str, tuple] = {}  # sessão -> chave em uso
+
+    def obter(self, chave: tuple, sessao: str, construir, medir=tamanho_bytes):
+        """Valor da `chave` (construído uma só vez por `construir()`), registrado como em uso por `sessao`.
+
+        Sessões que pedem a mesma chave durante a construção esperam por ela. Uma exceção em
+        `construir` é repassada a quem esperava e a chave não fica no registro.
+        """
+        agora = time.monotonic()
+        with self._lock:
+            self._soltar(sessao, exceto=chave)
+            e = self._entradas.get(chave)
+            dono = e is None
+            if dono:
+                e = self._entradas[chave] = _Entrada(chave)
+            e.sessoes[sessao] = agora
+            e.ultimo_uso = agora
+            self._sessao[sessao] = chave
+
+        if dono:
+            try:
+                e.valor = construir()
+                e.bytes = medir(e.valor)
+            except BaseException as exc:
+                e.erro = exc
+                with self._lock:
+                    self._entradas.pop(chave, None)
+                    self._sessao.pop(sessao, None)
+                raise
+            finally:
+                e.pronta.set()
+        else:
+            e.pronta.wait()
+            if e.erro is not None:
+                raise e.erro
+        self.despejar()
+        return e.valor
+
+    def pronta(self, chave: tuple) -> bool:
+        """A `chave` já tem base construída (sem erro) no registro."""
+        with self._lock:
+            e = self._entradas.get(chave)
+            return e is not None and e.pronta.is_set() and e.erro is None
+
+    def _soltar(self, sessao: str, exceto=None) -> None:
+        anterior = self._sessao.pop(sessao, None)
+        if anterior is not None and anterior != exceto and anterior in self._entradas:
+            self._entradas[anterior].sessoes.pop(sessao, None)
+
+    def soltar(self, sessao: str) -> None:
+        """A sessão deixa de usar a base que segurava."""
+        with self._lock:
+            self._soltar(sessao)
+
+    def invalidar(self, manter) -> None:
+        """Descarta as bases cuja chave não passa em `manter(chave)` (ex.: mapeamentos mudaram)."""
+        with self._lock:
+            for chave in [k for k, e in self._entradas.items() if e.pronta.is_set() and not manter(k)]:
+                for s in self._entradas.pop(chave).sessoes:
+                    self._sessao.pop(s, None)
+
+    def despejar(self) -> list[tuple]:
+        """Aplica ociosidade e teto; devolve as chaves despejadas."""
+        agora = time.monotonic()
+        saem = []
+        with self._lock:
+            for e in self._entradas.values():
+                for s, t in list(e.sessoes.items()):
+                    if agora - t > self.sessao_ociosa:
+                        del e.sessoes[s]
+                        if self._sessao.get(s) == e.chave:
+                            del self._sessao[s]
+
+            livres = sorted((e for e in self._entradas.values() if not e.sessoes and e.pronta.is_set()),
+                            key=lambda e: e.ultimo_uso)
+            total = sum(e.bytes for e in self._entradas.values())
+            for e in livres:
+                if agora - e.ultimo_uso > self.ocioso or total > self.teto:
+                    saem.append(e.chave)
+                    total -= e.bytes
+            for chave in saem:
+                del self._entradas[chave]
+        return saem
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(e.bytes for e in self._entradas.values())
+
+    def estado(self) -> pd.DataFrame:
+        agora = time.monotonic()
+        with self._lock:
+            linhas = [(e.chave, e.bytes / 2**20, len(e.sessoes), agora - e.ultimo_uso,
+                       pd.Timestamp(e.criada_em, unit="s")) for e in self._entradas.values()]
+        return pd.DataFrame(linhas, columns=ESTADO_COLS)
@@ -0,0 +1,156 @@
+"""Cadastro de SLA compilado em dicionários, com precedência explícita e sem joins.
+
+Precedência: cliente + tipo → "*" + tipo → "*" + "*" (padrão global); sem regra, a meta fica nula
+(SEM_DADO). A coluna `base` do cadastro diz de qual data a contagem começa (padrão AUTORIZAÇÃO):
+sla_dias = TÉRMINO - base; a coluna `calendario` diz se conta dias corridos (padrão) ou úteis
+(feriados nacionais e da UF da linha, ver `calendario`). Chaves repetidas com meta ou base diferentes são erro na carga (antes,
+viravam linhas duplicadas no merge); repetições idênticas são ignoradas.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .calendario import CORRIDOS, MODOS, UTEIS, Calendario
+from .normalizacao import norm_key, norm_key_series
+
+CURINGA = "*"
+BASE_PADRAO = "AUTORIZAÇÃO"
+FIM = "TÉRMINO"
+
+
+@dataclass(frozen=True)
+class RegrasSLA:
+    especificas: dict  # (k_cli, k_tipo) -> nº da regra
+    por_tipo: dict  # k_tipo -> nº da regra
+    padrao: int | None  # regra "*" + "*"
+    metas: np.ndarray  # meta (dias) por regra
+    bases: np.ndarray  # coluna de início por regra
+    calendarios: np.ndarray  # "corridos" / "uteis" por regra
+
+    @property
+    def usa_uteis(self) -> bool:
+        return bool((self.calendarios == UTEIS).any())
+
+    def regra(self, k_cli: str, k_tipo: str) -> int:
+        """Nº da regra que vale para (cliente, tipo) já normalizados; -1 = nenhuma."""
+        r = self.especificas.get((k_cli, k_tipo))
+        if r is None:
+            r = self.por_tipo.get(k_tipo, self.padrao)
+        return -1 if r is None else r
+
+
+def compilar_sla(sla: pd.DataFrame) -> RegrasSLA:
+    """Cadastro (como em `carregar_sla`) -> `RegrasSLA`; ValueError em chave repetida com valores diferentes."""
+    cad = pd.DataFrame({
+        "cliente": sla["cliente"].astype(str).str.strip(),
+        "k_cli": norm_key_series(sla["cliente"]),
+        "k_tipo": norm_key_series(sla["tipo_servico"]),
+        "sla_dias": pd.to_numeric(sla["sla_dias"], errors="coerce"),
+        "base": sla["base"].fillna("").astype(str).str.strip() if "base" in sla.columns else "",
+        "calendario": sla["calendario"].fillna("").astype(str).str.strip().str.lower() if "calendario" in sla.columns else "",
+    })
+    cad["base"] = cad["base"].where(cad["base"] != "", BASE_PADRAO)
+    cad["calendario"] = cad["calendario"].where(cad["calendario"] != "", CORRIDOS)
+    desconhecidos = sorted(set(cad["calendario"]) - set(MODOS))
+    if desconhecidos:
+        raise ValueError(f"cadastro SLA: calendario {desconhecidos} inválido (use {' ou '.join(MODOS)})")
+    tipo_curinga = sla["tipo_servico"].astype(str).str.strip() == CURINGA
+
+    invalidas = cad[tipo_curinga & (cad["cliente"] != CURINGA)]
+    if len(invalidas):
+        raise ValueError("cadastro SLA: regra cliente + '*' não é suportada (use '*' + tipo ou '*' + '*'): "
+                         + ", ".join(invalidas["cliente"]))
+
+    # repetição idêntica = mesma chave normalizada e mesmos valores (o nome cru pode variar em caixa/acento)
+    cad = cad.drop_duplicates(["k_cli", "k_tipo", "sla_dias", "base", "calendario"])
+    repetidas = cad[cad.duplicated(["k_cli", "k_tipo"], keep=False)]
+    if len(repetidas):
+        raise ValueError("cadastro SLA: regras repetidas com meta/base/calendário diferentes:\n"
+                         + repetidas.to_string(index=False))
+
+    especificas, por_tipo, padrao = {}, {}, None
+    for i, (cliente, k_cli, k_tipo, curinga) in enumerate(zip(cad["cliente"], cad["k_cli"], cad["k_tipo"], tipo_curinga[cad.index])):
+        if cliente != CURINGA:
+            especificas[(k_cli, k_tipo)] = i
+        elif curinga:
+            padrao = i
+        else:
+            por_tipo[k_tipo] = i
+    return RegrasSLA(especificas, por_tipo, padrao,
+                     cad["sla_dias"].to_numpy(dtype=float), cad["base"].to_numpy(dtype=object),
+                     cad["calendario"].to_numpy(dtype=object))
+
+
+def resolver(df: pd.DataFrame, regras: RegrasSLA, aproximacao=None) -> np.ndarray:
+    """Nº da regra de cada linha (-1 = nenhuma), resolvida uma vez por par (cliente, tipo) distinto.
+
+    Com `aproximacao`, o cliente sem regra própria, mas parecido com o de uma, é trocado por ele.
+    """
+    c_cli, u_cli = pd.factorize(df["CLIENTE"])
+    c_tipo, u_tipo = pd.factorize(df["tipo_servico"])
+    # nulo vira um código extra no fim, com chave vazia (só casa com as regras "*")
+    k_cli = [norm_key(v) for v in u_cli] + [""]
+    k_tipo = [norm_key(v) for v in u_tipo] + [""]
+    if aproximacao is not None:
+        k_cli = aproximacao.canonicas("CLIENTE", k_cli)
+    c_cli = np.where(c_cli < 0, len(u_cli), c_cli)
+    c_tipo = np.where(c_tipo < 0, len(u_tipo), c_tipo)
+
+    pares, distintos = pd.factorize(c_cli.astype(np.int64) * len(k_tipo) + c_tipo)
+    lut = np.array([regras.regra(k_cli[p // len(k_tipo)], k_tipo[p % len(k_tipo)]) for p in distintos], dtype=np.int64)
+    return lut[pares]
+
+
+def contar_dias(df: pd.DataFrame, regras: RegrasSLA, regra: np.ndarray, fim,
+                calendario: Calendario | None = None, dias: np.ndarray | None = None) -> np.ndarray:
+    """Dias da `base` da regra de cada linha até `fim` (Series alinhada ou um instante), corridos ou úteis.
+
+    Com `dias` (já contados de AUTORIZAÇÃO em dias corridos), só as linhas de outro modo são recontadas;
+    sem, toda linha com regra é contada. Linha sem regra fica como está (NaN sem `dias`).
+    """
+    modos = list(dict.fromkeys(zip(regras.bases, regras.calendarios)))
+    cod_modo = np.array([modos.index(m) for m in zip(regras.bases, regras.calendarios)] + [-1], dtype=np.intp)[regra]
+    contar = [(i, b, cal) for i, (b, cal) in enumerate(modos)
+              if (dias is None or (b, cal) != (BASE_PADRAO, CORRIDOS)) and (cod_modo == i).any()]
+    dias = np.full(len(df), np.nan) if dias is None else dias
+    if not contar:
+        return dias
+
+    faltando = sorted({b for _, b, _ in contar if b not in df.columns}
+                      | ({"UF"} - set(df.columns) if any(c == UTEIS for *_, c in contar) else set()))
+    if faltando:
+        raise ValueError(f"cadastro SLA: {faltando} não é coluna da planilha")
+    if calendario is None and any(c == UTEIS for *_, c in contar):
+        raise ValueError("cadastro SLA: regra em dias úteis precisa do calendário de feriados")
+
+    por_linha = isinstance(fim, pd.Series)
+    fim = pd.to_datetime(fim, errors="coerce")
+    for i, b, cal in contar:
+        m = cod_modo == i
+        inicio = pd.to_datetime(df[b], errors="coerce")[m]
+        f = fim[m] if por_linha else fim
+        if cal == UTEIS:
+            dias[m] = calendario.dias_uteis(inicio, f, df["UF"][m])
+        else:
+            dias[m] = (f - inicio).dt.days.to_numpy(dtype=float, na_value=np.nan)
+    return dias
+
+
+def aplicar_regras(df: pd.DataFrame, regras: RegrasSLA, calendario: Calendario | None = None,
+                   aproximacao=None) -> tuple[np.ndarray, np.ndarray | None]:
+    """(meta, sla_dias) de cada linha.
+
+    `sla_dias` só é recalculado se alguma regra usa outra base que não a padrão ou dias úteis
+    (`calendario` obrigatório nesse caso); senão volta None (a coluna da limpeza já vale).
+    """
+    regra = resolver(df, regras, aproximacao)
+    tem = regra >= 0
+    meta = np.full(len(df), np.nan)
+    meta[tem] = regras.metas[regra[tem]]
+
+    outro_modo = (regras.bases != BASE_PADRAO) | (regras.calendarios != CORRIDOS)
+    if not outro_modo[regra[tem]].any():
+        return meta, None
+    dias = pd.to_numeric(df["sla_dias"], errors="coerce").to_numpy(dtype=float, na_value=np.nan, copy=True)
+    return meta, contar_dias(df, regras, regra, df[FIM], calendario, dias)
@@ -0,0 +1,235 @@
+"""Relatório executivo em Word (.docx) do recorte atual do dashboard.
+
+O conteúdo sai de poucas agregações das células do cubo (`conteudo`), e o .docx é montado clonando
+parágrafos-modelo de um documento-base já com logo e estilos, serializado uma vez e guardado em cache
+(`renderizar`). `FilaRelatorios` gera em segundo plano e guarda o resultado por (base, seleção).
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+
+import pandas as pd
+from docx import Document
+from docx.oxml.ns import qn
+from docx.shared import Inches
+
+from .config import LOGO_PATH
+from .cubo import PENDENCIAS, Recorte
+from .instrumentacao import medido
+
+TITULO = "Relatório Executivo • MJ Engenharia"
+
+# blocos do conteúdo: (TITULO_SECAO, texto) ou (PARAGRAFO, texto)
+TITULO_SECAO, PARAGRAFO = "h2", "p"
+
+
+def br_money(x: float) -> str:
+    try:
+        x = float(x)
+    except Exception:
+        x = 0.0
+    return f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _fmt_lista(nome, lista):
+    if not lista:
+        return f"- {nome}: (nenhum selecionado)"
+    if len(lista) <= 10:
+        return f"- {nome}: " + ", ".join([str(x) for x in lista])
+    return f"- {nome}: {len(lista)} selecionados (ex.: " + ", ".join([str(x) for x in lista[:5]]) + ", ...)"
+
+
+def conteudo(rec: Recorte, filtros: dict) -> list[tuple[str, str]]:
+    """Blocos do relatório; cada dimensão do recorte é agregada uma só vez e serve a todas as seções."""
+    cel = rec.cel
+    por_tipo = (cel.assign(fora=cel["linhas"].where(cel["sla_resultado"] == "FORA", 0))
+                .groupby("tipo_servico")[["n_os", "linhas", "fora", "sla_soma", "sla_n"]].sum())
+    por_billing = cel.groupby("billing_status")["receita"].sum()
+    por_sla = cel.groupby("sla_resultado")["linhas"].sum()
+    pend = cel[cel["billing_status"].isin(PENDENCIAS)]
+
+    total_reg = rec.n_linhas()
+    chamados = rec.chamados_unicos()
+    receita_total = float(cel["receita"].sum())
+    pendencias = float(pend["receita"].sum())
+
+    b = [(PARAGRAFO, f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}")]
+    t = lambda texto: b.append((TITULO_SECAO, texto))  # noqa: E731
+    p = lambda texto: b.append((PARAGRAFO, texto))  # noqa: E731
+
+    # Filtros aplicados
+    t("Escopo do relatório (filtros aplicados)")
+    p(_fmt_lista("Clientes", filtros.get("clientes", [])))
+    p(_fmt_lista("Tipos de serviço", filtros.get("tipos", [])))
+    p(_fmt_lista("Meses (Autorização)", filtros.get("meses", [])))
+
+    # Faixa real de datas (autorização)
+    dmin, dmax = rec.faixa_autorizacao()
+    if pd.notna(dmin) and pd.notna(dmax):
+        p(f"- Faixa de Autorização no recorte: {dmin.strftime('%d/%m/%Y')} a {dmax.strftime('%d/%m/%Y')}")
+
+    # 1
+    t("1) Qual o volume de chamados no recorte atual?")
+    p(f"- Registros: {total_reg}")
+    p(f"- Chamados únicos: {chamados}")
+    p(f"- Clientes no recorte: {rec.n_distintos('CLIENTE')}")
+
+    # 2
+    t("2) Quais clientes mais acionaram a MJ (Top 10) e participação?")
+    if total_reg > 0:
+        top_cli = (rec.chamados_por("CLIENTE")
+                   .reset_index(name="qtd_chamados")
+                   .sort_values("qtd_chamados", ascending=False)
+                   .head(10))
+        total_ch = max(1, chamados)
+        for cli, qtd in zip(top_cli["CLIENTE"], top_cli["qtd_chamados"]):
+            p(f"- {cli}: {int(qtd)} chamados ({(int(qtd) / total_ch) * 100:.1f}%)")
+    else:
+        p("Sem dados suficientes para cálculo.")
+
+    # 3
+    t("3) Quais tipos de serviço mais demandados (Top 10)?")
+    top_tipo = por_tipo["n_os"].reset_index(name="qtd").sort_values("qtd", ascending=False).head(10)
+    for tipo, qtd in zip(top_tipo["tipo_servico"], top_tipo["qtd"]):
+        p(f"- {tipo}: {int(qtd)} registros")
+
+    # 4
+    t("4) Como está o funil financeiro no recorte atual?")
+    p(f"- Receita total: R$ {br_money(receita_total)}")
+    fin = por_billing.reset_index(name="receita_total").sort_values("receita_total", ascending=False)
+    for status, valor in zip(fin["billing_status"], fin["receita_total"]):
+        p(f"- {status}: R$ {br_money(float(valor))}")
+
+    # 5
+    t("5) Qual o valor em pendência e onde está concentrado?")
+    p(f"- Pendências (A faturar + A receber): R$ {br_money(pendencias)}")
+    pend_cli = (pend.groupby("CLIENTE")["receita"].sum()
+                .reset_index(name="pendencia")
+                .sort_values("pendencia", ascending=False)
+                .head(5))
+    if len(pend_cli) == 0:
+        p("- Sem pendências no recorte atual.")
+    else:
+        p("Top 5 clientes por pendência:")
+        for cli, valor in zip(pend_cli["CLIENTE"], pend_cli["pendencia"]):
+            p(f"- {cli}: R$ {br_money(float(valor))}")
+
+    # 6
+    t("6) Qual a performance de SLA (dentro/fora) no recorte atual?")
+    if total_reg > 0:
+        for rotulo, chave in (("Dentro", "DENTRO"), ("Fora", "FORA"), ("Sem dado", "SEM_DADO")):
+            qtd = int(por_sla.get(chave, 0))
+            p(f"- {rotulo}: {qtd} ({(qtd/total_reg*100):.1f}%)")
+    else:
+        p("Sem dados suficientes para cálculo de SLA.")
+
+    # 7
+    t("7) Quais tipos de serviço mais estouram SLA? (Top 5)")
+    sla_tipo = por_tipo["fora"].reset_index(name="fora").sort_values("fora", ascending=False).head(5)
+    if len(sla_tipo) == 0 or int(sla_tipo["fora"].sum()) == 0:
+        p("Sem casos fora do SLA no recorte atual.")
+    else:
+        for tipo, fora in zip(sla_tipo["tipo_servico"], sla_tipo["fora"]):
+            p(f"- {tipo}: {int(fora)} fora")
+
+    # 8
+    t("8) Quais casos críticos (fora do SLA) exigem ação imediata? (Top 10)")
+    crit = rec.criticos(10)
+    if len(crit) == 0:
+        p("Nenhum caso fora do SLA no recorte atual.")
+    else:
+        for _, r in crit.iterrows():
+            p(f"- Cliente: {r.get('CLIENTE','')} | Ponto: {r.get('PONTO','')} | Tipo: {r.get('tipo_servico','')} | "
+              f"Atraso: {int(r.get('atraso_dias',0))} dias | OS: {r.get('OS','')} | Chamado: {r.get('CHAMADO','')}")
+
+    # 9
+    t("9) Qual o tempo de ciclo médio/mediano por tipo de serviço?")
+    media = (por_tipo["sla_soma"] / por_tipo["sla_n"].where(por_tipo["sla_n"] > 0)).rename("sla_dias")
+    ciclo = (pd.DataFrame({"media": media, "mediana": rec.mediana_sla_por("tipo_servico")})
+             .reset_index()
+             .sort_values("media", ascending=False))
+    for tipo, med, mediana in zip(ciclo["tipo_servico"].head(10), ciclo["media"], ciclo["mediana"]):
+        p(f"- {tipo}: média {med:.1f} dias | mediana {mediana:.1f} dias")
+
+    # 10
+    t("10) Resumo executivo: 3 ações recomendadas")
+    p("- Ação 1: Priorizar faturamento dos itens em PENDENTE_FATURAMENTO.")
+    p("- Ação 2: Cobrança/recebimento dos itens em FATURADO_PENDENTE.")
+    p("- Ação 3: Revisar causas de FORA do SLA nos tipos com maior incidência.")
+    return b
+
+
+@lru_cache(maxsize=4)
+def _modelo(logo: str, logo_mtime: float) -> bytes:
+    """Documento-base serializado: logo, título e um parágrafo-modelo por estilo (título de seção, texto)."""
+    doc = Document()
+    if logo_mtime:
+        try:
+            doc.add_picture(logo, width=Inches(1.4))
+        except Exception:
+            pass
+    doc.add_heading(TITULO, level=1)
+    doc.add_heading("modelo", level=2)
+    doc.add_paragraph("modelo")
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def renderizar(blocos: list[tuple[str, str]]) -> bytes:
+    """.docx dos `blocos`, clonando os parágrafos-modelo do documento-base (sem consulta de estilos por parágrafo)."""
+    logo_mtime = LOGO_PATH.stat().st_mtime if LOGO_PATH.exists() else 0.0
+    doc = Document(BytesIO(_modelo(str(LOGO_PATH), logo_mtime)))
+    *_, titulo, texto = doc.paragraphs
+    modelos = {TITULO_SECAO: titulo._p, PARAGRAFO: texto._p}
+    ancora = titulo._p
+    for tipo, conteudo_ in blocos:
+        el = deepcopy(modelos[tipo])
+        el.find(".//" + qn("w:t")).text = conteudo_
+        ancora.addprevious(el)
+    for el in modelos.values():
+        el.getparent().remove(el)
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+@medido()
+def gerar_relatorio_docx(rec: Recorte, filtros: dict) -> bytes:
+    """Relatório executivo do recorte atual, montado a partir das células do cubo de KPIs."""
+    return renderizar(conteudo(rec, filtros))
+
+
+class FilaRelatorios:
+    """Relatórios gerados num pool de threads, guardados por chave (hash da base + seleção).
+
+    Pedir de novo uma chave já pedida devolve o mesmo `Future` (pronto ou em andamento); pedidos que
+    falharam são refeitos. Guarda no máximo `max_itens` relatórios (sai o usado há mais tempo).
+    """
+
+    def __init__(self, max_workers: int = 2, max_itens: int = 32):
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="relatorio")
+        self._itens: OrderedDict[tuple, Future] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_itens = max_itens
+
+    def obter(self, chave: tuple) -> Future | None:
+        with self._lock:
+            fut = self._itens.get(chave)
+            if fut is not None:
+                self._itens.move_to_end(chave)
+            return fut
+
+    def pedir(self, chave: tuple, rec: Recorte, filtros: dict) -> Future:
+        with self._lock:
+            fut = self._itens.get(chave)
+            if fut is None or (fut.done() and fut.exception() is not None):
+                fut = self._itens[chave] = self._pool.submit(gerar_relatorio_docx, rec, filtros)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+            return fut
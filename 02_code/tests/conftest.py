@@ -0,0 +1,38 @@
+"""Testes do pacote `atos`; rodar da raiz do repositório: `python -m pytest 02_code/tests`."""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(RAIZ / "02_code" / "src"))
+sys.path.insert(0, str(RAIZ / "02_code" / "bench"))
+os.chdir(RAIZ)  # `config` usa caminhos relativos à raiz (mapeamentos em 04_docs/escopo)
+
+
+@pytest.fixture(scope="session")
+def mapas():
+    """(status, serviços, cadastro SLA) de 04_docs/escopo, como em `load_mappings`."""
+    from atos.mapeamentos import load_mappings
+
+    return load_mappings()
+
+
+@pytest.fixture(scope="session")
+def raw_sintetico():
+    """Base limpa (etapa 01) de uma planilha sintética de 3 mil linhas (`bench/gerar_atos.py`)."""
+    from gerar_atos import gerar_base
+
+    from atos.pipeline import clean
+
+    return clean(gerar_base(3000, seed=1))
+
+
+@pytest.fixture(scope="session")
+def base_sintetica(raw_sintetico, mapas):
+    """`raw_sintetico` enriquecida e com SLA (etapas 05 e 07)."""
+    from atos.pipeline import apply_sla, enrich
+
+    ms, mserv, sla = mapas
+    return apply_sla(enrich(raw_sintetico, ms, mserv), sla)
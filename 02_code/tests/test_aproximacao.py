@@ -0,0 +1,75 @@
+"""`aproximacao`: limiar por campo, empates, clientes das regras SLA e a tabela de revisão."""
+import pandas as pd
+import pytest
+
+from atos.aproximacao import REVISAO_COLS, Aproximacao, IndiceTrigramas
+from atos.normalizacao import norm_key_series
+from atos.pipeline import apply_sla, enrich
+
+
+@pytest.fixture(scope="module")
+def mapas():
+    ms = pd.DataFrame({"STATUS": ["A faturar", "A receber"], "billing_status": ["PENDENTE_FATURAMENTO", "FATURADO_PENDENTE"]})
+    ms["status_key"] = norm_key_series(ms["STATUS"])
+    mserv = pd.DataFrame({"SERVIÇO": ["Telhado", "Pintura", "Elétrica"], "tipo_servico": ["Coberta/Telhado", "Pintura", None],
+                          "categoria": ["Manutenção", "Manutenção", None]})
+    mserv["servico_key"] = norm_key_series(mserv["SERVIÇO"])
+    sla = pd.DataFrame({"cliente": ["*", "*", "Banco do Nordeste", "Cliente 357"],
+                        "tipo_servico": ["Coberta/Telhado", "Pintura", "Coberta/Telhado", "Coberta/Telhado"],
+                        "sla_dias": [30, 30, 10, 5]})
+    return ms, mserv, sla
+
+
+@pytest.fixture(scope="module")
+def aprox(mapas):
+    return Aproximacao(*mapas)
+
+
+def test_limiar(mapas, aprox):
+    # telhados ~ telhado 0,70 (>= 0,6); tehado 0,50 e pint 0,44 ficam abaixo; "eletrica" não tem tipo no mapeamento
+    assert aprox.casar("SERVIÇO", ["telhados", "tehado", "pint", "eletricas", "", "xyz"]) == {"telhados": "telhado"}
+    assert aprox.casar("STATUS", ["a faturarr"]) == {"a faturarr": "a faturar"}
+    assert Aproximacao(*mapas, limiares={"SERVIÇO": 0.5}).casar("SERVIÇO", ["tehado"]) == {"tehado": "telhado"}
+
+
+def test_empate_fica_com_a_primeira():
+    assert IndiceTrigramas(["abc", "abd"]).melhor("ab") == ("abc", pytest.approx(0.4))
+    assert IndiceTrigramas(["abd", "abc"]).melhor("ab") == ("abd", pytest.approx(0.4))
+    assert IndiceTrigramas(["abc"], minimo=0.5).melhor("ab") == (None, 0.0)
+
+
+def test_canonicas_cliente(aprox):
+    """Cliente só vira o da regra a partir de 0,85: "banco do nordestes" (0,85) sim, "cliente 35" (0,77) não."""
+    chaves = ["banco do nordestes", "cliente 35", "banco do nordeste", "", "banco do nordestes"]
+    assert aprox.canonicas("CLIENTE", chaves) == ["banco do nordeste", "cliente 35", "banco do nordeste", "",
+                                                 "banco do nordeste"]
+
+
+def test_resolver_usa_a_regra_do_cliente_parecido(mapas, aprox):
+    df = pd.DataFrame({"CLIENTE": ["Banco do Nordestes", "Cliente 35"], "tipo_servico": ["Coberta/Telhado"] * 2,
+                       "sla_dias": [8.0, 8.0]})
+    sla = mapas[2]
+    assert apply_sla(df, sla)["sla_meta_dias"].tolist() == [30, 30]
+    assert apply_sla(df, sla, aproximacao=aprox)["sla_meta_dias"].tolist() == [10, 30]
+
+
+def test_enrich_e_revisao(mapas, aprox):
+    ms, mserv, _ = mapas
+    df = pd.DataFrame({"STATUS": ["A faturarr", "A faturar", "Cancelado"],
+                       "SERVIÇO": ["Telhados", "Tehado", "Telhados"],
+                       "CLIENTE": ["Banco do Nordestes", "Cliente 35", "Outro"]})
+    out = enrich(df, ms, mserv, aproximacao=aprox)
+    assert out["billing_status"].tolist() == ["PENDENTE_FATURAMENTO", "PENDENTE_FATURAMENTO", "NAO_MAPEADO"]
+    assert out["tipo_servico"].tolist() == ["Coberta/Telhado", "NAO_MAPEADO", "Coberta/Telhado"]
+
+    rev = aprox.revisao(df)
+    assert list(rev.columns) == REVISAO_COLS
+    linhas = {(r.campo, r.valor): (r.linhas, r.sugestao, r.aplicado) for r in rev.itertuples()}
+    assert linhas == {
+        ("SERVIÇO", "Telhados"): (2, "telhado", True),
+        ("STATUS", "A faturarr"): (1, "a faturar", True),
+        ("CLIENTE", "Banco do Nordestes"): (1, "banco do nordeste", True),
+        ("SERVIÇO", "Tehado"): (1, "telhado", False),
+        ("CLIENTE", "Cliente 35"): (1, "cliente 357", False),
+    }
+    assert rev["aplicado"].tolist() == [True] * 3 + [False] * 2 and rev["linhas"].iloc[0] == 2
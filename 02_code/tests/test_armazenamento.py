@@ -0,0 +1,47 @@
+"""`armazenamento`: o parquet gravado em blocos volta com o schema de `tipar`, inteiro ou só com as colunas pedidas."""
+import pandas as pd
+import pytest
+
+from atos.armazenamento import CATEGORY_COLS, ler, salvar, salvar_blocos, tipar
+from atos.qualidade import fatias
+
+COLUNAS = ["OS", "CLIENTE", "tipo_servico", "AUTORIZAÇÃO", "receita"]
+
+
+def _comparar(lido: pd.DataFrame, esperado: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(lido, esperado.reset_index(drop=True), check_categorical=False)
+
+
+def test_salvar_blocos_ida_e_volta(base_sintetica, tmp_path):
+    path, csv = tmp_path / "base.parquet", tmp_path / "base.csv.gz"
+    repassados = list(salvar_blocos(fatias(base_sintetica, bloco=700), path, csv))
+
+    assert sum(map(len, repassados)) == len(base_sintetica)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["base.csv.gz", "base.parquet"]
+    esperado = tipar(base_sintetica)
+    lido = ler(path)
+    _comparar(lido, esperado)
+    for c in CATEGORY_COLS:
+        if c in lido.columns:
+            assert isinstance(lido[c].dtype, pd.CategoricalDtype), c
+    assert len(pd.read_csv(csv)) == len(base_sintetica)
+
+    projetado = ler(path, COLUNAS)
+    assert list(projetado.columns) == COLUNAS
+    _comparar(projetado, esperado[COLUNAS])
+
+
+def test_salvar_igual_a_salvar_blocos(base_sintetica, tmp_path):
+    salvar(base_sintetica, tmp_path / "inteiro.parquet")
+    list(salvar_blocos(fatias(base_sintetica, bloco=1_000), tmp_path / "blocos.parquet"))
+    _comparar(ler(tmp_path / "blocos.parquet", COLUNAS), ler(tmp_path / "inteiro.parquet", COLUNAS))
+
+
+def test_interrompido_nao_grava(base_sintetica, tmp_path):
+    def blocos():
+        yield from fatias(base_sintetica.iloc[:1_000], bloco=400)
+        raise ValueError("aba corrompida")
+
+    with pytest.raises(ValueError):
+        list(salvar_blocos(blocos(), tmp_path / "base.parquet", tmp_path / "base.csv"))
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,66 @@
+"""`Calendario.dias_uteis` com as tabelas de feriados de 04_docs/escopo e a coluna `calendario` do cadastro SLA."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from atos import config
+from atos.calendario import carregar_calendario
+from atos.pipeline import apply_sla
+
+
+@pytest.fixture(scope="module")
+def cal():
+    return carregar_calendario(config.FERIADOS_NACIONAIS, config.FERIADOS_ESTADUAIS)
+
+
+def _dias(cal, pares, uf):
+    inicio, fim = zip(*pares)
+    return cal.dias_uteis(pd.to_datetime(list(inicio)), pd.to_datetime(list(fim)), uf).tolist()
+
+
+@pytest.mark.parametrize("inicio, fim, uf, esperado", [
+    ("2025-04-18", "2025-04-22", "SP", 1),  # (sex, ter]: sáb, dom, Tiradentes (seg), ter
+    ("2025-06-23", "2025-06-25", "AL", 1),  # São João (ter) só em AL
+    ("2025-06-23", "2025-06-25", "SP", 2),
+    ("2025-06-23", "2025-06-25", None, 2),  # UF nula: só os nacionais
+    ("2025-06-23", "2025-06-25", "xx", 2),  # UF desconhecida: idem
+    ("2025-06-23", "2025-06-25", " al ", 1),  # UF com caixa/espaços
+    ("2023-11-17", "2023-11-21", "SP", 2),  # 20/11 nacional só a partir de 2024
+    ("2023-11-17", "2023-11-21", "RJ", 1),  # ... mas já era feriado estadual no RJ
+    ("2024-11-19", "2024-11-21", "SP", 1),
+    ("2025-06-27", "2025-06-30", "SP", 1),  # (sex, seg]: fim de semana não conta
+    ("2025-06-28", "2025-06-29", "SP", 0),  # (sáb, dom]
+    ("2025-06-25", "2025-06-25", "SP", 0),
+])
+def test_dias_uteis(cal, inicio, fim, uf, esperado):
+    assert _dias(cal, [(inicio, fim)], [uf]) == [esperado]
+
+
+def test_fim_escalar_e_datas_nulas(cal):
+    inicio = pd.Series(pd.to_datetime(["2025-06-23", None, "2025-06-20"]))
+    out = cal.dias_uteis(inicio, pd.Timestamp("2025-06-25 14:30"), pd.Series(["AL", "SP", "SP"]))
+    assert out[0] == 1 and np.isnan(out[1]) and out[2] == 3
+    assert np.isnan(cal.dias_uteis(inicio[:1], pd.Series([pd.NaT]), ["SP"])[0])
+
+
+def test_intervalo_amplia_sob_demanda(cal):
+    """Uma consulta em anos fora do que já foi montado remonta o acumulado sem mudar as anteriores."""
+    antes = _dias(cal, [("2025-04-18", "2025-04-22")], ["SP"])
+    # (qui, ter]: sex, seg, ter (Sexta-feira Santa só está na tabela com ano, e Tiradentes caiu no domingo)
+    assert _dias(cal, [("2019-04-18", "2019-04-23")], ["SP"]) == [3]
+    assert _dias(cal, [("2025-04-18", "2025-04-22")], ["SP"]) == antes
+
+
+def test_coluna_calendario_no_cadastro():
+    """Regra "uteis" reconta o sla_dias em dias úteis; a "corridos" fica com o da limpeza."""
+    aut, ter = pd.to_datetime(["2025-06-20"] * 2), pd.to_datetime(["2025-06-30"] * 2)
+    df = pd.DataFrame({"CLIENTE": ["A", "A"], "tipo_servico": ["Pintura", "Civil"], "UF": ["AL", "AL"],
+                       "AUTORIZAÇÃO": aut, "TÉRMINO": ter, "sla_dias": (ter - aut).days})
+    sla = pd.DataFrame({"cliente": ["*", "*"], "tipo_servico": ["Pintura", "Civil"], "sla_dias": [5, 5],
+                        "calendario": ["uteis", ""]})
+    out = apply_sla(df, sla)
+    # (sex 20/06, seg 30/06] em AL: 23, 25, 26, 27, 30 (24/06 é São João)
+    assert out["sla_dias"].tolist() == [5, 10]
+    assert out["sla_resultado"].tolist() == ["DENTRO", "FORA"]
+    with pytest.raises(ValueError, match="calendario"):
+        apply_sla(df, sla.assign(calendario=["util", ""]))
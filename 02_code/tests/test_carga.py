@@ -0,0 +1,127 @@
+"""`FilaCargas`/`Progresso`: cancelamento sem sessão interessada, carga compartilhada, `liberar` e ingestão cancelada."""
+import threading
+import time
+
+import pytest
+
+from atos import incremental
+from atos.carga import Cancelada, FilaCargas, Progresso
+from atos.incremental import aguardar_gravacao, ingerir
+
+
+def _bloqueada(iniciou: threading.Event, segue: threading.Event, valor="pronta"):
+    """`construir` que avisa que começou, espera `segue` e então marca progresso (ponto de cancelamento)."""
+    def construir(progresso: Progresso):
+        iniciou.set()
+        assert segue.wait(5)
+        progresso.marcar("Enriquecendo", 0.5)
+        return valor
+    return construir
+
+
+def test_nova_chave_cancela_a_anterior():
+    fila = FilaCargas(max_workers=2)
+    iniciou, segue = threading.Event(), threading.Event()
+    velha = fila.pedir(("a",), "s1", _bloqueada(iniciou, segue))
+    assert iniciou.wait(5)
+
+    nova = fila.pedir(("b",), "s1", lambda p: "b")
+    segue.set()
+
+    assert isinstance(velha.futuro.exception(5), Cancelada)
+    assert velha.progresso.cancelada
+    assert nova.futuro.result(5) == "b"
+    assert fila.da_sessao("s1") is nova
+
+
+def test_segunda_sessao_compartilha_e_impede_cancelamento():
+    fila = FilaCargas(max_workers=2)
+    iniciou, segue = threading.Event(), threading.Event()
+    chamadas = []
+
+    def construir(progresso):
+        chamadas.append(1)
+        return _bloqueada(iniciou, segue)(progresso)
+
+    c1 = fila.pedir(("a",), "s1", construir)
+    assert iniciou.wait(5)
+    c2 = fila.pedir(("a",), "s2", construir)
+    assert c1 is c2 and c1.sessoes == {"s1", "s2"}
+
+    fila.pedir(("b",), "s1", lambda p: "b")  # s1 muda de upload; s2 ainda espera ("a",)
+    segue.set()
+
+    assert c1.futuro.result(5) == "pronta"
+    assert not c1.progresso.cancelada
+    assert len(chamadas) == 1
+    assert fila.da_sessao("s2") is c1
+
+
+def test_liberar_pronta_nao_adotada():
+    liberadas = []
+    fila = FilaCargas(liberar=liberadas.append)
+    c = fila.pedir(("a",), "s1", lambda p: "arquivo")
+    assert c.futuro.result(5) == "arquivo"
+
+    fila.soltar("s1")
+    assert liberadas == ["arquivo"]
+    assert fila.da_sessao("s1") is None
+
+
+def test_liberar_ao_expirar():
+    liberadas = []
+    fila = FilaCargas(expira=0, liberar=liberadas.append)
+    c = fila.pedir(("a",), "s1", lambda p: "arquivo")
+    c.futuro.result(5)
+    while c.fim is None:  # o callback do término roda logo depois do resultado
+        time.sleep(0.01)
+
+    assert fila.da_sessao("s1") is None
+    assert liberadas == ["arquivo"]
+
+
+def test_cancelada_nao_libera():
+    liberadas = []
+    fila = FilaCargas(liberar=liberadas.append)
+    iniciou, segue = threading.Event(), threading.Event()
+    c = fila.pedir(("a",), "s1", _bloqueada(iniciou, segue))
+    assert iniciou.wait(5)
+    fila.soltar("s1")
+    segue.set()
+
+    assert isinstance(c.futuro.exception(5), Cancelada)
+    assert liberadas == []
+
+
+def _arquivos(pasta):
+    return {p.relative_to(pasta): p.read_bytes() for p in sorted(pasta.rglob("*")) if p.is_file()}
+
+
+@pytest.fixture
+def sem_memoria():
+    incremental._memoria.clear()
+    yield
+    incremental._memoria.clear()
+
+
+def test_ingerir_cancelada_nao_toca_a_loja(raw_sintetico, mapas, tmp_path, sem_memoria):
+    ms, mserv, sla = mapas
+    metade = raw_sintetico.iloc[:1500]
+    ingerir(metade, ms, mserv, sla, ["v1"], pasta=tmp_path)
+    aguardar_gravacao()
+    antes, memoria = _arquivos(tmp_path), dict(incremental._memoria)
+
+    progresso = Progresso()
+    progresso.cancelar()
+    with pytest.raises(Cancelada):
+        ingerir(raw_sintetico, ms, mserv, sla, ["v1"], pasta=tmp_path,
+                progresso=lambda feitas, total: progresso.marcar("Enriquecendo", feitas / total))
+    aguardar_gravacao()
+
+    assert _arquivos(tmp_path) == antes
+    assert incremental._memoria.keys() == memoria.keys()
+    assert all(incremental._memoria[k] is v for k, v in memoria.items())
+
+    ing = ingerir(raw_sintetico, ms, mserv, sla, ["v1"], pasta=tmp_path)
+    aguardar_gravacao()
+    assert (ing.inseridas, ing.removidas, ing.reaproveitadas) == (1500, 0, 1500)
@@ -0,0 +1,57 @@
+"""`Classificador` contra a cadeia de `if`s de 04_auto_classificar_servicos.py que ele substituiu."""
+import numpy as np
+import pandas as pd
+
+from atos.classificacao import Classificador, carregar_classificador
+
+
+def classify_antigo(service: str) -> tuple[str, str]:
+    """`classify` de 04_auto_classificar_servicos.py antes das regras irem para o CSV."""
+    s = str(service).strip().lower()
+    if "emergenc" in s:
+        return "Emergencial", "Atendimento"
+    if "laudo" in s:
+        return "Laudos", "Técnico"
+    if "pintura" in s:
+        return "Pintura", "Manutenção"
+    if any(k in s for k in ["desentup", "tubula", " af", "af ", "infiltra"]):
+        return "Hidráulica", "Manutenção"
+    if any(k in s for k in ["porta", "fechadura", "dobradi", "mola", "gradil"]):
+        return "Portas & Acessos", "Manutenção"
+    if any(k in s for k in ["fachada", "acm"]):
+        return "Fachada & Revestimento", "Reforma/Manutenção"
+    if "coberta" in s or "telhado" in s or "tehado" in s:
+        return "Coberta/Telhado", "Manutenção/Reforma"
+    if "acessibil" in s:
+        return "Acessibilidade", "Adequação"
+    if "sinaliza" in s:
+        return "Sinalização", "Adequação"
+    if any(k in s for k in ["reforma", "layout", "parede", "escada", "elevador", "cantoneira"]):
+        return "Civil", "Obra/Adequação"
+    return "", ""
+
+
+def _servicos(n: int, seed: int = 0) -> list[str]:
+    """Serviços sintéticos: 1 a 3 pedaços de termos das regras, palavras soltas e caixa/espaços variados."""
+    rng = np.random.default_rng(seed)
+    pedacos = ["Emergencial", "laudo", "PINTURA", "desentupimento", "tubulação", " AF", "af ", "Infiltração",
+               "porta", "fechadura", "dobradiça", "mola aérea", "gradil", "fachada", "ACM", "coberta", "telhado",
+               "tehado", "acessibilidade", "sinalização", "reforma", "layout", "parede", "escada", "elevador",
+               "cantoneira", "de", "troca", "agência", "piso", "vidro", "  ", "\t", "caf", "afeto"]
+    return ["".join(rng.choice(pedacos, rng.integers(1, 4))) for _ in range(n)]
+
+
+def test_regras_do_arquivo_iguais_ao_if():
+    servicos = _servicos(20_000) + ["", "   ", "nan"]
+    tipos, cats = carregar_classificador().classificar(pd.Series(servicos))
+    assert list(zip(tipos, cats)) == [classify_antigo(s) for s in servicos]
+
+
+def test_tipo_repetido_mais_abaixo_mantem_a_ordem():
+    """Termo de um tipo que reaparece depois de outro tipo não sobe para a prioridade da 1ª aparição."""
+    regras = pd.DataFrame({"tipo_servico": ["Pintura", "Civil", "Pintura"], "categoria": ["M", "O", "M"],
+                           "termo": ["pintura", "parede", "muro"]})
+    clf = Classificador(regras)
+    assert clf.classificar_um("Parede do muro") == ("Civil", "O")
+    assert clf.classificar_um("Pintura da parede") == ("Pintura", "M")
+    assert clf.classificar_um("Muro") == ("Pintura", "M")
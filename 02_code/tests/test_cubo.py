@@ -0,0 +1,75 @@
+"""`CuboKPI`: rollups de um recorte contra o groupby na base filtrada, e `atualizar` contra `de_base`."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from atos.cubo import MEDIDAS, CuboKPI
+
+
+def _selecoes(df: pd.DataFrame) -> list[dict]:
+    clientes = df["CLIENTE"].value_counts().index
+    return [
+        {},
+        {"CLIENTE": [clientes[0]]},
+        {"CLIENTE": list(clientes[1:4]), "tipo_servico": ["Pintura", "Civil", "NAO_MAPEADO"]},
+        {"mes_autorizacao": ["2024-05", "2025-01"], "billing_status": ["PENDENTE_FATURAMENTO"]},
+        {"sla_resultado": ["FORA"], "CLIENTE": ["nenhum cliente"]},
+    ]
+
+
+def _filtrar(df: pd.DataFrame, sel: dict) -> pd.DataFrame:
+    mask = np.ones(len(df), dtype=bool)
+    for dim, valores in sel.items():
+        if valores:
+            mask &= df[dim].isin(valores).to_numpy()
+    return df[mask]
+
+
+def _conferir(cubo: CuboKPI, df: pd.DataFrame, sel: dict) -> None:
+    rec, f = cubo.recorte(sel), _filtrar(df, sel)
+    sla = pd.to_numeric(f["sla_dias"], errors="coerce")
+    assert rec.n_linhas() == len(f)
+    assert rec.total("n_os") == f["OS"].notna().sum()
+    assert rec.total("receita") == pytest.approx(f["receita"].sum())
+    assert rec.total("sla_soma") == pytest.approx(sla.sum())
+    assert rec.total("sla_n") == sla.notna().sum()
+    assert rec.chamados_unicos() == f["CHAMADO"].nunique()
+
+    esperado = f.groupby("CLIENTE")["CHAMADO"].nunique()
+    pd.testing.assert_series_equal(rec.chamados_por("CLIENTE").sort_index(), esperado[esperado > 0].sort_index(),
+                                   check_dtype=False, check_index_type=False)
+    esperado = f.assign(sla_dias=sla).groupby("tipo_servico")["sla_dias"].median()
+    pd.testing.assert_series_equal(rec.mediana_sla_por("tipo_servico").sort_index(), esperado.sort_index(),
+                                   check_index_type=False)
+
+    fora = f[f["sla_resultado"] == "FORA"]
+    atraso = (sla[fora.index] - fora["sla_meta_dias"]).fillna(0)
+    esperado = fora.assign(atraso_dias=atraso, _id=fora.index).sort_values(["atraso_dias", "_id"],
+                                                                           ascending=[False, True]).head(10)
+    pd.testing.assert_frame_equal(rec.criticos(10), esperado.drop(columns="_id"))
+
+
+def test_recorte_igual_ao_groupby(base_sintetica):
+    cubo = CuboKPI.de_base(base_sintetica)
+    for sel in _selecoes(base_sintetica):
+        _conferir(cubo, base_sintetica, sel)
+
+
+def test_atualizar_igual_a_de_base(base_sintetica):
+    """Tirar 200 linhas e pôr 150 (ids novos, clientes e chamados novos) = montar o cubo da base nova."""
+    rng = np.random.default_rng(5)
+    removidas = base_sintetica.loc[rng.choice(base_sintetica.index, 200, replace=False)]
+    inseridas = base_sintetica.loc[rng.choice(base_sintetica.index, 150, replace=False)].copy()
+    inseridas.index = np.arange(len(base_sintetica), len(base_sintetica) + 150)
+    inseridas.loc[inseridas.index[:30], "CLIENTE"] = "Cliente novo"
+    inseridas.loc[inseridas.index[30:60], "CHAMADO"] = [f"NOVO-{i}" for i in range(30)]
+    df = pd.concat([base_sintetica.drop(index=removidas.index), inseridas])
+
+    atualizado = CuboKPI.de_base(base_sintetica).atualizar(df, removidas, inseridas)
+    do_zero = CuboKPI.de_base(df)
+    chaves = ["CLIENTE", "tipo_servico", "mes_autorizacao", "billing_status", "sla_resultado"]
+    a = atualizado.celulas.sort_values(chaves, na_position="first").reset_index(drop=True)
+    b = do_zero.celulas.sort_values(chaves, na_position="first").reset_index(drop=True)
+    pd.testing.assert_frame_equal(a[chaves + MEDIDAS], b[chaves + MEDIDAS], check_dtype=False)
+    for sel in _selecoes(df):
+        _conferir(atualizado, df, sel)
@@ -0,0 +1,58 @@
+"""`situacao` nos limites e `Envelhecimento` (calcular/resumo/fila) com regras em dias corridos e úteis."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from atos import config
+from atos.calendario import carregar_calendario
+from atos.envelhecimento import EM_RISCO, ESTOURADO, NO_PRAZO, SEM_DADO, SITUACOES, Envelhecimento, situacao
+from atos.regras_sla import compilar_sla
+
+AGORA = pd.Timestamp("2025-06-30 10:00")
+
+
+def test_situacao_nos_limites():
+    idade = [7.9, 8, 9, 10, 10.5, np.nan, 5]
+    meta = [10, 10, 10, 10, 10, 10, np.nan]
+    assert situacao(idade, meta, 0.8).tolist() == [NO_PRAZO, EM_RISCO, EM_RISCO, EM_RISCO, ESTOURADO, SEM_DADO, SEM_DADO]
+    assert situacao([10], [10], 1.0).tolist() == [EM_RISCO]  # idade == risco × meta == meta
+
+
+@pytest.fixture(scope="module")
+def env():
+    aut = pd.to_datetime(["2025-06-20", "2025-06-25", "2025-06-01", "2025-06-27", None, "2025-06-20", "2025-06-23"])
+    df = pd.DataFrame({
+        "OS": [f"OS{i}" for i in range(7)], "CHAMADO": [f"C{i}" for i in range(7)],
+        "CLIENTE": ["A"] * 7, "PONTO": ["p"] * 7,
+        "UF": ["SP", "SP", "SP", "SP", "SP", "SP", "AL"],
+        "tipo_servico": ["Pintura", "Pintura", "Pintura", "Pintura", "Pintura", "Elétrica", "Civil"],
+        "AUTORIZAÇÃO": aut,
+        "TÉRMINO": pd.to_datetime([None, None, None, None, None, None, None]),
+        "receita": np.arange(7.0),
+    })
+    df.loc[1, "TÉRMINO"] = pd.Timestamp("2025-06-28")  # fechado: fica fora
+    sla = pd.DataFrame({"cliente": ["*", "*"], "tipo_servico": ["Pintura", "Civil"], "sla_dias": [10, 5],
+                        "calendario": ["corridos", "uteis"]})
+    cal = carregar_calendario(config.FERIADOS_NACIONAIS, config.FERIADOS_ESTADUAIS)
+    return Envelhecimento(df, compilar_sla(sla), cal)
+
+
+def test_calcular(env):
+    out = env.calcular(AGORA)
+    assert out.index.tolist() == [0, 2, 3, 4, 5, 6]
+    # 20/06 -> 10 dias = meta (em risco); 01/06 -> 29 (estourado); 27/06 -> 3 (no prazo); sem início; sem regra;
+    # Civil em dias úteis de 23/06 em AL: 25, 26, 27, 30 (24/06 é São João) = 4 de 5 -> em risco
+    assert out["idade_dias"].tolist()[:3] == [10, 29, 3] and np.isnan(out["idade_dias"].iloc[3])
+    assert out["idade_dias"].iloc[5] == 4
+    assert out["situacao"].tolist() == [EM_RISCO, ESTOURADO, NO_PRAZO, SEM_DADO, SEM_DADO, EM_RISCO]
+    assert out["restante_dias"].tolist()[:3] == [0, -19, 7]
+    assert "receita" not in env.abertas.columns and "PONTO" not in env.abertas.columns
+
+
+def test_resumo_e_fila(env):
+    assert env.resumo(AGORA).to_dict() == {ESTOURADO: 1, EM_RISCO: 2, NO_PRAZO: 1, SEM_DADO: 2}
+    assert env.resumo(AGORA, posicoes=[3, 4]).reindex(SITUACOES).tolist() == [0, 0, 1, 1]
+    assert env.fila(AGORA).index.tolist() == [2, 0, 6]  # estourado no topo, depois o que vence primeiro
+    assert env.fila(AGORA, limite=1).index.tolist() == [2]
+    assert env.fila(AGORA, risco=1.0).index.tolist() == [2, 0]
+    assert env.fila(AGORA, posicoes=[0, 6]).index.tolist() == [0, 6]
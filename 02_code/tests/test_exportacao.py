@@ -0,0 +1,70 @@
+"""`exportar` em blocos: o arquivo relido tem as linhas (na ordem de `posicoes`) e os tipos do frame filtrado."""
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from atos.compactacao import compactar
+from atos.exportacao import exportar, exportar_bytes
+
+
+@pytest.fixture(scope="module")
+def base(base_sintetica):
+    """Base compactada (categorias, inteiros reduzidos) como o dashboard exporta, e um filtro fora de ordem."""
+    df, _ = compactar(base_sintetica.reset_index(drop=True))
+    posicoes = np.flatnonzero((df["sla_resultado"] == "FORA").to_numpy())[::-1]
+    return df, posicoes
+
+
+def _filtrado(df, posicoes) -> pd.DataFrame:
+    return df.take(posicoes).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("gz", [False, True], ids=["csv", "csv.gz"])
+def test_csv(base, gz):
+    df, posicoes = base
+    dados = exportar_bytes(df, "csv", gz, posicoes=posicoes)
+    texto = (gzip.decompress(dados) if gz else dados).decode("utf-8")
+    assert texto == _filtrado(df, posicoes).to_csv(index=False)
+
+
+@pytest.mark.parametrize("gz", [False, True], ids=["snappy", "gzip"])
+def test_parquet(base, gz):
+    df, posicoes = base
+    lido = pd.read_parquet(io.BytesIO(exportar_bytes(df, "parquet", gz, posicoes=posicoes)))
+    esperado = _filtrado(df, posicoes)
+    pd.testing.assert_frame_equal(lido, esperado, check_categorical=False)
+    assert lido.dtypes.astype(str).tolist() == esperado.dtypes.astype(str).tolist()
+
+
+def _texto(s: pd.Series) -> list:
+    return [None if pd.isna(v) else str(v) for v in s.astype(object)]
+
+
+def test_xlsx(base, tmp_path):
+    df, posicoes = base
+    destino = tmp_path / "sub" / "base.xlsx"
+    exportar(df, destino, "xlsx", posicoes=posicoes, bloco=100)
+    lido = pd.read_excel(destino)
+    esperado = _filtrado(df, posicoes)
+    assert list(lido.columns) == list(esperado.columns) and len(lido) == len(esperado)
+    for c in esperado.columns:
+        e = esperado[c]
+        if pd.api.types.is_datetime64_any_dtype(e):
+            pd.testing.assert_series_equal(lido[c], e.astype("datetime64[ns]"), check_dtype=False)
+        elif pd.api.types.is_numeric_dtype(e) and not isinstance(e.dtype, pd.CategoricalDtype):
+            np.testing.assert_allclose(lido[c].to_numpy(float), e.to_numpy(float, na_value=np.nan))
+        else:
+            assert _texto(lido[c]) == _texto(e), c
+
+
+def test_vazio_e_erros(base):
+    df, _ = base
+    lido = pd.read_parquet(io.BytesIO(exportar_bytes(df, "parquet", posicoes=np.array([], dtype=int))))
+    assert lido.empty and list(lido.columns) == list(df.columns)
+    with pytest.raises(ValueError, match="gzip"):
+        exportar_bytes(df, "xlsx", gzip=True)
+    with pytest.raises(ValueError, match="formato"):
+        exportar_bytes(df, "json")
@@ -0,0 +1,51 @@
+"""`IndiceFiltro` contra o filtro antigo da sidebar (`df.copy()` + um `isin` por dimensão)."""
+import pandas as pd
+import pytest
+from bench_filtros import base_sintetica as base_filtros
+
+from atos.compactacao import compactar
+from atos.filtros import IndiceFiltro
+
+
+def filtro_antigo(df, sel):
+    f = df.copy()
+    for dim, valores in sel.items():
+        if valores:
+            f = f[f[dim].isin(valores)]
+    return f
+
+
+def _selecoes(idx: IndiceFiltro) -> list[dict]:
+    clientes, tipos, meses = (idx.opcoes(d) for d in ("CLIENTE", "tipo_servico", "mes_autorizacao"))
+    return [
+        {},
+        {"CLIENTE": [], "tipo_servico": [], "mes_autorizacao": []},
+        {"CLIENTE": clientes[:1]},  # esparsa: parte das posições
+        {"tipo_servico": tipos[-1:]},
+        {"mes_autorizacao": meses[3:4], "CLIENTE": []},
+        {"CLIENTE": clientes, "tipo_servico": tipos, "mes_autorizacao": meses[-3:]},  # padrão da sidebar
+        {"CLIENTE": clientes[::2], "tipo_servico": tipos[:2]},  # densa: máscara
+        {"CLIENTE": clientes[:5], "tipo_servico": tipos[:3], "mes_autorizacao": meses[:6]},
+        {"CLIENTE": ["não existe"]},
+        {"CLIENTE": clientes, "tipo_servico": tipos, "mes_autorizacao": meses},  # cobre tudo (menos nulos)
+    ]
+
+
+@pytest.fixture(params=["bench", "enriquecida", "compacta"])
+def base(request, base_sintetica):
+    if request.param == "bench":
+        return base_filtros(20_000)
+    df = base_sintetica.reset_index(drop=True)  # tem nulos nas três dimensões (linhas vazias da planilha)
+    return compactar(df)[0] if request.param == "compacta" else df
+
+
+def test_igual_ao_filtro_antigo(base):
+    idx = IndiceFiltro(base)
+    for sel in _selecoes(idx):
+        assert filtro_antigo(base, sel).equals(idx.filtrar(sel)), sel
+
+
+def test_opcoes(base):
+    idx = IndiceFiltro(base)
+    for dim in ("CLIENTE", "tipo_servico", "mes_autorizacao"):
+        assert idx.opcoes(dim) == sorted(base[dim].dropna().unique())
@@ -0,0 +1,52 @@
+"""`Grade`: busca, ordenação e paginação iguais a filtrar e fatiar a base filtrada com pandas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from atos.grade import Consulta, Grade
+
+CONSULTAS = [
+    Consulta(),
+    Consulta(busca="sp", busca_coluna="PONTO"),
+    Consulta(busca="  2024-0 ", ordenar_por="receita", crescente=False),
+    Consulta(busca="civil", ordenar_por="AUTORIZAÇÃO"),
+    Consulta(ordenar_por="CLIENTE"),
+]
+
+
+def _esperado(filtrada: pd.DataFrame, consulta: Consulta) -> pd.DataFrame:
+    texto = consulta.busca.strip().lower()
+    if texto:
+        colunas = [consulta.busca_coluna] if consulta.busca_coluna else list(filtrada.columns)
+        acha = [filtrada[c].map(lambda v: pd.notna(v) and texto in str(v).lower()).astype(bool) for c in colunas]
+        filtrada = filtrada[np.logical_or.reduce(acha)]
+    if consulta.ordenar_por:
+        filtrada = filtrada.sort_values(consulta.ordenar_por, ascending=consulta.crescente, kind="stable",
+                                        na_position="last")
+    return filtrada
+
+
+@pytest.fixture(scope="module")
+def selecao(base_sintetica):
+    return np.flatnonzero(base_sintetica["billing_status"].ne("FATURADO").fillna(True).to_numpy(bool))
+
+
+@pytest.mark.parametrize("consulta", CONSULTAS)
+def test_igual_ao_pandas(base_sintetica, selecao, consulta):
+    grade = Grade(base_sintetica, selecao)
+    esperado = _esperado(base_sintetica.iloc[selecao], consulta)
+    assert len(esperado)
+
+    tamanho = 250
+    n_paginas = -(-len(esperado) // tamanho)
+    for p in [0, 1, n_paginas - 1, n_paginas]:
+        pag, total = grade.pagina(consulta, p, tamanho, ["OS", "CLIENTE", "receita"])
+        assert total == len(esperado)
+        pd.testing.assert_frame_equal(pag, esperado.iloc[p * tamanho:(p + 1) * tamanho][["OS", "CLIENTE", "receita"]])
+
+
+def test_ultima_consulta_reaproveitada(base_sintetica, selecao):
+    grade = Grade(base_sintetica, selecao)
+    consulta = Consulta(busca="a", ordenar_por="receita")
+    assert grade.linhas(consulta) is grade.linhas(Consulta(busca="a", ordenar_por="receita"))
+    assert grade.linhas(Consulta(busca="a")) is not grade.linhas(consulta)
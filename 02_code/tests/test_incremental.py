@@ -0,0 +1,108 @@
+"""`incremental.ingerir`: o diff contra a loja dá a mesma base e o mesmo cubo que uma ingestão do zero."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from atos import incremental
+from atos.cubo import CuboKPI
+from atos.incremental import aguardar_gravacao, ingerir
+
+SELECOES = [{}, {"tipo_servico": ["Pintura", "Civil"]}, {"billing_status": ["PENDENTE_FATURAMENTO"], "sla_resultado": ["FORA"]}]
+
+
+def _ingerir(raw, mapas, pasta, versao="v1"):
+    ms, mserv, sla = mapas
+    ing = ingerir(raw, ms, mserv, sla, [versao], pasta=pasta)
+    aguardar_gravacao()
+    return ing
+
+
+def _editar(raw: pd.DataFrame, rng) -> pd.DataFrame:
+    """Tira 50 linhas, altera 17 e acrescenta 20 novas (só entre linhas com OS, para a contagem ser exata)."""
+    com_os = np.flatnonzero(raw["OS"].notna().to_numpy())
+    escolhidas = rng.choice(com_os, 67, replace=False)
+    sai, muda = escolhidas[:50], escolhidas[50:]
+    novo = raw.copy()
+    novo.loc[muda, "STATUS"] = np.where(novo.loc[muda, "STATUS"] == "Autorizado", "A faturar", "Autorizado")
+    novo.loc[muda, "receita"] = novo.loc[muda, "receita"] + 1
+    extras = raw.iloc[com_os[:20]].copy()
+    extras["OS"] = [f"NOVA-{i}" for i in range(20)]
+    extras["OS"] = extras["OS"].astype("string")
+    return pd.concat([novo.drop(index=sai), extras], ignore_index=True)
+
+
+@pytest.fixture(autouse=True)
+def _sem_memoria():
+    incremental._memoria.clear()
+    yield
+    incremental._memoria.clear()
+
+
+def test_reingestao_igual_a_do_zero(raw_sintetico, mapas, tmp_path):
+    _ingerir(raw_sintetico, mapas, tmp_path / "loja")
+    editada = _editar(raw_sintetico, np.random.default_rng(0))
+
+    ing = _ingerir(editada, mapas, tmp_path / "loja")
+    assert (ing.removidas, ing.modificadas, ing.inseridas) == (50, 17, 20)
+    assert ing.reaproveitadas == len(editada) - 37 and not ing.reprocessada
+
+    zero = _ingerir(editada, mapas, tmp_path / "zero")
+    assert (zero.inseridas, zero.reaproveitadas) == (len(editada), 0)
+    pd.testing.assert_frame_equal(ing.df.reset_index(drop=True), zero.df.reset_index(drop=True), check_categorical=False)
+    for sel in SELECOES:
+        a, b = ing.cubo.recorte(sel), zero.cubo.recorte(sel)
+        for medida in ["linhas", "n_os", "receita", "sla_soma", "sla_n"]:
+            assert a.total(medida) == pytest.approx(b.total(medida))
+        assert a.chamados_unicos() == b.chamados_unicos()
+        pd.testing.assert_series_equal(a.por("CLIENTE", "receita").loc[lambda s: s != 0],
+                                       b.por("CLIENTE", "receita").loc[lambda s: s != 0], check_categorical=False)
+        pd.testing.assert_series_equal(a.mediana_sla_por("tipo_servico"), b.mediana_sla_por("tipo_servico"))
+        pd.testing.assert_frame_equal(a.criticos().reset_index(drop=True), b.criticos().reset_index(drop=True),
+                                      check_categorical=False)
+
+
+def test_loja_relida_do_disco(raw_sintetico, base_sintetica, mapas, tmp_path):
+    """Em memória ficam só meta e chave/hash; sem ela, o diff sai da loja em disco."""
+    _ingerir(raw_sintetico, mapas, tmp_path)
+    (meta, chaves), = incremental._memoria.values()
+    assert list(chaves.columns) == ["_chave", "_hash"] and len(chaves) == len(base_sintetica)
+    incremental._memoria.clear()
+    ing = _ingerir(raw_sintetico, mapas, tmp_path)
+    assert (ing.inseridas, ing.modificadas, ing.removidas, ing.reaproveitadas) == (0, 0, 0, len(raw_sintetico))
+
+
+def test_mapeamentos_novos_reprocessam(raw_sintetico, mapas, tmp_path):
+    _ingerir(raw_sintetico, mapas, tmp_path)
+    ing = _ingerir(raw_sintetico, mapas, tmp_path, versao="v2")
+    assert ing.reprocessada
+    assert (ing.inseridas, ing.modificadas, ing.removidas, ing.reaproveitadas) == (0, 0, 0, 0)
+
+
+def test_gravacao_falha_nao_deixa_cubo_velho(raw_sintetico, mapas, tmp_path, monkeypatch):
+    """Gravação que falha no meio: a loja anterior fica inteira e a próxima ingestão não usa um cubo defasado."""
+    ms, mserv, sla = mapas
+    metade = raw_sintetico.iloc[:1500]
+    _ingerir(metade, mapas, tmp_path)
+
+    def falhar(self, pasta):
+        raise OSError("disco cheio")
+
+    with monkeypatch.context() as m:
+        m.setattr(CuboKPI, "salvar", falhar)
+        ingerir(raw_sintetico, ms, mserv, sla, ["v1"], pasta=tmp_path)
+        with pytest.raises(OSError, match="disco cheio"):
+            aguardar_gravacao()
+    assert not incremental._memoria  # a entrada da ingestão que não foi gravada saiu
+    assert not list(tmp_path.glob("*.tmp"))
+
+    ing = _ingerir(raw_sintetico, mapas, tmp_path)
+    assert (ing.inseridas, ing.removidas) == (1500, 0)  # comparada com a loja de 1500 que ficou no disco
+    zero = CuboKPI.de_base(ing.df)
+    assert len(ing.cubo.chamados) == len(zero.chamados)
+    for nome in ["pares", "hist_sla", "hist_aut"]:
+        assert len(ing.cubo.tabelas[nome]) == len(zero.tabelas[nome])
+        assert ing.cubo.tabelas[nome]["n"].sum() == zero.tabelas[nome]["n"].sum()
+    for sel in SELECOES:
+        a, b = ing.cubo.recorte(sel), zero.recorte(sel)
+        assert a.chamados_unicos() == b.chamados_unicos()
+        assert a.total("receita") == pytest.approx(b.total("receita"))
@@ -0,0 +1,69 @@
+"""`instrumentacao.medido`/`etapa`: um registro JSONL válido por chamada quando ligada; nada quando desligada."""
+import json
+from collections import deque
+
+import pandas as pd
+import pytest
+
+from atos import instrumentacao
+from atos.instrumentacao import REGISTRO_COLS, etapa, medido, registros, resumo
+
+
+@medido("dobrar")
+def _dobrar(df: pd.DataFrame, fator: int = 2) -> pd.DataFrame:
+    if fator < 0:
+        raise ValueError("fator negativo")
+    return pd.concat([df] * fator, ignore_index=True)
+
+
+@pytest.fixture
+def perfil(monkeypatch, tmp_path):
+    """Instrumentação ligada, gravando em `tmp_path`; estado do módulo e ambiente restaurados no fim."""
+    monkeypatch.setenv("ATOS_PERFIL", "")
+    monkeypatch.setattr(instrumentacao, "_ativo", False)
+    monkeypatch.setattr(instrumentacao, "_pasta", tmp_path)
+    monkeypatch.setattr(instrumentacao, "_registros", deque(maxlen=instrumentacao.MAX_REGISTROS))
+    instrumentacao.ativar(True, pasta=tmp_path)
+    return tmp_path
+
+
+def _linhas(pasta):
+    arquivos = list(pasta.glob("perfil_*.jsonl"))
+    assert len(arquivos) == 1
+    return [json.loads(linha) for linha in arquivos[0].read_text(encoding="utf-8").splitlines()]
+
+
+def test_um_registro_por_chamada(perfil):
+    df = pd.DataFrame({"a": range(10)})
+    for fator in [1, 2, 3]:
+        assert len(_dobrar(df, fator)) == 10 * fator
+    with pytest.raises(ValueError):
+        _dobrar(df, -1)
+
+    regs = _linhas(perfil)
+    assert len(regs) == 4
+    for r in regs:
+        assert set(REGISTRO_COLS) <= r.keys() and r["etapa"] == "dobrar"
+        assert r["linhas_entrada"] == 10 and r["segundos"] >= 0
+    assert [r["linhas"] for r in regs] == [10, 20, 30, None]
+    assert [r["erro"] for r in regs] == [None, None, None, "ValueError: fator negativo"]
+
+    mem = registros()
+    assert list(mem.columns[:len(REGISTRO_COLS)]) == REGISTRO_COLS and len(mem) == 4
+    assert resumo(mem).set_index("etapa").loc["dobrar", "chamadas"] == 4
+
+
+def test_etapa_com_contexto(perfil):
+    with etapa("aba", pd.Series(range(5)), aba="Base", sessao="s1") as m:
+        m.resultado(pd.DataFrame({"x": range(3)}))
+    [r] = _linhas(perfil)
+    assert (r["etapa"], r["linhas_entrada"], r["linhas"], r["aba"], r["sessao"]) == ("aba", 5, 3, "Base", "s1")
+
+
+def test_desligada_nao_grava(perfil):
+    instrumentacao.ativar(False)
+    assert len(_dobrar(pd.DataFrame({"a": [1]}))) == 2
+    with etapa("aba") as m:
+        assert m.resultado(1) == 1
+    assert not list(perfil.iterdir())
+    assert registros().empty
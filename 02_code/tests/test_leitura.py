@@ -0,0 +1,125 @@
+"""Leitores de `atos.leitura` contra `pd.read_excel(header=1)` numa planilha pequena gerada no teste.
+
+A planilha tem o layout da ATOS (título na 1ª linha, cabeçalho na 2ª, colunas sem nome) e os casos que
+a inferência bloco a bloco precisa acertar: coluna com número e texto em blocos diferentes, datas com
+vazios e texto, erro do Excel, linha vazia no meio e no fim, coluna fora da projeção.
+"""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from atos import leitura
+from atos.leitura import COLUNAS_PIPELINE, abas_atos, cabecalhos_atos, ler_blocos, ler_planilha
+from atos.pipeline import clean, clean_varias
+
+CABECALHO = ["OS", "CHAMADO", "CLIENTE", None, "PONTO", "UF", "GESTOR", "SERVIÇO", "STATUS",
+             "AUTORIZAÇÃO", "TÉRMINO", "RECEITA", "OBS", "OBS"]  # 2ª OBS -> "OBS.1"
+N = 30
+
+
+def _linha(i: int) -> list:
+    os_ = 1000 + i if i < 20 else f"OS-{i}"  # número nos primeiros blocos, texto depois
+    aut = datetime(2025, 1, 1 + i % 28, 8 if i % 3 else 0, 30)
+    ter = None if i % 5 == 0 else ("sem data" if i == 7 else datetime(2025, 2, 1 + i % 28))
+    receita = "#N/A" if i == 11 else (None if i % 6 == 0 else (10.0 if i % 4 == 0 else 10.5 + i))
+    return [os_, 500 + i, f"  Cliente {i % 4} ", "lixo" if i % 9 == 0 else None, f"P{i}", "SP" if i % 2 else "rj",
+            "Ana", "Telhado" if i % 3 else "Elétrica", "Concluído", aut, ter, receita, f"obs {i}" if i % 2 else None,
+            "dup"]
+
+
+@pytest.fixture(scope="module")
+def planilha(tmp_path_factory):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "ATOS"
+    ws.append(["Relatório ATOS"])
+    ws.append(CABECALHO)
+    for i in range(N):
+        ws.append(_linha(i) if i != 15 else [None] * len(CABECALHO))  # linha vazia no meio
+    ws.append([])
+    ws.append([None, None, None])  # vazias no fim: descartadas
+    ws2 = wb.create_sheet("ATOS 2")
+    ws2.append(["Outra aba"])
+    ws2.append(CABECALHO)
+    for i in range(5):
+        ws2.append(_linha(i + 40))
+    resumo = wb.create_sheet("Resumo")
+    resumo.append(["Total", 123])
+    resumo.append(["Clientes", 4])
+    caminho = tmp_path_factory.mktemp("leitura") / "atos.xlsx"
+    wb.save(caminho)
+    return caminho
+
+
+def _referencia(caminho, colunas, aba=0) -> pd.DataFrame:
+    return leitura._arrumar(pd.read_excel(caminho, sheet_name=aba, header=1), colunas)
+
+
+def _motores():
+    return [m for m in ("openpyxl", "calamine") if m != "calamine" or leitura.motor_padrao() == "calamine"]
+
+
+@pytest.mark.parametrize("colunas", [COLUNAS_PIPELINE, None], ids=["projecao", "todas"])
+@pytest.mark.parametrize("motor", _motores())
+def test_igual_ao_read_excel(planilha, motor, colunas):
+    ref = _referencia(planilha, colunas)
+    df = ler_planilha(planilha, colunas, motor=motor)
+    pd.testing.assert_frame_equal(df, ref)
+    pd.testing.assert_frame_equal(clean(df), clean(ref))
+
+
+@pytest.mark.parametrize("tamanho", [1, 4, 7])
+def test_blocos_com_tipos_diferentes(planilha, tamanho):
+    """Com blocos pequenos, OS é número em uns e texto em outros; datas têm blocos só com vazios."""
+    df = leitura._arrumar(leitura._ler_openpyxl(planilha, None, tamanho=tamanho), None)
+    pd.testing.assert_frame_equal(df, _referencia(planilha, None))
+
+
+@pytest.mark.parametrize("tamanho", [1, 4, 7])
+def test_ler_blocos_com_tipos(planilha, tamanho):
+    """Com `tipos` fixados, os blocos têm os mesmos dtypes e juntos dão a aba lida inteira."""
+    ref = _referencia(planilha, None)
+    tipos = {"OS": "obj", "TÉRMINO": "obj", "AUTORIZAÇÃO": "data", "RECEITA": "num", "CHAMADO": "num"}
+    blocos = list(ler_blocos(planilha, None, motor="openpyxl", tamanho=tamanho, tipos=tipos))
+    assert len(blocos) > 1
+    assert all(b.dtypes[list(tipos)].equals(blocos[0].dtypes[list(tipos)]) for b in blocos)
+    df = pd.concat(blocos, ignore_index=True)
+    pd.testing.assert_frame_equal(df[list(tipos)], ref[list(tipos)])
+
+
+def test_arquivo_aberto_e_bytes(planilha):
+    with open(planilha, "rb") as f:
+        pd.testing.assert_frame_equal(ler_planilha(f, motor="openpyxl"), _referencia(planilha, COLUNAS_PIPELINE))
+
+
+def test_abas(planilha):
+    assert abas_atos(planilha) == ["ATOS", "ATOS 2"]
+    assert cabecalhos_atos(planilha)["ATOS"] == list(ler_planilha(planilha, motor="openpyxl").columns)
+    pd.testing.assert_frame_equal(ler_planilha(planilha, aba="ATOS 2", motor="openpyxl"),
+                                  _referencia(planilha, COLUNAS_PIPELINE, aba="ATOS 2"))
+
+
+def test_clean_varias_em_processos(planilha, tmp_path):
+    """Dois arquivos lidos em 2 processos (spawn) dão a mesma base e o mesmo relatório que no próprio processo."""
+    copia = tmp_path / "atos_2.xlsx"
+    copia.write_bytes(planilha.read_bytes())
+    df, rel = clean_varias([planilha, copia], motor="openpyxl", processos=2)
+    ref, rel_ref = clean_varias([planilha, copia], motor="openpyxl", processos=1)
+    pd.testing.assert_frame_equal(df, ref)
+    assert rel["erro"].isna().all() and rel["linhas"].tolist() == rel_ref["linhas"].tolist()
+    assert df.groupby(["arquivo", "aba"]).size().tolist() == [N, 5] * 2
+
+
+def test_progresso(planilha, monkeypatch):
+    monkeypatch.setattr(leitura, "AVISO_LINHAS", 10)
+    vistos = []
+    ler_planilha(planilha, motor="openpyxl", progresso=vistos.append)
+    assert vistos[0] == 0 and vistos[1:] == [9, 19, 29]
+
+
+def test_motor_desconhecido(planilha):
+    with pytest.raises(ValueError, match="motor desconhecido"):
+        ler_planilha(planilha, motor="xlrd")
@@ -0,0 +1,53 @@
+"""`lote.gerar_lote`: um .docx válido por cliente no zip, em série ou no pool de processos."""
+import io
+from zipfile import ZipFile
+
+import pytest
+from docx import Document
+
+from atos.cubo import CuboKPI
+from atos.lote import gerar_lote, lote_temporario, nome_arquivo
+
+
+@pytest.fixture(scope="module")
+def cubo(base_sintetica):
+    return CuboKPI.de_base(base_sintetica)
+
+
+def _conferir(zf: ZipFile, rel, clientes) -> None:
+    usados = set()
+    assert sorted(zf.namelist()) == sorted(nome_arquivo(c, usados) for c in clientes)
+    assert rel["erro"].isna().all()
+    assert sorted(rel["valor"]) == sorted(clientes)
+    for linha in rel.itertuples():
+        doc = Document(io.BytesIO(zf.read(linha.arquivo)))
+        assert any(linha.valor in p.text for p in doc.paragraphs) or any(
+            linha.valor in c.text for t in doc.tables for r in t.rows for c in r.cells), linha.valor
+
+
+def test_um_docx_por_cliente(cubo, tmp_path):
+    clientes = list(cubo.valores["CLIENTE"])
+    feitos = []
+    rel = gerar_lote(cubo, tmp_path / "lote.zip", processos=2, progresso=lambda f, t, linha: feitos.append((f, t)))
+
+    assert feitos == [(i + 1, len(clientes)) for i in range(len(clientes))]
+    with ZipFile(tmp_path / "lote.zip") as zf:
+        _conferir(zf, rel, clientes)
+
+
+def test_lote_temporario_em_serie(cubo):
+    clientes = list(cubo.valores["CLIENTE"])[:4]
+    arquivo, rel = lote_temporario(cubo, valores=clientes, selecao={"tipo_servico": ["Civil"]}, processos=1)
+    with arquivo, ZipFile(arquivo) as zf:
+        _conferir(zf, rel, clientes)
+
+
+def test_progresso_cancela(cubo):
+    class Parar(Exception):
+        pass
+
+    def progresso(feitos, total, linha):
+        raise Parar
+
+    with pytest.raises(Parar):
+        lote_temporario(cubo, valores=list(cubo.valores["CLIENTE"])[:3], processos=1, progresso=progresso)
@@ -0,0 +1,109 @@
+"""`norm_key_series` e `sla_resultado` contra as versões linha a linha que substituíram."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from atos import config
+from atos.normalizacao import norm_key, norm_key_series, sla_resultado
+from atos.pipeline import apply_sla, enrich
+
+TEXTOS = ["Telhado", " telhado ", "TELHADO", "Elétrica", "eletrica", "Elé  trica", "Pintura\t",
+          "", "   ", None, np.nan, pd.NA, "Ação", "acao", "Manutenção  Preventiva"]
+
+
+def sla_result(row):
+    """Veredito linha a linha de 07_aplicar_sla.py antes da vetorização."""
+    if pd.isna(row["sla_dias"]) or pd.isna(row["sla_meta_dias"]):
+        return "SEM_DADO"
+    return "DENTRO" if row["sla_dias"] <= row["sla_meta_dias"] else "FORA"
+
+
+@pytest.fixture
+def base():
+    n = len(TEXTOS)
+    aut = pd.Series([pd.Timestamp("2025-01-01") + pd.Timedelta(days=i) for i in range(n)], dtype="datetime64[ns]")
+    ter = pd.Series([aut[i] + pd.Timedelta(days=3 * i) if i % 4 else pd.NaT for i in range(n)], dtype="datetime64[ns]")
+    return pd.DataFrame({
+        "STATUS": pd.Series(TEXTOS, dtype=object),
+        "SERVIÇO": pd.Series(TEXTOS[::-1], dtype=object),
+        "sla_dias": (ter - aut).dt.days,
+        "sla_meta_dias": [None if i % 5 == 0 else float(10 + i) for i in range(n)],
+    })
+
+
+@pytest.mark.parametrize("dtype", [object, "string", "category"])
+def test_norm_key_series_igual_ao_apply(base, dtype):
+    s = base["STATUS"].astype(dtype)
+    esperado = s.astype(object).apply(norm_key) if dtype == "category" else s.apply(norm_key)
+    pd.testing.assert_series_equal(norm_key_series(s), esperado.astype(object), check_dtype=False)
+
+
+def test_norm_key_series_nulos_como_apply():
+    s = pd.Series([None, np.nan, pd.NA, "x"], dtype=object)
+    assert norm_key_series(s).tolist() == s.apply(norm_key).tolist() == ["", "nan", "<na>", "x"]
+
+
+def test_mapeamentos_iguais_ao_apply(base):
+    ms = pd.DataFrame({"STATUS": ["telhado", "ELETRICA", "acao"], "billing_status": ["FATURADO", "PENDENTE", "A_FATURAR"]})
+    ms2 = ms.assign(status_key=ms["STATUS"].apply(norm_key))
+    novo = base.assign(status_key=norm_key_series(base["STATUS"])).merge(
+        ms2.assign(status_key=norm_key_series(ms["STATUS"]))[["status_key", "billing_status"]], on="status_key", how="left")
+    antigo = base.assign(status_key=base["STATUS"].apply(norm_key)).merge(
+        ms2[["status_key", "billing_status"]], on="status_key", how="left")
+    pd.testing.assert_series_equal(novo["billing_status"], antigo["billing_status"])
+
+    mserv = pd.DataFrame({"SERVIÇO": ["Manutencao preventiva", "pintura"], "tipo_servico": ["MANUTENCAO", "PINTURA"]})
+    novo = norm_key_series(base["SERVIÇO"]).map(dict(zip(norm_key_series(mserv["SERVIÇO"]), mserv["tipo_servico"])))
+    antigo = base["SERVIÇO"].apply(norm_key).map(dict(zip(mserv["SERVIÇO"].apply(norm_key), mserv["tipo_servico"])))
+    pd.testing.assert_series_equal(novo, antigo)
+
+
+def test_sla_resultado_igual_ao_apply(base):
+    esperado = base.apply(sla_result, axis=1)
+    assert sla_resultado(base["sla_dias"], base["sla_meta_dias"]).tolist() == esperado.tolist()
+    assert set(esperado) == {"SEM_DADO", "DENTRO", "FORA"}
+
+
+def test_sla_resultado_meta_escalar(base):
+    """06_kpis_resumo.py: meta fixa de 30 dias."""
+    esperado = base["sla_dias"].apply(lambda x: "SEM_DADO" if pd.isna(x) else ("DENTRO" if x <= 30 else "FORA"))
+    assert sla_resultado(base["sla_dias"], 30).tolist() == esperado.tolist()
+
+
+def apply_enrichment(df, ms, mserv, sla):
+    """`apply_enrichment` do app.py antes da vetorização (mapeamentos lidos como no `load_mappings` de lá)."""
+    df = df.copy()
+    df["status_key"] = df["STATUS"].apply(norm_key)
+    df["servico_key"] = df["SERVIÇO"].apply(norm_key)
+    df["k_cli"] = df["CLIENTE"].apply(norm_key)
+
+    df = df.merge(ms[["status_key", "billing_status"]], on="status_key", how="left")
+    df["billing_status"] = df["billing_status"].fillna("NAO_MAPEADO")
+    df = df.merge(mserv[["servico_key", "tipo_servico", "categoria"]], on="servico_key", how="left")
+    df["tipo_servico"] = df["tipo_servico"].fillna("NAO_MAPEADO")
+    df["categoria"] = df["categoria"].fillna("NAO_MAPEADO")
+    df["k_tipo"] = df["tipo_servico"].apply(norm_key)
+
+    df = df.merge(sla.loc[sla["cliente"] != "*", ["k_cli", "k_tipo", "sla_dias"]]
+                  .rename(columns={"sla_dias": "sla_meta_dias"}), on=["k_cli", "k_tipo"], how="left")
+    df = df.merge(sla.loc[sla["cliente"] == "*", ["k_tipo", "sla_dias"]]
+                  .rename(columns={"sla_dias": "sla_meta_padrao"}), on="k_tipo", how="left")
+    df["sla_meta_dias"] = df["sla_meta_dias"].fillna(df["sla_meta_padrao"])
+    df["sla_resultado"] = df.apply(sla_result, axis=1)
+    return df
+
+
+def test_base_gerada_igual_ao_apply_enrichment(raw_sintetico, mapas):
+    """billing_status, tipo_servico e sla_resultado de `enrich` + `apply_sla` numa base sintética = os do app antigo."""
+    ms0 = pd.read_csv(config.MAP_STATUS).assign(status_key=lambda d: d["STATUS"].apply(norm_key))
+    mserv0 = pd.read_csv(config.MAP_SERV).assign(servico_key=lambda d: d["SERVIÇO"].apply(norm_key))
+    sla0 = pd.read_csv(config.SLA_CAD).assign(k_cli=lambda d: d["cliente"].apply(norm_key),
+                                              k_tipo=lambda d: d["tipo_servico"].apply(norm_key))
+    antigo = apply_enrichment(raw_sintetico, ms0, mserv0, sla0)
+
+    ms, mserv, sla = mapas
+    novo = apply_sla(enrich(raw_sintetico, ms, mserv), sla)
+    assert len(novo) == len(antigo)
+    for c in ["billing_status", "tipo_servico", "sla_resultado"]:
+        assert novo[c].tolist() == antigo[c].tolist(), c
+    assert set(antigo["sla_resultado"]) == {"SEM_DADO", "DENTRO", "FORA"}
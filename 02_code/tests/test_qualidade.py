@@ -0,0 +1,93 @@
+"""`qualidade.perfilar`: contagens e faixas exatas, distintos (HLL) dentro do erro, mesmo perfil em qualquer bloco."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from atos.pipeline import dicionario_dados
+from atos.qualidade import MAX_CONTAGENS, TOP, ResumoColuna, fatias, perfilar
+
+ERRO_HLL = 0.06  # ~3,7 vezes o erro típico de 2^12 registros (1,6%)
+
+
+def _fmt(v, data: bool) -> str:
+    if data:
+        ts = pd.Timestamp(v)
+        return str(ts.date()) if ts == ts.normalize() else str(ts)
+    return str(v.item() if hasattr(v, "item") else v)
+
+
+@pytest.fixture(scope="module")
+def perfil(raw_sintetico):
+    return perfilar(fatias(raw_sintetico, bloco=700)).set_index("coluna")
+
+
+def test_vazios_e_faixas_exatos(raw_sintetico, perfil):
+    assert list(perfil.index) == list(raw_sintetico.columns)
+    for c, s in raw_sintetico.items():
+        linha = perfil.loc[c]
+        assert linha["n_linhas"] == len(s)
+        assert linha["n_vazios"] == s.isna().sum()
+        if s.dtype.kind in "fM":
+            validos = s.dropna()
+            data = s.dtype.kind == "M"
+            assert linha["minimo"] == _fmt(validos.min(), data), c
+            assert linha["maximo"] == _fmt(validos.max(), data), c
+        if s.dtype.kind == "f":
+            assert linha["media"] == pytest.approx(s.mean())
+
+
+def test_distintos(raw_sintetico, perfil):
+    for c, s in raw_sintetico.items():
+        n = s.nunique()
+        if n < MAX_CONTAGENS:
+            assert perfil.loc[c, "distintos_aprox"] == n, c
+        else:
+            assert perfil.loc[c, "distintos_aprox"] == pytest.approx(n, rel=ERRO_HLL), c
+
+
+@pytest.mark.parametrize("n", [5_000, 250_000])
+def test_hll_dentro_do_erro(n):
+    rng = np.random.default_rng(n)
+    valores = rng.permutation(n).astype("int64")
+    colunas = {"inteiros": pd.Series(np.repeat(valores, 2)), "datas": pd.Series(pd.to_datetime(valores * 60, unit="s"))}
+    for nome, s in colunas.items():
+        r = ResumoColuna(nome)
+        for i in range(0, len(s), 30_000):
+            r.atualizar(s.iloc[i:i + 30_000])
+        assert r.truncado
+        assert r.linha()["distintos_aprox"] == pytest.approx(n, rel=ERRO_HLL), nome
+
+
+def test_mais_frequentes_e_quartis(raw_sintetico, perfil):
+    vc = raw_sintetico["STATUS"].value_counts()
+    vc = vc.sort_index().sort_values(ascending=False, kind="stable").head(TOP)
+    assert perfil.loc["STATUS", "mais_frequentes"] == "; ".join(f"{v} ({n})" for v, n in vc.items())
+
+    receita = raw_sintetico["receita"].dropna().to_numpy()  # 3 mil valores < AMOSTRA: quartis exatos
+    for col, q in [("p25", 0.25), ("p50", 0.5), ("p75", 0.75)]:
+        assert perfil.loc["receita", col] == str(np.quantile(receita, q).item())
+
+
+def test_mesmo_perfil_em_qualquer_bloco(raw_sintetico):
+    base = perfilar(fatias(raw_sintetico, bloco=len(raw_sintetico)), threads=1)
+    truncadas = base["mais_frequentes"].str.contains(r"\+\)")  # > MAX_CONTAGENS distintos: contagens aproximadas
+    assert truncadas.any() and not truncadas.all()
+    for bloco in [1_000, 700, 128]:
+        outro = perfilar(fatias(raw_sintetico, bloco=bloco))
+        pd.testing.assert_frame_equal(outro.drop(columns="mais_frequentes"), base.drop(columns="mais_frequentes"))
+        pd.testing.assert_series_equal(outro["mais_frequentes"][~truncadas], base["mais_frequentes"][~truncadas])
+        assert outro["mais_frequentes"][truncadas].str.contains(r"\+\)").all()
+
+
+def test_posicoes(raw_sintetico):
+    posicoes = np.flatnonzero(raw_sintetico["STATUS"].eq("Autorizado").fillna(False).to_numpy(bool))
+    a = perfilar(fatias(raw_sintetico, bloco=300, posicoes=posicoes))
+    b = perfilar([raw_sintetico.take(posicoes)])
+    pd.testing.assert_frame_equal(a, b)
+
+
+def test_dicionario_dados(raw_sintetico):
+    posicoes = np.arange(0, len(raw_sintetico), 3)
+    dic = dicionario_dados(raw_sintetico, posicoes=posicoes)
+    assert list(dic["coluna"]) == sorted(raw_sintetico.columns)
+    pd.testing.assert_frame_equal(dic, dicionario_dados(fatias(raw_sintetico.take(posicoes), bloco=256)))
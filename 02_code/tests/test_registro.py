@@ -0,0 +1,141 @@
+"""`RegistroBases`: uma construção por chave, base em uso nunca despejada, ociosa despejada, erro não fica."""
+import threading
+import time
+import types
+
+import pytest
+
+from atos import registro
+from atos.registro import RegistroBases
+
+MB = 2**20
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio falso para `time.monotonic` do registro; `relogio.avancar(s)` anda `s` segundos."""
+    r = types.SimpleNamespace(agora=1000.0)
+    r.avancar = lambda s: setattr(r, "agora", r.agora + s)
+    monkeypatch.setattr(registro, "time", types.SimpleNamespace(monotonic=lambda: r.agora, time=time.time))
+    return r
+
+
+def _medir(valor):
+    return MB
+
+
+def _em_thread(alvo):
+    """Roda `alvo()` numa thread; devolve (thread, resultado) com resultado["valor"] ou resultado["erro"]."""
+    resultado = {}
+
+    def rodar():
+        try:
+            resultado["valor"] = alvo()
+        except BaseException as exc:
+            resultado["erro"] = exc
+
+    t = threading.Thread(target=rodar)
+    t.start()
+    return t, resultado
+
+
+def _esperar_sessoes(reg, chave, n):
+    """Espera `n` sessões registradas na chave (a segunda já entrou e está esperando a construção)."""
+    limite = time.monotonic() + 5
+    while len(reg._entradas[chave].sessoes) < n:
+        assert time.monotonic() < limite
+        time.sleep(0.01)
+
+
+def test_mesma_chave_constroi_uma_vez(relogio):
+    reg = RegistroBases(teto_mb=10, ocioso=60, sessao_ociosa=60)
+    liberar = threading.Event()
+    chamadas = []
+
+    def construir():
+        chamadas.append(1)
+        liberar.wait(5)
+        return object()
+
+    t, a = _em_thread(lambda: reg.obter(("k",), "s1", construir, medir=_medir))
+    while not chamadas:
+        time.sleep(0.01)
+    t2, b = _em_thread(lambda: reg.obter(("k",), "s2", construir, medir=_medir))
+    _esperar_sessoes(reg, ("k",), 2)
+    assert not reg.pronta(("k",))
+    liberar.set()
+    t.join(5)
+    t2.join(5)
+
+    assert a["valor"] is b["valor"]
+    assert len(chamadas) == 1
+    assert reg.pronta(("k",))
+    assert reg.estado()["sessoes"].tolist() == [2]
+
+
+def test_base_em_uso_nunca_despejada(relogio):
+    reg = RegistroBases(teto_mb=1, ocioso=60, sessao_ociosa=600)
+    reg.obter(("a",), "s1", object, medir=_medir)
+    reg.obter(("b",), "s2", object, medir=_medir)
+    relogio.avancar(120)  # passa do ocioso, não da sessão ociosa
+
+    assert reg.despejar() == []
+    assert reg.total_bytes() == 2 * MB > reg.teto
+    assert sorted(reg.estado()["chave"]) == [("a",), ("b",)]
+
+
+def test_base_ociosa_sem_sessao_despejada(relogio):
+    reg = RegistroBases(teto_mb=10, ocioso=60, sessao_ociosa=600)
+    reg.obter(("a",), "s1", object, medir=_medir)
+    reg.obter(("b",), "s2", object, medir=_medir)
+    reg.soltar("s1")
+    relogio.avancar(30)
+    assert reg.despejar() == []  # ainda não ociosa
+
+    relogio.avancar(31)
+    assert reg.despejar() == [("a",)]
+    assert not reg.pronta(("a",)) and reg.pronta(("b",))
+
+
+def test_teto_despeja_livre_menos_recente(relogio):
+    reg = RegistroBases(teto_mb=2, ocioso=600, sessao_ociosa=600)
+    for s in ["s1", "s2", "s3"]:
+        reg.obter((s,), s, object, medir=_medir)
+        relogio.avancar(1)
+    reg.soltar("s1")
+    reg.soltar("s2")
+
+    assert reg.despejar() == [("s1",)]
+    assert reg.total_bytes() == 2 * MB
+
+
+def test_sessao_ociosa_solta_a_base(relogio):
+    reg = RegistroBases(teto_mb=10, ocioso=60, sessao_ociosa=120)
+    reg.obter(("a",), "s1", object, medir=_medir)
+    relogio.avancar(121)
+    assert reg.despejar() == [("a",)]
+
+
+def test_erro_na_construcao_repassado_e_chave_sai(relogio):
+    reg = RegistroBases(teto_mb=10, ocioso=60, sessao_ociosa=60)
+    entrou, liberar = threading.Event(), threading.Event()
+
+    def construir():
+        entrou.set()
+        liberar.wait(5)
+        raise ValueError("arquivo inválido")
+
+    t, a = _em_thread(lambda: reg.obter(("k",), "s1", construir, medir=_medir))
+    assert entrou.wait(5)
+    t2, b = _em_thread(lambda: reg.obter(("k",), "s2", construir, medir=_medir))
+    _esperar_sessoes(reg, ("k",), 2)
+    liberar.set()
+    t.join(5)
+    t2.join(5)
+
+    assert isinstance(a["erro"], ValueError)
+    assert b["erro"] is a["erro"]
+    assert not reg.pronta(("k",))
+    assert reg.estado().empty
+
+    assert reg.obter(("k",), "s1", lambda: "ok", medir=_medir) == "ok"  # a chave pode ser reconstruída
@@ -0,0 +1,86 @@
+"""`regras_sla`: precedência, repetições no cadastro, coluna `base` e o merge duplo que substituiu."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from atos.normalizacao import norm_key_series
+from atos.pipeline import apply_sla
+from atos.regras_sla import aplicar_regras, compilar_sla
+
+CADASTRO = pd.DataFrame({
+    "cliente": ["*", "*", "*", "Banco X"],
+    "tipo_servico": ["Pintura", "Civil", "*", "Pintura"],
+    "sla_dias": [30, 45, 60, 10],
+})
+
+
+def _base() -> pd.DataFrame:
+    aut = pd.to_datetime(["2025-01-01"] * 6 + [None])
+    return pd.DataFrame({
+        "CLIENTE": ["Banco X", "banco  x ", "Outro", "Banco X", "Outro", None, "Banco X"],
+        "tipo_servico": ["Pintura", "PINTURA", "Pintura", "Civil", "Elétrica", "Pintura", "Pintura"],
+        "AUTORIZAÇÃO": aut,
+        "ABERTURA": pd.to_datetime(["2025-01-21"] * 7),
+        "TÉRMINO": pd.to_datetime(["2025-01-31"] * 7),
+        "sla_dias": (pd.Series(pd.to_datetime(["2025-01-31"] * 7)) - pd.Series(aut)).dt.days,
+    })
+
+
+def _merge_antigo(df: pd.DataFrame, sla: pd.DataFrame) -> pd.DataFrame:
+    """`apply_sla` antes de `regras_sla`: merge cliente + tipo, depois merge "*" + tipo e fillna."""
+    df = df.assign(k_cli=norm_key_series(df["CLIENTE"]), k_tipo=norm_key_series(df["tipo_servico"]))
+    sla = sla.assign(k_cli=norm_key_series(sla["cliente"]), k_tipo=norm_key_series(sla["tipo_servico"]))
+    df = df.merge(sla.loc[sla["cliente"] != "*", ["k_cli", "k_tipo", "sla_dias"]]
+                  .rename(columns={"sla_dias": "sla_meta_dias"}), on=["k_cli", "k_tipo"], how="left")
+    df = df.merge(sla.loc[sla["cliente"] == "*", ["k_tipo", "sla_dias"]]
+                  .rename(columns={"sla_dias": "sla_meta_padrao"}), on="k_tipo", how="left")
+    df["sla_meta_dias"] = df["sla_meta_dias"].fillna(df["sla_meta_padrao"])
+    return df.drop(columns=["sla_meta_padrao", "k_cli", "k_tipo"])
+
+
+def test_precedencia():
+    """cliente + tipo → "*" + tipo → "*" + "*"; o específico vale com caixa/espaços diferentes."""
+    meta, dias = aplicar_regras(_base(), compilar_sla(CADASTRO))
+    assert meta.tolist() == [10, 10, 30, 45, 60, 30, 10]
+    assert dias is None
+
+
+def test_repeticao_identica_aceita():
+    repetido = pd.concat([CADASTRO, pd.DataFrame({"cliente": ["banco x", "*"], "tipo_servico": ["pintura", "Civil"],
+                                                  "sla_dias": [10, 45]})], ignore_index=True)
+    regras = compilar_sla(repetido)
+    np.testing.assert_array_equal(aplicar_regras(_base(), regras)[0], aplicar_regras(_base(), compilar_sla(CADASTRO))[0])
+
+
+@pytest.mark.parametrize("extra", [
+    {"cliente": "Banco X", "tipo_servico": "Pintura", "sla_dias": 12},
+    {"cliente": "*", "tipo_servico": "civil", "sla_dias": 45, "base": "ABERTURA"},
+], ids=["meta", "base"])
+def test_repeticao_divergente_erro(extra):
+    with pytest.raises(ValueError, match="regras repetidas"):
+        compilar_sla(pd.concat([CADASTRO, pd.DataFrame([extra])], ignore_index=True))
+
+
+def test_base_recalcula_sla_dias():
+    """Regra com base ABERTURA conta de lá até o TÉRMINO; as demais mantêm o sla_dias da limpeza."""
+    sla = CADASTRO.assign(base=["ABERTURA", None, "", None])
+    df = apply_sla(_base(), sla)
+    pintura_padrao = df.index.isin([2, 5])  # regra "*" + Pintura (cliente sem regra própria ou nulo)
+    assert (df.loc[pintura_padrao, "sla_dias"] == 10).all()
+    assert df.loc[~pintura_padrao, "sla_dias"].equals(_base().loc[~pintura_padrao, "sla_dias"].astype(float))
+    assert apply_sla(_base(), CADASTRO)["sla_dias"].equals(_base()["sla_dias"])
+
+
+def test_base_inexistente_erro():
+    with pytest.raises(ValueError, match="não é coluna"):
+        apply_sla(_base(), CADASTRO.assign(base=["INICIO", None, None, None]))
+
+
+def test_mesmas_linhas_que_o_merge_antigo():
+    """Sem "*" + "*" (que o merge não conhecia), mesmas linhas e mesma meta que os dois merges."""
+    sla = CADASTRO[CADASTRO["tipo_servico"] != "*"]
+    df = _base()
+    novo = apply_sla(df, sla)
+    antigo = _merge_antigo(df, sla)
+    assert len(novo) == len(antigo) == len(df)
+    pd.testing.assert_series_equal(novo["sla_meta_dias"], antigo["sla_meta_dias"].astype(float))
@@ -0,0 +1,89 @@
+"""`relatorio`: os números do .docx batem com `CuboKPI.de_base` e com a base filtrada nas mesmas seleções."""
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+from docx import Document
+
+from atos.cubo import PENDENCIAS, CuboKPI
+from atos.relatorio import PARAGRAFO, TITULO, TITULO_SECAO, br_money, conteudo, gerar_relatorio_docx
+
+
+def _selecoes(df: pd.DataFrame) -> list[dict]:
+    clientes = df["CLIENTE"].value_counts().index
+    return [
+        {},
+        {"CLIENTE": [clientes[0]]},
+        {"CLIENTE": list(clientes[1:4]), "tipo_servico": ["Pintura", "Civil"]},
+        {"mes_autorizacao": ["2024-05", "2025-01"], "billing_status": ["PENDENTE_FATURAMENTO"]},
+        {"CLIENTE": ["nenhum cliente"]},
+    ]
+
+
+def _filtrar(df: pd.DataFrame, sel: dict) -> pd.DataFrame:
+    mask = np.ones(len(df), dtype=bool)
+    for dim, valores in sel.items():
+        mask &= df[dim].isin(valores).to_numpy()
+    return df[mask]
+
+
+def _filtros(sel: dict) -> dict:
+    return {"clientes": sel.get("CLIENTE", []), "tipos": sel.get("tipo_servico", []),
+            "meses": sel.get("mes_autorizacao", [])}
+
+
+@pytest.fixture(scope="module")
+def cubo(base_sintetica):
+    return CuboKPI.de_base(base_sintetica)
+
+
+def _textos(doc: bytes) -> list[str]:
+    return [p.text for p in Document(BytesIO(doc)).paragraphs]
+
+
+@pytest.mark.parametrize("i", range(5))
+def test_numeros_do_relatorio(base_sintetica, cubo, i):
+    sel = _selecoes(base_sintetica)[i]
+    rec, f = cubo.recorte(sel), _filtrar(base_sintetica, sel)
+    textos = _textos(gerar_relatorio_docx(rec, _filtros(sel)))
+
+    assert f"- Registros: {len(f)}" in textos
+    assert f"- Chamados únicos: {f['CHAMADO'].nunique()}" in textos
+    assert f"- Clientes no recorte: {f['CLIENTE'].nunique()}" in textos
+    assert f"- Receita total: R$ {br_money(rec.total('receita'))}" in textos
+    assert br_money(rec.total("receita")) == br_money(f["receita"].sum())
+
+    for status, valor in rec.por("billing_status", "receita").items():
+        assert f"- {status}: R$ {br_money(valor)}" in textos
+        assert br_money(valor) == br_money(f.loc[f["billing_status"] == status, "receita"].sum())
+    pend = f.loc[f["billing_status"].isin(PENDENCIAS), "receita"].sum()
+    assert f"- Pendências (A faturar + A receber): R$ {br_money(pend)}" in textos
+
+    if len(f):
+        chamados = f.groupby("CLIENTE", observed=True)["CHAMADO"].nunique()
+        for cli, n in chamados.nlargest(3).items():
+            assert any(t.startswith(f"- {cli}: {n} chamados (") for t in textos), cli
+        sla = f["sla_resultado"].value_counts()
+        for rotulo, chave in (("Dentro", "DENTRO"), ("Fora", "FORA"), ("Sem dado", "SEM_DADO")):
+            n = int(sla.get(chave, 0))
+            assert f"- {rotulo}: {n} ({n / len(f) * 100:.1f}%)" in textos
+        fora = f[f["sla_resultado"] == "FORA"].groupby("tipo_servico", observed=True).size()
+        if len(fora):
+            tipo = fora.idxmax()
+            assert f"- {tipo}: {fora.max()} fora" in textos
+    else:
+        assert "Sem dados suficientes para cálculo." in textos
+
+
+def test_modelo_clonado_na_ordem(base_sintetica, cubo):
+    sel = _selecoes(base_sintetica)[2]
+    rec = cubo.recorte(sel)
+    blocos = conteudo(rec, _filtros(sel))
+    doc = Document(BytesIO(gerar_relatorio_docx(rec, _filtros(sel))))
+    paragrafos = [p for p in doc.paragraphs if p.text != TITULO and p.text]
+
+    assert len(paragrafos) == len(blocos)
+    estilos = {TITULO_SECAO: "Heading 2", PARAGRAFO: "Normal"}
+    for p, (tipo, texto) in zip(paragrafos[1:], blocos[1:]):  # o 1º é o "Gerado em" (hora)
+        assert (p.style.name, p.text) == (estilos[tipo], texto)
@@ -1,295 +1,224 @@
 import streamlit as st
 import pandas as pd
-import unicodedata
+import hashlib
+import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
 import altair as alt
-
-# Relatório Word
-from docx import Document
-from docx.shared import Inches
-from io import BytesIO
-from datetime import datetime
-
-MAP_STATUS = Path("04_docs/escopo/mapeamento_status_financeiro.csv")
-MAP_SERV   = Path("04_docs/escopo/mapeamento_servicos_autofill.csv")
-SLA_CAD    = Path("04_docs/escopo/cadastro_sla.csv")
-
-LOGO_PATH = Path("04_docs/logos/logo3.jpeg")
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# núcleo compartilhado com os scripts (02_code/src/atos)
+SRC_DIR = Path(__file__).resolve().parents[2] / "02_code" / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from atos import instrumentacao
+from atos.carga import FilaCargas, Progresso
+from atos.config import (FERIADOS_ESTADUAIS, FERIADOS_NACIONAIS, LOGO_PATH, LOGS_DIR, MAP_SERV, MAP_STATUS,
+                         REGRAS_CLASSIFICACAO, SLA_CAD)
+from atos.cubo import PENDENCIAS
+from atos.envelhecimento import EM_RISCO, ESTOURADO, NO_PRAZO, RISCO_PADRAO, SEM_DADO, Envelhecimento, referencia
+from atos.exportacao import FORMATOS, exportar_bytes, mime, nome_arquivo
+from atos.filtros import IndiceFiltro
+from atos.grade import TAMANHOS_PAGINA, Consulta, Grade
+from atos.incremental import Ingestao, ingerir
+from atos.lote import fechar_zip, ler_zip, lote_temporario
+from atos.mapeamentos import aproximacao_mapas, calendario_sla, carregar_sla, classificador_servicos, load_mappings
+from atos.pipeline import clean_varias, dicionario_dados
+from atos.registro import RegistroBases
+from atos.regras_sla import compilar_sla
+from atos.relatorio import FilaRelatorios, br_money
 
 C_ORANGE = "#FC4C02"
 C_GREEN  = "#23382C"
 C_GRAY   = "#737373"
 C_WHITE  = "#FFFFFF"
 
-def br_money(x: float) -> str:
-    try:
-        x = float(x)
-    except Exception:
-        x = 0.0
-    return f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-def norm_key(x) -> str:
-    if x is None:
-        return ""
-    s = str(x).strip().lower()
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = " ".join(s.split())
-    return s
-
-def load_mappings():
-    ms = pd.read_csv(MAP_STATUS)
-    ms["status_key"] = ms["STATUS"].apply(norm_key)
-
-    mserv = pd.read_csv(MAP_SERV)
-    serv_col = None
-    for c in mserv.columns:
-        if "SERV" in str(c).upper():
-            serv_col = c
-            break
-    if serv_col is None:
-        raise ValueError(f"Não achei coluna SERVIÇO no mapeamento. Colunas: {mserv.columns.tolist()}")
-
-    mserv["servico_key"] = mserv[serv_col].apply(norm_key)
-
-    sla = pd.read_csv(SLA_CAD)
-    sla["k_cli"]  = sla["cliente"].apply(norm_key)
-    sla["k_tipo"] = sla["tipo_servico"].apply(norm_key)
-    sla["sla_dias"] = pd.to_numeric(sla["sla_dias"], errors="coerce")
-    return ms, mserv, sla
-
-def clean_excel(uploaded_file) -> pd.DataFrame:
-    df = pd.read_excel(uploaded_file, header=1)
-    df = df.loc[:, ~df.columns.astype(str).str.contains(r"^Unnamed")]
-    df.columns = [str(c).strip() for c in df.columns]
-
-    text_cols = ["CLIENTE", "PONTO", "UF", "GESTOR", "CHAMADO", "OS", "SERVIÇO", "STATUS"]
-    for c in text_cols:
-        if c in df.columns:
-            df[c] = df[c].astype("string").str.strip()
-
-    for c in ["AUTORIZAÇÃO", "TÉRMINO"]:
-        if c in df.columns:
-            df[c] = pd.to_datetime(df[c], errors="coerce")
-
-    df["receita"] = pd.to_numeric(df.get("RECEITA", 0), errors="coerce").fillna(0)
-    df["sla_dias"] = (df["TÉRMINO"] - df["AUTORIZAÇÃO"]).dt.days
-    df["mes_autorizacao"] = df["AUTORIZAÇÃO"].dt.to_period("M").astype(str)
-    return df
-
-def apply_enrichment(df: pd.DataFrame, ms: pd.DataFrame, mserv: pd.DataFrame, sla: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-
-    df["status_key"]  = df["STATUS"].apply(norm_key)
-    df["servico_key"] = df["SERVIÇO"].apply(norm_key)
-    df["k_cli"]       = df["CLIENTE"].apply(norm_key)
-
-    df = df.merge(ms[["status_key", "billing_status"]], on="status_key", how="left")
-    df["billing_status"] = df["billing_status"].fillna("NAO_MAPEADO")
-
-    df = df.merge(mserv[["servico_key", "tipo_servico", "categoria"]], on="servico_key", how="left")
-    df["tipo_servico"] = df["tipo_servico"].fillna("NAO_MAPEADO")
-    df["categoria"] = df["categoria"].fillna("NAO_MAPEADO")
-    df["k_tipo"] = df["tipo_servico"].apply(norm_key)
-
-    sla_especifico = sla[sla["cliente"] != "*"].copy()
-    sla_padrao = sla[sla["cliente"] == "*"].copy()
-
-    df = df.merge(
-        sla_especifico[["k_cli", "k_tipo", "sla_dias"]].rename(columns={"sla_dias": "sla_meta_dias"}),
-        on=["k_cli", "k_tipo"],
-        how="left"
-    )
-    df = df.merge(
-        sla_padrao[["k_tipo", "sla_dias"]].rename(columns={"sla_dias": "sla_meta_padrao"}),
-        on="k_tipo",
-        how="left"
-    )
-    df["sla_meta_dias"] = df["sla_meta_dias"].fillna(df["sla_meta_padrao"])
-    df = df.drop(columns=["sla_meta_padrao"], errors="ignore")
-
-    def sla_result(row):
-        if pd.isna(row["sla_dias"]) or pd.isna(row["sla_meta_dias"]):
-            return "SEM_DADO"
-        return "DENTRO" if row["sla_dias"] <= row["sla_meta_dias"] else "FORA"
-
-    df["sla_resultado"] = df.apply(sla_result, axis=1)
-    return df.drop(columns=["status_key", "servico_key"], errors="ignore")
-
-def gerar_relatorio_docx(df_filtrado: pd.DataFrame, filtros: dict) -> bytes:
-    doc = Document()
-
-    # Logo
-    if LOGO_PATH.exists():
-        try:
-            doc.add_picture(str(LOGO_PATH), width=Inches(1.4))
-        except Exception:
-            pass
-
-    doc.add_heading("Relatório Executivo • MJ Engenharia", level=1)
-    doc.add_paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-
-    # Filtros aplicados
-    doc.add_heading("Escopo do relatório (filtros aplicados)", level=2)
-
-    def fmt_lista(nome, lista):
-        if not lista:
-            return f"- {nome}: (nenhum selecionado)"
-        if len(lista) <= 10:
-            return f"- {nome}: " + ", ".join([str(x) for x in lista])
-        return f"- {nome}: {len(lista)} selecionados (ex.: " + ", ".join([str(x) for x in lista[:5]]) + ", ...)"
-
-    doc.add_paragraph(fmt_lista("Clientes", filtros.get("clientes", [])))
-    doc.add_paragraph(fmt_lista("Tipos de serviço", filtros.get("tipos", [])))
-    doc.add_paragraph(fmt_lista("Meses (Autorização)", filtros.get("meses", [])))
-
-    # Faixa real de datas (autorização)
-    if "AUTORIZAÇÃO" in df_filtrado.columns:
-        dmin = pd.to_datetime(df_filtrado["AUTORIZAÇÃO"], errors="coerce").min()
-        dmax = pd.to_datetime(df_filtrado["AUTORIZAÇÃO"], errors="coerce").max()
-        if pd.notna(dmin) and pd.notna(dmax):
-            doc.add_paragraph(f"- Faixa de Autorização no recorte: {dmin.strftime('%d/%m/%Y')} a {dmax.strftime('%d/%m/%Y')}")
-
-    # KPIs
-    total_reg = len(df_filtrado)
-    chamados = int(df_filtrado["CHAMADO"].nunique()) if "CHAMADO" in df_filtrado.columns else 0
-    receita_total = float(df_filtrado["receita"].sum()) if "receita" in df_filtrado.columns else 0.0
-    pendencias = float(
-        df_filtrado.loc[df_filtrado["billing_status"].isin(["PENDENTE_FATURAMENTO","FATURADO_PENDENTE"]), "receita"].sum()
-    ) if ("billing_status" in df_filtrado.columns and "receita" in df_filtrado.columns) else 0.0
-    fora_sla = int((df_filtrado.get("sla_resultado") == "FORA").sum()) if "sla_resultado" in df_filtrado.columns else 0
-
-    # 1
-    doc.add_heading("1) Qual o volume de chamados no recorte atual?", level=2)
-    doc.add_paragraph(f"- Registros: {total_reg}")
-    doc.add_paragraph(f"- Chamados únicos: {chamados}")
-    doc.add_paragraph(f"- Clientes no recorte: {df_filtrado['CLIENTE'].nunique() if 'CLIENTE' in df_filtrado.columns else 0}")
-
-    # 2
-    doc.add_heading("2) Quais clientes mais acionaram a MJ (Top 10) e participação?", level=2)
-    if "CLIENTE" in df_filtrado.columns and "CHAMADO" in df_filtrado.columns and total_reg > 0:
-        top_cli = (df_filtrado.dropna(subset=["CLIENTE","CHAMADO"])
-                   .groupby("CLIENTE")["CHAMADO"].nunique()
-                   .reset_index(name="qtd_chamados")
-                   .sort_values("qtd_chamados", ascending=False)
-                   .head(10))
-        total_ch = max(1, int(df_filtrado["CHAMADO"].nunique()))
-        for _, r in top_cli.iterrows():
-            pct = (int(r["qtd_chamados"]) / total_ch) * 100
-            doc.add_paragraph(f"- {r['CLIENTE']}: {int(r['qtd_chamados'])} chamados ({pct:.1f}%)")
-    else:
-        doc.add_paragraph("Sem dados suficientes para cálculo.")
-
-    # 3
-    doc.add_heading("3) Quais tipos de serviço mais demandados (Top 10)?", level=2)
-    if "tipo_servico" in df_filtrado.columns and "OS" in df_filtrado.columns:
-        top_tipo = (df_filtrado.groupby("tipo_servico")["OS"].count()
-                    .reset_index(name="qtd")
-                    .sort_values("qtd", ascending=False)
-                    .head(10))
-        for _, r in top_tipo.iterrows():
-            doc.add_paragraph(f"- {r['tipo_servico']}: {int(r['qtd'])} registros")
+MAPAS = [MAP_STATUS, MAP_SERV, SLA_CAD, FERIADOS_NACIONAIS, FERIADOS_ESTADUAIS, REGRAS_CLASSIFICACAO]
+
+def mapas_mtime() -> tuple:
+    """mtime dos mapeamentos, das tabelas de feriados e das regras de classificação (entra na chave do cache)."""
+    return tuple(p.stat().st_mtime_ns for p in MAPAS)
+
+def hash_upload(arquivos) -> str:
+    """sha256 do conjunto de arquivos enviados (nome + conteúdo, ordem não importa); o hash de cada
+    arquivo é memoizado na sessão p/ não re-hashear a cada rerun."""
+    hashes = st.session_state.setdefault("upload_hash", {})
+    ids = [getattr(f, "file_id", None) or f"{f.name}:{f.size}" for f in arquivos]
+    for k in set(hashes) - set(ids):
+        del hashes[k]
+    for file_id, f in zip(ids, arquivos):
+        if file_id not in hashes:
+            hashes[file_id] = hashlib.sha256(f.getvalue()).hexdigest()
+    conjunto = sorted(f"{f.name}:{hashes[file_id]}" for file_id, f in zip(ids, arquivos))
+    return hashlib.sha256("\n".join(conjunto).encode()).hexdigest()
+
+@st.cache_resource
+def registro() -> RegistroBases:
+    """Bases enriquecidas do processo, uma por conteúdo de upload, compartilhadas entre as sessões."""
+    return RegistroBases()
+
+@st.cache_resource
+def cargas() -> FilaCargas:
+    """Uploads sendo lidos/enriquecidos em segundo plano, um por conteúdo, para todas as sessões."""
+    return FilaCargas()
+
+@st.cache_resource
+def lotes() -> FilaCargas:
+    """Relatórios em lote gerados em segundo plano, no máximo um por sessão; o zip temporário é fechado quando
+    nenhuma sessão o quer mais (a sessão pediu outro lote) ou 30 min depois de pronto."""
+    return FilaCargas(expira=30 * 60, liberar=fechar_zip, nome="lote")
+
+@st.cache_resource
+def relatorios() -> FilaRelatorios:
+    """Relatórios Word gerados em segundo plano, em cache por (base, seleção), para todas as sessões."""
+    return FilaRelatorios()
+
+def painel_relatorio(fut) -> None:
+    """Download do relatório quando pronto; enquanto isso, só um aviso (o painel segue utilizável)."""
+    if not fut.done():
+        st.caption("⏳ Gerando relatório em segundo plano...")
+    elif fut.exception() is not None:
+        st.error(f"Falha ao gerar o relatório: {fut.exception()}")
     else:
-        doc.add_paragraph("Sem dados suficientes para cálculo.")
+        st.download_button(
+            "⬇️ Baixar relatório (.docx)",
+            data=fut.result(),
+            file_name="Relatorio_MJ_Dashboard.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        )
 
-    # 4
-    doc.add_heading("4) Como está o funil financeiro no recorte atual?", level=2)
-    doc.add_paragraph(f"- Receita total: R$ {br_money(receita_total)}")
-    if "billing_status" in df_filtrado.columns and "receita" in df_filtrado.columns:
-        fin = (df_filtrado.groupby("billing_status")["receita"].sum()
-               .reset_index(name="receita_total")
-               .sort_values("receita_total", ascending=False))
-        for _, r in fin.iterrows():
-            doc.add_paragraph(f"- {r['billing_status']}: R$ {br_money(float(r['receita_total']))}")
-
-    # 5
-    doc.add_heading("5) Qual o valor em pendência e onde está concentrado?", level=2)
-    doc.add_paragraph(f"- Pendências (A faturar + A receber): R$ {br_money(pendencias)}")
-    if "billing_status" in df_filtrado.columns and "receita" in df_filtrado.columns and "CLIENTE" in df_filtrado.columns:
-        pend = df_filtrado[df_filtrado["billing_status"].isin(["PENDENTE_FATURAMENTO","FATURADO_PENDENTE"])].copy()
-        pend_cli = (pend.groupby("CLIENTE")["receita"].sum()
-                    .reset_index(name="pendencia")
-                    .sort_values("pendencia", ascending=False)
-                    .head(5))
-        if len(pend_cli) == 0:
-            doc.add_paragraph("- Sem pendências no recorte atual.")
-        else:
-            doc.add_paragraph("Top 5 clientes por pendência:")
-            for _, r in pend_cli.iterrows():
-                doc.add_paragraph(f"- {r['CLIENTE']}: R$ {br_money(float(r['pendencia']))}")
-
-    # 6
-    doc.add_heading("6) Qual a performance de SLA (dentro/fora) no recorte atual?", level=2)
-    if "sla_resultado" in df_filtrado.columns and total_reg > 0:
-        dentro = int((df_filtrado["sla_resultado"] == "DENTRO").sum())
-        fora = int((df_filtrado["sla_resultado"] == "FORA").sum())
-        sem = int((df_filtrado["sla_resultado"] == "SEM_DADO").sum())
-        doc.add_paragraph(f"- Dentro: {dentro} ({(dentro/total_reg*100):.1f}%)")
-        doc.add_paragraph(f"- Fora: {fora} ({(fora/total_reg*100):.1f}%)")
-        doc.add_paragraph(f"- Sem dado: {sem} ({(sem/total_reg*100):.1f}%)")
-    else:
-        doc.add_paragraph("Sem dados suficientes para cálculo de SLA.")
-
-    # 7
-    doc.add_heading("7) Quais tipos de serviço mais estouram SLA? (Top 5)", level=2)
-    if "sla_resultado" in df_filtrado.columns and "tipo_servico" in df_filtrado.columns:
-        sla_tipo = (df_filtrado.assign(is_fora=df_filtrado["sla_resultado"].eq("FORA"))
-                    .groupby("tipo_servico")["is_fora"].sum()
-                    .reset_index(name="fora")
-                    .sort_values("fora", ascending=False)
-                    .head(5))
-        if len(sla_tipo) == 0 or int(sla_tipo["fora"].sum()) == 0:
-            doc.add_paragraph("Sem casos fora do SLA no recorte atual.")
-        else:
-            for _, r in sla_tipo.iterrows():
-                doc.add_paragraph(f"- {r['tipo_servico']}: {int(r['fora'])} fora")
-    else:
-        doc.add_paragraph("Sem dados suficientes para cálculo.")
-
-    # 8
-    doc.add_heading("8) Quais casos críticos (fora do SLA) exigem ação imediata? (Top 10)", level=2)
-    if "sla_resultado" in df_filtrado.columns:
-        crit = df_filtrado[df_filtrado["sla_resultado"] == "FORA"].copy()
-        if len(crit) == 0:
-            doc.add_paragraph("Nenhum caso fora do SLA no recorte atual.")
-        else:
-            crit["sla_dias_n"] = pd.to_numeric(crit.get("sla_dias", 0), errors="coerce")
-            crit["sla_meta_n"] = pd.to_numeric(crit.get("sla_meta_dias", 0), errors="coerce")
-            crit["atraso_dias"] = (crit["sla_dias_n"] - crit["sla_meta_n"]).fillna(0)
-            crit = crit.sort_values("atraso_dias", ascending=False).head(10)
-
-            for _, r in crit.iterrows():
-                doc.add_paragraph(
-                    f"- Cliente: {r.get('CLIENTE','')} | Ponto: {r.get('PONTO','')} | Tipo: {r.get('tipo_servico','')} | "
-                    f"Atraso: {int(r.get('atraso_dias',0))} dias | OS: {r.get('OS','')} | Chamado: {r.get('CHAMADO','')}"
-                )
-    else:
-        doc.add_paragraph("Sem dados suficientes para cálculo.")
-
-    # 9
-    doc.add_heading("9) Qual o tempo de ciclo médio/mediano por tipo de serviço?", level=2)
-    if "tipo_servico" in df_filtrado.columns and "sla_dias" in df_filtrado.columns:
-        ciclo = (df_filtrado.groupby("tipo_servico")["sla_dias"]
-                 .agg(media="mean", mediana="median")
-                 .reset_index()
-                 .sort_values("media", ascending=False))
-        for _, r in ciclo.head(10).iterrows():
-            doc.add_paragraph(f"- {r['tipo_servico']}: média {r['media']:.1f} dias | mediana {r['mediana']:.1f} dias")
+def envelhecimento(chave: tuple, df: pd.DataFrame) -> Envelhecimento:
+    """Linhas abertas da base com a regra de SLA já resolvida (uma vez por base, na sessão)."""
+    if st.session_state.get("envelhecimento", (None,))[0] != chave:
+        regras = compilar_sla(carregar_sla())
+        st.session_state["envelhecimento"] = (
+            chave, Envelhecimento(df, regras, calendario_sla() if regras.usa_uteis else None, aproximacao_mapas()))
+    return st.session_state["envelhecimento"][1]
+
+@st.fragment(run_every="60s")
+def painel_abertos(env: Envelhecimento, posicoes) -> None:
+    """Chamados em aberto contra o relógio: roda sozinho a cada minuto, sem refazer o resto da página."""
+    agora = referencia()  # um instante por execução, o mesmo para o resumo e a fila
+    risco = st.slider("Em risco a partir de (% da meta)", 50, 100, int(RISCO_PADRAO * 100), step=5,
+                      key="sla_risco") / 100
+    resumo = env.resumo(agora, risco, posicoes)
+    for col, (rotulo, sit) in zip(st.columns(4), [("Estourados", ESTOURADO), ("Em risco", EM_RISCO),
+                                                  ("No prazo", NO_PRAZO), ("Sem meta/início", SEM_DADO)]):
+        col.metric(rotulo, f"{int(resumo[sit])}")
+    fila = env.fila(agora, risco, posicoes, limite=200)
+    st.dataframe(fila, use_container_width=True, height=320, hide_index=True)
+    st.caption(f"Vencem primeiro (até 200; restante negativo = dias de atraso) — referência "
+               f"{agora:%d/%m/%Y %H:%M}, atualizada a cada minuto.")
+
+def sessao_id() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "local"
+
+@contextmanager
+def cronometrar(aba: str):
+    """Guarda na sessão o tempo (ms) do render da aba e em qual execução do script ele aconteceu
+    (e registra a aba como etapa na instrumentação, se ligada)."""
+    t0 = time.perf_counter()
+    try:
+        with instrumentacao.etapa(f"aba {aba}", sessao=sessao_id()):
+            yield
+    finally:
+        st.session_state.setdefault("tempos_abas", {})[aba] = (
+            round((time.perf_counter() - t0) * 1000, 1), st.session_state["execucao"])
+
+def painel_perfil(caixa) -> None:
+    """Últimas etapas medidas no processo (todas as sessões): resumo por etapa e registros mais recentes."""
+    with caixa:
+        if not instrumentacao.ativo():
+            st.caption("Desligado (sem custo). Ligar vale para o processo todo, não só esta sessão.")
+            return
+        regs = instrumentacao.registros()
+        if regs.empty:
+            st.caption("Nenhuma etapa medida ainda.")
+            return
+        st.dataframe(instrumentacao.resumo(regs), use_container_width=True, hide_index=True)
+        st.dataframe(regs[instrumentacao.REGISTRO_COLS].tail(50).iloc[::-1], use_container_width=True, hide_index=True)
+        st.caption(f"Também em {LOGS_DIR}/perfil_AAAAMMDD.jsonl (uma linha JSON por etapa).")
+
+def construir_base(arquivos: list, mtimes: tuple,
+                   progresso: Progresso | None = None) -> tuple[Ingestao | None, pd.DataFrame, IndiceFiltro | None]:
+    """Lê as planilhas (todas as abas ATOS, em paralelo) e enriquece só as linhas novas/alteradas
+    desde o último upload (loja incremental), resolvendo na hora (aproximação e palavras-chave) os valores
+    fora dos mapeamentos; devolve base + cubo de KPIs, o relatório por arquivo/aba e o índice de filtro.
+    Marca etapa e fração em `progresso` (leitura até 60%, enriquecimento até 95%, índice)."""
+    progresso = progresso or Progresso()
+    progresso.marcar("Lendo planilhas", 0.0)
+    raw, relatorio = clean_varias(arquivos, progresso=lambda feitos, total, linhas: progresso.marcar(
+        "Lendo planilhas", 0.6 * feitos / total, f"{feitos}/{total} arquivo(s), {linhas} linhas lidas"))
+    if raw.empty:
+        return None, relatorio, None
+    progresso.marcar("Enriquecendo", 0.6)
+    ms, mserv, sla = load_mappings()
+    ing = ingerir(raw, ms, mserv, sla, mtimes, classificador=classificador_servicos(), aproximacao=aproximacao_mapas(),
+                  progresso=lambda feitas, total: progresso.marcar(
+                      "Enriquecendo", 0.6 + 0.35 * feitas / max(total, 1), f"{feitas}/{total} linhas"))
+    progresso.marcar("Montando índice de filtro", 0.95)
+    return ing, relatorio, IndiceFiltro(ing.df)
+
+def carregar_base(upload_hash: str, mtimes: tuple, uploaded):
+    """Publica em `session_state["base"]` a base do upload (registro: chave = hash dos uploads + mtimes dos
+    mapeamentos; bases de mapeamentos antigos saem). Se ela ainda não existe, devolve a `Carga` que a constrói
+    em segundo plano (uma por conteúdo, para todas as sessões) e a sessão fica com a base anterior até lá;
+    trocar de upload no meio cancela a carga que ninguém mais espera."""
+    reg, fila, sessao = registro(), cargas(), sessao_id()
+    reg.invalidar(lambda chave: chave[1] == mtimes)
+    chave = (upload_hash, mtimes)
+    anterior = st.session_state.get("base")
+    if anterior is not None and anterior[0] == chave:
+        base = reg.obter(chave, sessao, lambda: anterior[1])  # repõe no registro se tiver sido despejada
+    elif reg.pronta(chave):
+        # outra sessão já carregou este conteúdo (construir só se for despejada neste meio-tempo)
+        base = reg.obter(chave, sessao, lambda: construir_base([(f.name, f.getvalue()) for f in uploaded], mtimes))
     else:
-        doc.add_paragraph("Sem dados suficientes para cálculo.")
-
-    # 10
-    doc.add_heading("10) Resumo executivo: 3 ações recomendadas", level=2)
-    doc.add_paragraph("- Ação 1: Priorizar faturamento dos itens em PENDENTE_FATURAMENTO.")
-    doc.add_paragraph("- Ação 2: Cobrança/recebimento dos itens em FATURADO_PENDENTE.")
-    doc.add_paragraph("- Ação 3: Revisar causas de FORA do SLA nos tipos com maior incidência.")
-
-    buf = BytesIO()
-    doc.save(buf)
-    return buf.getvalue()
+        arquivos = [(f.name, f.getvalue()) for f in uploaded]
+        carga = fila.pedir(chave, sessao, lambda progresso: construir_base(arquivos, mtimes, progresso))
+        if not carga.futuro.done() or carga.futuro.exception() is not None:
+            return carga
+        base = reg.obter(chave, sessao, carga.futuro.result)
+    fila.soltar(sessao)
+    st.session_state["base"] = (chave, base)
+    return None
+
+@st.fragment(run_every=0.5)
+def painel_carga(carga) -> None:
+    """Barra da carga em segundo plano; ao terminar, um rerun completo publica a base nova."""
+    if carga.futuro.done():
+        st.rerun(scope="app")
+    etapa, fracao, detalhe = carga.progresso.estado
+    st.progress(fracao, text=f"⏳ {etapa}" + (f" — {detalhe}" if detalhe else ""))
+
+@st.fragment(run_every=0.5)
+def aguardar_lote(lote) -> None:
+    """Barra do lote em segundo plano; ao terminar, um rerun completo troca a barra pelo download."""
+    if lote.futuro.done():
+        st.rerun(scope="app")
+    etapa, fracao, detalhe = lote.progresso.estado
+    st.progress(fracao, text=f"⏳ {etapa}" + (f" — {detalhe}" if detalhe else ""))
+
+def construir_lote(cubo, dim: str, valores: list, selecao: dict):
+    """Função da carga do lote (roda na fila `lotes`): zip temporário + tempos de cada relatório."""
+    def construir(progresso: Progresso):
+        progresso.marcar("Gerando relatórios", 0.0, f"0/{len(valores)}")
+        return lote_temporario(cubo, dim, valores, selecao, progresso=lambda feitos, total, linha: progresso.marcar(
+            "Gerando relatórios", feitos / total, f"{feitos}/{total} — {linha['valor']} ({linha['segundos']:.2f}s)"))
+    return construir
 
 # ---------------- UI ----------------
 st.set_page_config(page_title="MJ Engenharia • Dashboard", layout="wide")
+st.session_state["execucao"] = st.session_state.get("execucao", 0) + 1
+
+# no topo da sidebar, para dar para ligar antes do upload; a tabela é preenchida no fim da execução
+caixa_perfil = st.sidebar.expander("🐞 Perfil de desempenho")
+st.session_state["perfil_ativo"] = instrumentacao.ativo()  # o estado é do processo; outra sessão pode ter mudado
+caixa_perfil.toggle("Medir etapas (tempo, memória, linhas)", key="perfil_ativo",
+                    on_change=lambda: instrumentacao.ativar(st.session_state["perfil_ativo"]))
 
 st.markdown(f"""
 <style>
@@ -337,39 +266,91 @@ with h2:
     st.markdown('<span class="mj-badge">Soluções inteligentes • Dashboard</span>', unsafe_allow_html=True)
 
 st.write("")
-uploaded = st.file_uploader("Carregar planilha (.xlsx)", type=["xlsx"])
-if uploaded is None:
+uploaded = st.file_uploader("Carregar planilhas (.xlsx)", type=["xlsx"], accept_multiple_files=True)
+if not uploaded:
+    cargas().soltar(sessao_id())
+    lotes().soltar(sessao_id())  # fecha o zip do lote, se ninguém mais o quer
+    st.session_state.pop("base", None)
     st.info("Anexe a planilha para atualizar os indicadores.")
     st.stop()
 
-missing = [str(p) for p in [MAP_STATUS, MAP_SERV, SLA_CAD] if not p.exists()]
+missing = [str(p) for p in MAPAS if not p.exists()]
 if missing:
     st.error("Faltam arquivos de configuração:\n- " + "\n- ".join(missing))
     st.stop()
 
-ms, mserv, sla = load_mappings()
-raw = clean_excel(uploaded)
-df = apply_enrichment(raw, ms, mserv, sla)
+carga = carregar_base(hash_upload(uploaded), mapas_mtime(), uploaded)
+if carga is not None:
+    erro = carga.futuro.exception() if carga.futuro.done() else None
+    if erro is not None:
+        st.error(f"Falha ao processar a planilha: {erro}")
+    else:
+        painel_carga(carga)
+    if "base" not in st.session_state:
+        st.stop()
+    st.caption("Mostrando os dados carregados antes, até os novos ficarem prontos.")
+# chave e base publicadas (as novas, ou as anteriores enquanto a carga não termina)
+(upload_hash, mtimes), (ing, relatorio, idx) = st.session_state["base"]
+
+for r in relatorio[relatorio["erro"].notna()].itertuples():
+    st.warning(f"Não foi possível ler {r.arquivo}" + (f" / aba {r.aba}" if pd.notna(r.aba) else "") + f": {r.erro}")
+if ing is None:
+    st.error("Nenhuma planilha ATOS pôde ser lida.")
+    st.stop()
+lidas = relatorio[relatorio["erro"].isna()]
+with st.expander(f"Arquivos carregados: {lidas['arquivo'].nunique()} arquivo(s), {len(lidas)} aba(s), {int(lidas['linhas'].sum())} linhas"):
+    st.dataframe(relatorio, use_container_width=True, hide_index=True)
+df, cubo = ing.df, ing.cubo
+
+# valores fora dos mapeamentos: o que foi casado por aproximação e o que só tem sugestão
+if st.session_state.get("revisao", (None,))[0] != (upload_hash, mtimes):
+    st.session_state["revisao"] = ((upload_hash, mtimes), aproximacao_mapas().revisao(df))
+revisao = st.session_state["revisao"][1]
+if len(revisao):
+    aplicadas = int(revisao["aplicado"].sum())
+    with st.expander(f"Correspondências aproximadas: {aplicadas} aplicada(s), {len(revisao) - aplicadas} só sugerida(s)"):
+        st.dataframe(revisao, use_container_width=True, hide_index=True)
+        st.download_button("⬇️ Baixar revisão (.csv)", data=revisao.to_csv(index=False).encode("utf-8"),
+                           file_name="revisao_aproximacao.csv", mime="text/csv")
+
+if ing.reprocessada:
+    st.caption(f"Upload: mapeamentos alterados desde a última carga — {len(df)} linhas reprocessadas por completo "
+               f"em {ing.segundos:.1f}s")
+else:
+    st.caption(
+        f"Upload: {ing.inseridas} linhas novas • {ing.modificadas} alteradas • {ing.removidas} removidas • "
+        f"{ing.reaproveitadas} reaproveitadas da última carga — processado em {ing.segundos:.1f}s"
+        + (f" (~{ing.segundos_economizados:.1f}s economizados)" if ing.segundos_economizados >= 0.1 else "")
+    )
+if len(ing.memoria):
+    mem = ing.memoria
+    with st.expander(f"Memória: linhas processadas ocupam {mem['bytes_depois'].sum() / 2**20:.1f} MB "
+                     f"({mem['economia'].sum() / 2**20:.1f} MB economizados na compactação)"):
+        st.dataframe(mem, use_container_width=True, hide_index=True)
+        reg = registro()
+        st.caption(f"Bases em memória no servidor (compartilhadas entre sessões): {len(reg.estado())} — "
+                   f"{reg.total_bytes() / 2**20:.1f} MB de {reg.teto / 2**20:.0f} MB")
 
 st.sidebar.markdown("## Filtros")
-clientes = sorted(df["CLIENTE"].dropna().unique().tolist())
-tipos = sorted(df["tipo_servico"].dropna().unique().tolist())
-meses = sorted(df["mes_autorizacao"].dropna().unique().tolist())
+clientes = idx.opcoes("CLIENTE")
+tipos = idx.opcoes("tipo_servico")
+meses = idx.opcoes("mes_autorizacao")
 
 cli_sel = st.sidebar.multiselect("Cliente", clientes, default=clientes)
 tipo_sel = st.sidebar.multiselect("Tipo de serviço", tipos, default=tipos)
 mes_sel = st.sidebar.multiselect("Mês (Autorização)", meses, default=meses[-3:] if len(meses) >= 3 else meses)
 
-f = df.copy()
-if cli_sel:  f = f[f["CLIENTE"].isin(cli_sel)]
-if tipo_sel: f = f[f["tipo_servico"].isin(tipo_sel)]
-if mes_sel:  f = f[f["mes_autorizacao"].isin(mes_sel)]
+selecao = {"CLIENTE": cli_sel, "tipo_servico": tipo_sel, "mes_autorizacao": mes_sel}
+with instrumentacao.etapa("recorte", sessao=sessao_id()):
+    rec = cubo.recorte(selecao)
+# identifica (base, seleção) para os caches da grade e do relatório
+chave_recorte = (upload_hash, mtimes, tuple(tuple(v) for v in selecao.values()))
 
-total_linhas = len(f)
-chamados_unicos = int(f["CHAMADO"].nunique())
-receita_total = float(f["receita"].sum())
-pendencias = float(f.loc[f["billing_status"].isin(["PENDENTE_FATURAMENTO", "FATURADO_PENDENTE"]), "receita"].sum())
-fora_sla = int((f["sla_resultado"] == "FORA").sum())
+total_linhas = rec.n_linhas()
+chamados_unicos = rec.chamados_unicos()
+receita_total = float(rec.total("receita"))
+pendencias = float(rec.total("receita", billing_status=PENDENCIAS))
+fora_sla = int(rec.total("linhas", sla_resultado=["FORA"]))
 
 k1, k2, k3, k4, k5 = st.columns(5)
 for col, title, value in [
@@ -388,110 +369,216 @@ for col, title, value in [
         """, unsafe_allow_html=True)
 
 st.write("")
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Visão geral", "💰 Financeiro", "⏱️ SLA", "📄 Base"])
+ABAS = ["📊 Visão geral", "💰 Financeiro", "⏱️ SLA", "📄 Base", "🔎 Qualidade"]
+# só a aba ativa roda (agregação, gráficos, tabela); trocar de aba dispara um rerun
+tab1, tab2, tab3, tab4, tab5 = st.tabs(ABAS, key="aba", on_change="rerun")
+
+if tab1.open:
+    with tab1, cronometrar(ABAS[0]):
+        st.write("")
+        fut = relatorios().obter(chave_recorte)
+        if st.button("📄 Gerar relatório Word (recorte atual)"):
+            filtros = {"clientes": cli_sel, "tipos": tipo_sel, "meses": mes_sel}
+            fut = relatorios().pedir(chave_recorte, rec, filtros)
+        if fut is not None and fut.done():
+            painel_relatorio(fut)
+        elif fut is not None:
+            # consulta o pool a cada 0,5 s; ao terminar, um rerun completo troca o aviso pelo download
+            @st.fragment(run_every=0.5)
+            def aguardar_relatorio():
+                if fut.done():
+                    st.rerun()
+                painel_relatorio(fut)
+            aguardar_relatorio()
+
+        with st.expander("📦 Relatórios em lote (um .docx por cliente, tipo ou mês, em zip)"):
+            rotulos = {"CLIENTE": "Cliente", "tipo_servico": "Tipo de serviço", "mes_autorizacao": "Mês (Autorização)"}
+            dim_lote = st.selectbox("Um relatório por", list(rotulos), format_func=rotulos.get, key="lote_dim")
+            valores_lote = selecao[dim_lote] or idx.opcoes(dim_lote)
+            st.caption(f"{len(valores_lote)} relatórios (valores selecionados na sidebar), com os demais filtros aplicados.")
+            if st.button("Gerar zip", key="lote_gerar"):
+                # em segundo plano; pedir outro lote cancela/fecha o anterior desta sessão
+                lotes().pedir((chave_recorte, dim_lote), sessao_id(),
+                              construir_lote(cubo, dim_lote, list(valores_lote), dict(selecao)))
+            lote = lotes().da_sessao(sessao_id())
+            if lote is not None and lote.chave == (chave_recorte, dim_lote):
+                if not lote.futuro.done():
+                    aguardar_lote(lote)
+                elif lote.futuro.cancelled() or lote.futuro.exception() is not None:
+                    st.error(f"Falha ao gerar os relatórios: {None if lote.futuro.cancelled() else lote.futuro.exception()}")
+                else:
+                    zip_tmp, rel_lote = lote.futuro.result()
+                    st.download_button(
+                        f"⬇️ Baixar zip ({int(rel_lote['erro'].isna().sum())} relatórios)",
+                        data=lambda: ler_zip(zip_tmp),  # lido só no clique
+                        file_name=f"relatorios_por_{dim_lote}.zip",
+                        mime="application/zip",
+                    )
+                    st.dataframe(rel_lote, use_container_width=True, hide_index=True, height=220)
+        st.write("")
+
+        cA, cB = st.columns([1.2, 1])
+
+        top_clientes = (rec.chamados_por("CLIENTE")
+                         .reset_index(name="qtd_chamados")
+                         .sort_values("qtd_chamados", ascending=False)
+                         .head(10))
+
+        chart_cli = alt.Chart(top_clientes).mark_bar().encode(
+            y=alt.Y("CLIENTE:N", sort="-x", title="Cliente"),
+            x=alt.X("qtd_chamados:Q", title="Chamados"),
+            color=alt.value(C_GREEN),
+            tooltip=["CLIENTE", "qtd_chamados"]
+        ).properties(height=320)
+
+        dm = (rec.por("mes_autorizacao", "n_os")
+              .reset_index(name="qtd")
+              .sort_values("mes_autorizacao"))
+
+        chart_mes = alt.Chart(dm).mark_line(point=True).encode(
+            x=alt.X("mes_autorizacao:N", title="Mês"),
+            y=alt.Y("qtd:Q", title="Demandas"),
+            color=alt.value(C_ORANGE),
+            tooltip=["mes_autorizacao", "qtd"]
+        ).properties(height=320)
+
+        with cA:
+            st.subheader("Chamados por cliente (Top 10)")
+            st.altair_chart(chart_cli, use_container_width=True)
+        with cB:
+            st.subheader("Demandas por mês (Autorização)")
+            st.altair_chart(chart_mes, use_container_width=True)
+
+        st.subheader("Resumo por tipo de serviço")
+        tipo_tbl = (rec.por("tipo_servico", ["n_os", "receita"])
+                     .rename(columns={"n_os": "qtd"})
+                     .reset_index()
+                     .sort_values("qtd", ascending=False))
+        st.dataframe(tipo_tbl, use_container_width=True, height=260)
+
+if tab2.open:
+    with tab2, cronometrar(ABAS[1]):
+        st.subheader("Receita por status")
+        fin = (rec.por("billing_status", "receita")
+               .reset_index(name="receita_total")
+               .sort_values("receita_total", ascending=False))
 
-with tab1:
-    st.write("")
-    if st.button("📄 Gerar relatório Word (recorte atual)"):
-        filtros = {"clientes": cli_sel, "tipos": tipo_sel, "meses": mes_sel}
-        doc_bytes = gerar_relatorio_docx(f, filtros)
-        st.download_button(
-            "⬇️ Baixar relatório (.docx)",
-            data=doc_bytes,
-            file_name="Relatorio_MJ_Dashboard.docx",
-            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        chart_fin = alt.Chart(fin).mark_bar().encode(
+            x=alt.X("billing_status:N", title="Status"),
+            y=alt.Y("receita_total:Q", title="Receita (R$)"),
+            color=alt.value(C_ORANGE),
+            tooltip=["billing_status", alt.Tooltip("receita_total:Q", format=",.2f")]
+        ).properties(height=320)
+
+        st.altair_chart(chart_fin, use_container_width=True)
+        st.dataframe(fin, use_container_width=True, height=220)
+
+if tab3.open:
+    with tab3, cronometrar(ABAS[2]):
+        st.subheader("SLA dentro/fora por tipo")
+        sla_t = (rec.por(["tipo_servico", "sla_resultado"], "linhas")
+                 .unstack(fill_value=0)
+                 .reset_index())
+
+        for col in ["DENTRO", "FORA", "SEM_DADO"]:
+            if col not in sla_t.columns:
+                sla_t[col] = 0
+
+        sla_long = sla_t.melt("tipo_servico", value_vars=["DENTRO", "FORA", "SEM_DADO"],
+                              var_name="resultado", value_name="qtd")
+
+        color_scale = alt.Scale(domain=["DENTRO","FORA","SEM_DADO"],
+                                range=[C_GREEN, C_ORANGE, C_GRAY])
+
+        chart_sla = alt.Chart(sla_long).mark_bar().encode(
+            y=alt.Y("tipo_servico:N", sort="-x", title="Tipo de serviço"),
+            x=alt.X("qtd:Q", title="Quantidade"),
+            color=alt.Color("resultado:N", scale=color_scale),
+            tooltip=["tipo_servico", "resultado", "qtd"]
+        ).properties(height=360)
+
+        st.altair_chart(chart_sla, use_container_width=True)
+        st.dataframe(sla_t, use_container_width=True, height=240)
+
+        st.subheader("Chamados em aberto (sem término)")
+        painel_abertos(envelhecimento((upload_hash, mtimes), idx.df), idx.posicoes(selecao))
+
+if tab4.open:
+    with tab4, cronometrar(ABAS[3]):
+        st.subheader("Base detalhada (filtrada)")
+        # busca/ordenação no servidor; só a página visível vai ao navegador
+        if st.session_state.get("grade", (None,))[0] != chave_recorte:
+            st.session_state["grade"] = (chave_recorte, Grade(idx.df, idx.posicoes(selecao)))
+            st.session_state["base_pagina"] = 1
+        grade = st.session_state["grade"][1]
+        todas = list(idx.df.columns)
+
+        c1, c2, c3, c4 = st.columns([2, 2, 2, 1])
+        busca_col = c1.selectbox("Buscar em", [None] + todas, format_func=lambda c: c or "(todas as colunas)",
+                                 key="base_busca_col")
+        busca = c2.text_input("Contém", key="base_busca")
+        ordenar = c3.selectbox("Ordenar por", [None] + todas, format_func=lambda c: c or "(ordem da planilha)",
+                               key="base_ordem")
+        crescente = c4.toggle("Crescente", value=True, key="base_crescente")
+        colunas = st.multiselect("Colunas", todas, default=todas, key="base_colunas") or todas
+
+        consulta = Consulta(busca=busca, busca_coluna=busca_col, ordenar_por=ordenar, crescente=crescente)
+        total = len(grade.linhas(consulta))
+        p1, p2, p3 = st.columns([1, 1, 4])
+        tamanho = p1.selectbox("Linhas por página", TAMANHOS_PAGINA, index=1, key="base_tamanho")
+        n_paginas = max(1, -(-total // tamanho))
+        pagina = p2.number_input("Página", min_value=1, max_value=n_paginas,
+                                 value=min(st.session_state.get("base_pagina", 1), n_paginas))
+        st.session_state["base_pagina"] = pagina
+        p3.caption(f"{total:,} linhas".replace(",", ".")
+                   + (f" (de {len(grade.posicoes):,} no filtro)".replace(",", ".") if total != len(grade.posicoes) else "")
+                   + f" — página {pagina} de {n_paginas}")
+
+        pag, _ = grade.pagina(consulta, pagina - 1, tamanho, colunas)
+        st.dataframe(pag, use_container_width=True, height=520, hide_index=True)
+        e1, e2, e3 = st.columns([1, 1, 3])
+        formato = e1.selectbox("Formato", list(FORMATOS), key="base_formato")
+        gz = e2.checkbox("gzip", key="base_gzip", disabled=formato == "xlsx") and formato != "xlsx"
+        e3.download_button(
+            f"⬇️ Baixar base filtrada ({formato}{' + gzip' if gz else ''})",
+            # gerado só no clique, em blocos, num temporário em disco (fechado após a leitura)
+            data=lambda: exportar_bytes(idx.df, formato, gz, posicoes=grade.posicoes),
+            file_name=nome_arquivo("base_filtrada", formato, gz),
+            mime=mime(formato, gz),
+        )
+
+if tab5.open:
+    with tab5, cronometrar(ABAS[4]):
+        st.subheader("Qualidade dos dados")
+        so_recorte = st.toggle("Só o recorte da sidebar", key="qualidade_recorte")
+        # perfil numa passada em blocos; refeito só quando muda a base (ou o recorte, se marcado)
+        chave_perfil = chave_recorte if so_recorte else (upload_hash, mtimes)
+        if st.session_state.get("qualidade", (None,))[0] != chave_perfil:
+            posicoes = idx.posicoes(selecao) if so_recorte else None
+            st.session_state["qualidade"] = (chave_perfil, dicionario_dados(idx.df, posicoes=posicoes))
+        perfil = st.session_state["qualidade"][1]
+
+        q1, q2, q3 = st.columns(3)
+        q1.metric("Linhas", f"{int(perfil['n_linhas'].max()) if len(perfil) else 0}")
+        q2.metric("Colunas", f"{len(perfil)}")
+        q3.metric("Colunas com vazios", f"{int((perfil['n_vazios'] > 0).sum())}")
+        st.dataframe(
+            perfil, use_container_width=True, height=520, hide_index=True,
+            column_config={"pct_vazios": st.column_config.ProgressColumn("% vazios", min_value=0, max_value=100,
+                                                                         format="%.1f%%")},
         )
-    st.write("")
-
-    cA, cB = st.columns([1.2, 1])
-
-    top_clientes = (f.dropna(subset=["CLIENTE", "CHAMADO"])
-                     .groupby("CLIENTE")["CHAMADO"].nunique()
-                     .reset_index(name="qtd_chamados")
-                     .sort_values("qtd_chamados", ascending=False)
-                     .head(10))
-
-    chart_cli = alt.Chart(top_clientes).mark_bar().encode(
-        y=alt.Y("CLIENTE:N", sort="-x", title="Cliente"),
-        x=alt.X("qtd_chamados:Q", title="Chamados"),
-        color=alt.value(C_GREEN),
-        tooltip=["CLIENTE", "qtd_chamados"]
-    ).properties(height=320)
-
-    dm = (f.groupby("mes_autorizacao")["OS"].count()
-          .reset_index(name="qtd")
-          .sort_values("mes_autorizacao"))
-
-    chart_mes = alt.Chart(dm).mark_line(point=True).encode(
-        x=alt.X("mes_autorizacao:N", title="Mês"),
-        y=alt.Y("qtd:Q", title="Demandas"),
-        color=alt.value(C_ORANGE),
-        tooltip=["mes_autorizacao", "qtd"]
-    ).properties(height=320)
-
-    with cA:
-        st.subheader("Chamados por cliente (Top 10)")
-        st.altair_chart(chart_cli, use_container_width=True)
-    with cB:
-        st.subheader("Demandas por mês (Autorização)")
-        st.altair_chart(chart_mes, use_container_width=True)
-
-    st.subheader("Resumo por tipo de serviço")
-    tipo_tbl = (f.groupby("tipo_servico")
-                 .agg(qtd=("OS", "count"), receita=("receita", "sum"))
-                 .reset_index()
-                 .sort_values("qtd", ascending=False))
-    st.dataframe(tipo_tbl, use_container_width=True, height=260)
-
-with tab2:
-    st.subheader("Receita por status")
-    fin = (f.groupby("billing_status")["receita"].sum()
-           .reset_index(name="receita_total")
-           .sort_values("receita_total", ascending=False))
-
-    chart_fin = alt.Chart(fin).mark_bar().encode(
-        x=alt.X("billing_status:N", title="Status"),
-        y=alt.Y("receita_total:Q", title="Receita (R$)"),
-        color=alt.value(C_ORANGE),
-        tooltip=["billing_status", alt.Tooltip("receita_total:Q", format=",.2f")]
-    ).properties(height=320)
-
-    st.altair_chart(chart_fin, use_container_width=True)
-    st.dataframe(fin, use_container_width=True, height=220)
-
-with tab3:
-    st.subheader("SLA dentro/fora por tipo")
-    sla_t = (f.groupby("tipo_servico")["sla_resultado"]
-             .value_counts(dropna=False)
-             .unstack(fill_value=0)
-             .reset_index())
-
-    for col in ["DENTRO", "FORA", "SEM_DADO"]:
-        if col not in sla_t.columns:
-            sla_t[col] = 0
-
-    sla_long = sla_t.melt("tipo_servico", value_vars=["DENTRO", "FORA", "SEM_DADO"],
-                          var_name="resultado", value_name="qtd")
-
-    color_scale = alt.Scale(domain=["DENTRO","FORA","SEM_DADO"],
-                            range=[C_GREEN, C_ORANGE, C_GRAY])
-
-    chart_sla = alt.Chart(sla_long).mark_bar().encode(
-        y=alt.Y("tipo_servico:N", sort="-x", title="Tipo de serviço"),
-        x=alt.X("qtd:Q", title="Quantidade"),
-        color=alt.Color("resultado:N", scale=color_scale),
-        tooltip=["tipo_servico", "resultado", "qtd"]
-    ).properties(height=360)
-
-    st.altair_chart(chart_sla, use_container_width=True)
-    st.dataframe(sla_t, use_container_width=True, height=240)
-
-with tab4:
-    st.subheader("Base detalhada (filtrada)")
-    st.dataframe(f, use_container_width=True, height=520)
-    st.download_button(
-        "⬇️ Baixar base filtrada (CSV)",
-        data=f.to_csv(index=False).encode("utf-8"),
-        file_name="base_filtrada.csv",
-        mime="text/csv"
+        st.caption("Distintos: exatos até 1.000 valores, estimados (HyperLogLog, ~2%) acima disso; quartis de uma "
+                   "amostra de 20 mil valores; contagens com + são aproximadas (pelo menos).")
+        st.download_button("⬇️ Baixar perfil (.csv)", data=perfil.to_csv(index=False).encode("utf-8"),
+                           file_name="perfil_qualidade.csv", mime="text/csv")
+
+with st.expander("🐞 Debug: tempos por aba"):
+    tempos = st.session_state.get("tempos_abas", {})
+    st.dataframe(
+        pd.DataFrame({"aba": ABAS,
+                      "último render (ms)": [tempos.get(a, (None, None))[0] for a in ABAS],
+                      "nesta execução": [tempos.get(a, (None, None))[1] == st.session_state["execucao"] for a in ABAS]}),
+        use_container_width=True, hide_index=True,
     )
+
+painel_perfil(caixa_perfil)